@@ -1,24 +1,52 @@
 """
 CosmoEmbeddings SDK - A decentralized semantic network for AIs built on embeddings.
+
+Public classes are imported on first access, so importing the package does not
+load the embedding model stack (sentence_transformers, torch) or the astronomy
+stack (skyfield) until they are used.
 """
 
-from .block_builder import BlockBuilder
-from .signer import Signer
-from .validator import CosmoValidator
-from .config import Config
-from .sync_client import SyncClient
-from .node import Node, NodeIdentity
-from .discovery import DiscoveryService
+import importlib
+from typing import TYPE_CHECKING
 
 __version__ = "0.1.0"
 
-__all__ = [
-    "BlockBuilder",
-    "Signer",
-    "CosmoValidator",
-    "Config",
-    "SyncClient",
-    "Node",
-    "NodeIdentity",
-    "DiscoveryService"
-]
+# Public name -> module defining it
+_LAZY_ATTRIBUTES = {
+    "BlockBuilder": ".block_builder",
+    "Signer": ".signer",
+    "CosmoValidator": ".validator",
+    "CosmoSignatureGenerator": ".cosmo_signature",
+    "Config": ".config",
+    "SyncClient": ".sync_client",
+    "Node": ".node",
+    "NodeIdentity": ".node",
+    "DiscoveryService": ".discovery",
+    "VerdictCache": ".verdict_cache"
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+if TYPE_CHECKING:
+    from .block_builder import BlockBuilder
+    from .signer import Signer
+    from .validator import CosmoValidator
+    from .cosmo_signature import CosmoSignatureGenerator
+    from .config import Config
+    from .sync_client import SyncClient
+    from .node import Node, NodeIdentity
+    from .discovery import DiscoveryService
+    from .verdict_cache import VerdictCache
+
+def __getattr__(name: str):
+    """Import public classes on first access."""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Cache it so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
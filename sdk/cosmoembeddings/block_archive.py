@@ -0,0 +1,300 @@
+# Handles the append-only block archive
+
+import json
+import os
+import re
+import struct
+import threading
+import uuid
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from .block_container import split_embeddings
+
+_RECORD_HEADER = struct.Struct("<I")
+# Embedding matrix files, named by matrix_name, with their dimension
+_MATRIX_PATTERN = re.compile(r"embeddings-.*-(\d+)\.f32")
+
+class BlockArchive:
+    """
+    Append-only archive of blocks backed by a record log and embedding matrices.
+
+    Block fields are appended to a length-prefixed JSON record log. All float32
+    embeddings of a given model and dimension go to one contiguous matrix
+    file, read through numpy.memmap, so readers in several processes share
+    pages through the OS cache. An id index maps each block to its record.
+
+    The archive supports a single writer process; any number of processes
+    may read it, opening it read-only and calling refresh to see blocks
+    appended since. Opening for writing first drops whatever an interrupted
+    append left behind: a torn index line, records without an index entry
+    and partial matrix rows.
+    """
+
+    RECORDS_FILE = "records.log"
+    INDEX_FILE = "index.jsonl"
+
+    def __init__(self, directory: str, readonly: bool = False):
+        """
+        Open or create an archive.
+
+        Args:
+            directory: Directory holding the archive files
+            readonly: Open as a reader, alongside a writer in another process
+        """
+        self.directory = directory
+        self.readonly = readonly
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._index: Dict[str, int] = {}
+        self._matrices: Dict[str, np.memmap] = {}
+        self._writers: Dict[str, object] = {}
+
+        self._records_path = os.path.join(directory, self.RECORDS_FILE)
+        self._index_path = os.path.join(directory, self.INDEX_FILE)
+        self._records = open(self._records_path, "a+b")
+        self._index_file = open(self._index_path, "a+b")
+        self._index_position = 0
+        self._load_index()
+        if not readonly:
+            self._recover()
+
+    def refresh(self) -> int:
+        """
+        Read the index entries appended since the archive was opened or last refreshed.
+
+        Returns:
+            int: Number of blocks added to the index
+        """
+        return self._load_index()
+
+    def _load_index(self) -> int:
+        """Read new complete lines of the id index, skipping entries past the end of the record log."""
+        records_size = os.path.getsize(self._records_path)
+        added = 0
+        with self._lock:
+            self._index_file.seek(self._index_position)
+            while True:
+                line = self._index_file.readline()
+                if not line.endswith(b"\n"):
+                    # The end of the index, or a line still being written
+                    break
+                self._index_position = self._index_file.tell()
+                try:
+                    entry = json.loads(line)
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    continue
+                if entry["offset"] < records_size:
+                    added += entry["id"] not in self._index
+                    self._index[entry["id"]] = entry["offset"]
+        return added
+
+    def _recover(self) -> None:
+        """Cut off the tails an interrupted append may have left in every file."""
+        # A torn index line would otherwise run into the next entry
+        self._index_file.truncate(self._index_position)
+
+        # Records after the last indexed one were never committed
+        records_end = 0
+        if self._index:
+            last = max(self._index.values())
+            self._records.seek(last)
+            (length,) = _RECORD_HEADER.unpack(self._records.read(_RECORD_HEADER.size))
+            records_end = last + _RECORD_HEADER.size + length
+        self._records.truncate(records_end)
+
+        # A partial row would shift every row appended after it
+        for name in os.listdir(self.directory):
+            match = _MATRIX_PATTERN.fullmatch(name)
+            if match is None or int(match.group(1)) == 0:
+                continue
+            row_bytes = 4 * int(match.group(1))
+            path = os.path.join(self.directory, name)
+            size = os.path.getsize(path)
+            if size % row_bytes:
+                os.truncate(path, size - size % row_bytes)
+
+    @staticmethod
+    def matrix_name(model_name: str, dimensions: int) -> str:
+        """Get the file name of the embedding matrix for a model and dimension."""
+        safe_name = re.sub(r"[^A-Za-z0-9._-]+", "_", model_name)
+        return f"embeddings-{safe_name}-{dimensions}.f32"
+
+    def append(self, block: Dict) -> str:
+        """
+        Append a block to the archive.
+
+        The block is stored as given. A block without an "id" gets one in the
+        index only, since adding a field would break its signature.
+
+        Args:
+            block: Block to store
+
+        Returns:
+            str: The block's id, its "id" field or the one assigned
+        """
+        if self.readonly:
+            raise ValueError("Archive was opened read-only")
+        block_id = block.get("id") or f"block-{uuid.uuid4().hex[:8]}"
+
+        descriptor, payload = split_embeddings(block.get("embeddings"))
+        fields = dict(block)
+        pointer = None
+        if descriptor["form"] in ("list", "array") and descriptor["stored_dtype"] == "<f4":
+            rows, dimensions = descriptor["shape"]
+            if dimensions == 0:
+                raise ValueError("Cannot archive embeddings with zero dimensions")
+            model_name = (block.get("model") or {}).get("name", "unknown")
+            name = self.matrix_name(model_name, dimensions)
+            with self._lock:
+                row = self._append_matrix(name, payload, dimensions)
+            pointer = {"matrix": name, "row": row, "rows": rows, "dimensions": dimensions,
+                       "form": descriptor["form"]}
+            del fields["embeddings"]
+        elif isinstance(fields.get("embeddings"), np.ndarray):
+            fields["embeddings"] = fields["embeddings"].tolist()
+
+        record = json.dumps({"block": fields, "embeddings": pointer}, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._records.seek(0, os.SEEK_END)
+            offset = self._records.tell()
+            self._records.write(_RECORD_HEADER.pack(len(record)) + record)
+            self._records.flush()
+            # The index entry is written last and commits the record
+            self._index_file.write((json.dumps({"id": block_id, "offset": offset}) + "\n").encode("utf-8"))
+            self._index_file.flush()
+            self._index[block_id] = offset
+            self._index_position = self._index_file.tell()
+        return block_id
+
+    def _append_matrix(self, name: str, payload: bytes, dimensions: int) -> int:
+        """Append rows to an embedding matrix file and return the first new row."""
+        writer = self._writers.get(name)
+        if writer is None:
+            writer = open(os.path.join(self.directory, name), "ab")
+            self._writers[name] = writer
+        writer.seek(0, os.SEEK_END)
+        row = writer.tell() // (4 * dimensions)
+        writer.write(payload)
+        writer.flush()
+        return row
+
+    def matrix(self, model_name: str, dimensions: int) -> np.ndarray:
+        """
+        Get the contiguous embedding matrix of a model and dimension.
+
+        Args:
+            model_name: Name of the embedding model
+            dimensions: Embedding dimension
+
+        Returns:
+            np.ndarray: Read-only memory-mapped float32 matrix (rows x dimensions)
+        """
+        return self._map(self.matrix_name(model_name, dimensions), dimensions, 0)
+
+    def _map(self, name: str, dimensions: int, needed_rows: int) -> np.ndarray:
+        """Memory-map a matrix file, remapping it when it has grown."""
+        with self._lock:
+            mapped = self._matrices.get(name)
+            if mapped is not None and mapped.shape[0] >= needed_rows and needed_rows:
+                return mapped
+            path = os.path.join(self.directory, name)
+            rows = os.path.getsize(path) // (4 * dimensions) if os.path.exists(path) else 0
+            if rows == 0:
+                return np.empty((0, dimensions), dtype="<f4")
+            mapped = np.memmap(path, dtype="<f4", mode="r", shape=(rows, dimensions))
+            self._matrices[name] = mapped
+            return mapped
+
+    def _read_record(self, offset: int) -> Dict:
+        """Read and parse the record at an offset of the record log."""
+        with self._lock:
+            self._records.seek(offset)
+            (length,) = _RECORD_HEADER.unpack(self._records.read(_RECORD_HEADER.size))
+            return json.loads(self._records.read(length).decode("utf-8"))
+
+    def _materialize(self, record: Dict, as_array: bool) -> Dict:
+        """Rebuild a block from its record."""
+        block = record["block"]
+        pointer = record["embeddings"]
+        if pointer is not None:
+            start = pointer["row"]
+            end = start + pointer["rows"]
+            view = self._map(pointer["matrix"], pointer["dimensions"], end)[start:end]
+            block["embeddings"] = view if as_array else view.tolist()
+        return block
+
+    def get(self, block_id: str, as_array: bool = False) -> Dict:
+        """
+        Load a block by id.
+
+        Args:
+            block_id: Id of the block
+            as_array: Return float32 embeddings as a memory-mapped view
+
+        Returns:
+            Dict: The block, identical to what was appended unless as_array is set
+        """
+        offset = self._index.get(block_id)
+        if offset is None and self.readonly and self.refresh():
+            # The writer may have appended it since
+            offset = self._index.get(block_id)
+        if offset is None:
+            raise KeyError(block_id)
+        return self._materialize(self._read_record(offset), as_array)
+
+    def locate(self, block_id: str) -> Optional[Tuple[str, int, int]]:
+        """
+        Find where a block's embeddings live in the embedding matrices.
+
+        Args:
+            block_id: Id of the block
+
+        Returns:
+            Optional[Tuple[str, int, int]]: (matrix file, first row, row count),
+            or None if the block's embeddings are stored inline
+        """
+        pointer = self._read_record(self._index[block_id])["embeddings"]
+        if pointer is None:
+            return None
+        return pointer["matrix"], pointer["row"], pointer["rows"]
+
+    def ids(self) -> List[str]:
+        """Get the ids of all archived blocks in append order."""
+        return list(self._index)
+
+    def iter_blocks(self, as_array: bool = False) -> Iterator[Dict]:
+        """
+        Iterate over the archived blocks, reading one record at a time.
+
+        Args:
+            as_array: Return float32 embeddings as memory-mapped views
+
+        Returns:
+            Iterator[Dict]: Blocks in append order
+        """
+        for offset in list(self._index.values()):
+            yield self._materialize(self._read_record(offset), as_array)
+
+    def __contains__(self, block_id: str) -> bool:
+        return block_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self) -> None:
+        """Close the archive files."""
+        with self._lock:
+            for writer in self._writers.values():
+                writer.close()
+            self._writers.clear()
+            self._matrices.clear()
+            self._records.close()
+            self._index_file.close()
+
+    def __enter__(self) -> "BlockArchive":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
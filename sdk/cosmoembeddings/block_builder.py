@@ -1,24 +1,81 @@
 # Handles block creation
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from typing import Dict, List, Union, Optional
+from typing import Callable, Dict, Iterable, List, Union, Optional, Tuple
 import json
 import time
 from datetime import datetime
+from .embedding_cache import EmbeddingCache
+from .model_pool import ModelPool, default_pool
+from .encoding_pool import EncodingPool
+from .chunker import TokenWindowChunker
+from .embedding_codec import encode_embeddings, decode_embeddings
+from .block_container import FILE_EXTENSION, is_container, pack_block, unpack_block
+from .block_archive import BlockArchive
 
 class BlockBuilder:
     """Class for building embedding blocks with metadata."""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self,
+                 model_name: str = "all-MiniLM-L6-v2",
+                 batch_size: int = 32,
+                 cache: Optional[EmbeddingCache] = None,
+                 pool: Optional[ModelPool] = None,
+                 encoder: Optional[EncodingPool] = None,
+                 bucket_by_length: bool = True,
+                 length_fn: Optional[Callable[[str], int]] = None,
+                 embedding_dtype: Optional[str] = None,
+                 track_padding: bool = False):
         """
         Initialize the BlockBuilder with an embedding model.
         
+        The model is not loaded here: it is taken from the shared model pool
+        on first use, so builders for the same model share one copy.
+        
         Args:
             model_name: Name of the SentenceTransformers model to use
+            batch_size: Number of texts encoded per model call (default: 32)
+            cache: Embedding cache consulted before encoding (optional)
+            pool: Model pool to load the model from (default: the process-wide pool)
+            encoder: Multi-process encoding pool for batched encoding (optional)
+            bucket_by_length: Sort texts by token length before sharding them across
+                the encoder's workers, so each shard holds texts of similar length
+                (without an encoder the model batches a call by length on its own)
+            length_fn: Token length of a text (default: the model tokenizer's count;
+                whitespace tokens for models without a tokenizer, or with an encoder
+                while this process has not loaded the model)
+            embedding_dtype: Store block embeddings as base64 "float32", "float16" or
+                "int8" instead of JSON number arrays (default: JSON arrays)
+            track_padding: Count tokens and padding in encoding_stats; this measures
+                the length of every encoded text, so it is off by default
         """
-        self.model = SentenceTransformer(model_name)
         self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache = cache
+        self.pool = pool or default_pool
+        self.encoder = encoder
+        self.bucket_by_length = bucket_by_length
+        self.length_fn = length_fn
+        self.embedding_dtype = embedding_dtype
+        self.track_padding = track_padding
+        self._model = None
+        self.reset_encoding_stats()
+        
+    @property
+    def model(self):
+        """The embedding model, loaded from the pool on first access."""
+        if self._model is None:
+            self.warmup()
+        return self._model
+    
+    @model.setter
+    def model(self, model):
+        self._model = model
+        
+    def warmup(self) -> None:
+        """Load the embedding model now instead of on the first embedding call."""
+        if self._model is None:
+            self._model = self.pool.get(self.model_name)
         
     def create_embedding(self, text: str) -> np.ndarray:
         """
@@ -30,17 +87,172 @@ class BlockBuilder:
         Returns:
             np.ndarray: Embedding vector
         """
-        return self.model.encode(text)
+        if self.cache is not None:
+            embedding = self.cache.get(self.model_name, text)
+            if embedding is not None:
+                return embedding
+                
+        embedding = self.model.encode(text)
+        
+        if self.cache is not None:
+            self.cache.put(self.model_name, text, embedding)
+        return embedding
+    
+    def create_embeddings(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Generate embeddings for several texts in batched model calls.
+        
+        Args:
+            texts: Texts to generate embeddings for
+            batch_size: Number of texts per model call (default: the builder's batch_size)
+            
+        Returns:
+            np.ndarray: Matrix with one embedding row per text
+        """
+        batch_size = batch_size or self.batch_size
+        if self.cache is None:
+            return self._encode(texts, batch_size)
+            
+        cached = self.cache.get_many(self.model_name, texts)
+        missing = list(dict.fromkeys(text for text, embedding in zip(texts, cached) if embedding is None))
+        if missing:
+            encoded = dict(zip(missing, self._encode(missing, batch_size)))
+            self.cache.put_many(self.model_name, missing, [encoded[text] for text in missing])
+            cached = [encoded[text] if embedding is None else embedding
+                      for text, embedding in zip(texts, cached)]
+        return np.vstack(cached) if cached else np.empty((0, 0), dtype=np.float32)
+    
+    def _encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """
+        Run the embedding model over a list of texts.
+        
+        Args:
+            texts: Texts to encode
+            batch_size: Number of texts per model call
+            
+        Returns:
+            np.ndarray: Matrix with one embedding row per text
+        """
+        # A single encode call sorts its own input, so the order only matters across shards
+        bucket = self.encoder is not None and self.bucket_by_length and len(texts) > 1
+        lengths = self._token_lengths(texts) if bucket or self.track_padding else None
+        if bucket:
+            # Longest first so every shard holds texts of similar length
+            order = np.argsort(-lengths, kind="stable")
+        else:
+            order = np.arange(len(texts))
+        if self.track_padding:
+            if self.encoder is not None:
+                call_size = self.encoder.shard_size_for(len(texts), batch_size)
+            else:
+                call_size = max(1, len(texts))
+            self._record_padding(lengths, order, batch_size, call_size)
+        
+        ordered_texts = [texts[i] for i in order]
+        if self.encoder is not None:
+            encoded = self.encoder.encode(ordered_texts, batch_size=batch_size)
+        else:
+            encoded = np.asarray(self.model.encode(ordered_texts, batch_size=batch_size))
+            
+        # Put the rows back in the caller's order
+        embeddings = np.empty_like(encoded)
+        embeddings[order] = encoded
+        return embeddings
+    
+    @staticmethod
+    def _whitespace_length(text: str) -> int:
+        """Estimate the token length of a text from its whitespace-separated words."""
+        return len(text.split())
+    
+    def _token_lengths(self, texts: List[str]) -> np.ndarray:
+        """
+        Get the number of tokens the model is fed for every text.
+        
+        Args:
+            texts: Texts to measure
+            
+        Returns:
+            np.ndarray: Token length of every text, capped at the model's input limit
+        """
+        if self.length_fn is not None:
+            return np.array([self.length_fn(text) for text in texts], dtype=np.int64)
+            
+        # The model is not loaded just to count tokens; without an encoder it is about to be
+        model = self._model if self.encoder is not None else self.model
+        tokenizer = getattr(model, "tokenizer", None)
+        max_length = getattr(model, "max_seq_length", None)
+        if tokenizer is None:
+            lengths = np.array([self._whitespace_length(text) for text in texts], dtype=np.int64)
+        else:
+            input_ids = tokenizer(list(texts), add_special_tokens=True, truncation=max_length is not None,
+                                  max_length=max_length, verbose=False)["input_ids"]
+            lengths = np.array([len(ids) for ids in input_ids], dtype=np.int64)
+        return np.minimum(lengths, max_length) if max_length else lengths
+    
+    def _record_padding(self, lengths: np.ndarray, order: np.ndarray, batch_size: int, call_size: int) -> None:
+        """
+        Accumulate padding statistics for the batches the model forms.
+        
+        Texts are passed to the model in the given order, call_size texts per
+        encode call; each call sorts its texts by length before batching them.
+        
+        Args:
+            lengths: Token length of every text
+            order: Order in which the texts are passed to the model
+            batch_size: Number of texts per batch
+            call_size: Number of texts per encode call (an encoder shard)
+        """
+        def padded_tokens(ordered: np.ndarray) -> int:
+            total = 0
+            for call_start in range(0, len(ordered), call_size):
+                call = np.sort(ordered[call_start:call_start + call_size])[::-1]
+                for start in range(0, len(call), batch_size):
+                    batch = call[start:start + batch_size]
+                    total += int(batch[0]) * len(batch)
+            return total
+            
+        stats = self.encoding_stats
+        stats["texts"] += len(lengths)
+        stats["batches"] += sum(-(-min(call_size, len(lengths) - start) // batch_size)
+                                for start in range(0, len(lengths), call_size))
+        stats["tokens"] += int(lengths.sum())
+        stats["padded_tokens"] += padded_tokens(lengths[order])
+        stats["unbucketed_padded_tokens"] += padded_tokens(lengths)
+        
+    def padding_ratio(self) -> float:
+        """
+        Get the share of padding in the batches encoded so far, with track_padding on.
+        
+        Only bucketing across encoder shards changes it: a single encode call
+        already batches its texts by length.
+        
+        Returns:
+            float: Padding tokens divided by all tokens fed to the model (0.0 to 1.0)
+        """
+        padded = self.encoding_stats["padded_tokens"]
+        return 1.0 - self.encoding_stats["tokens"] / padded if padded else 0.0
+    
+    def reset_encoding_stats(self) -> None:
+        """Reset the batching statistics (collected with track_padding on)."""
+        self.encoding_stats = {
+            "texts": 0,
+            "batches": 0,
+            "tokens": 0,
+            "padded_tokens": 0,
+            "unbucketed_padded_tokens": 0
+        }
     
     def create_block(self, 
                     content: Union[str, List[str]], 
-                    metadata: Optional[Dict] = None) -> Dict:
+                    metadata: Optional[Dict] = None,
+                    batch_size: Optional[int] = None) -> Dict:
         """
         Create a block with embeddings and metadata.
         
         Args:
             content: Text or list of texts to generate embeddings for
             metadata: Additional metadata for the block
+            batch_size: Number of texts per model call (default: the builder's batch_size)
             
         Returns:
             Dict: Block with embeddings and metadata
@@ -48,43 +260,199 @@ class BlockBuilder:
         if isinstance(content, str):
             content = [content]
             
-        embeddings = [self.create_embedding(text) for text in content]
+        embeddings = self.create_embeddings(content, batch_size)
         
+        return self._assemble_block(content, embeddings, metadata)
+    
+    def create_blocks(self,
+                      documents: Iterable[Union[str, List[str], Tuple[Union[str, List[str]], Optional[Dict]]]],
+                      batch_size: Optional[int] = None) -> List[Dict]:
+        """
+        Create several blocks, encoding the texts of all blocks in shared batches.
+        
+        Args:
+            documents: Block contents, each either a text, a list of texts or a
+                (content, metadata) tuple
+            batch_size: Number of texts per model call (default: the builder's batch_size)
+            
+        Returns:
+            List[Dict]: One block per document, in input order
+        """
+        contents = []
+        metadatas = []
+        for document in documents:
+            if isinstance(document, tuple):
+                content, metadata = document
+            else:
+                content, metadata = document, None
+            if isinstance(content, str):
+                content = [content]
+            contents.append(list(content))
+            metadatas.append(metadata)
+            
+        # Encode every text in one pass, then split the rows back per block
+        texts = [text for content in contents for text in content]
+        if not texts:
+            return []
+        embeddings = self.create_embeddings(texts, batch_size)
+        
+        blocks = []
+        offset = 0
+        for content, metadata in zip(contents, metadatas):
+            block_embeddings = embeddings[offset:offset + len(content)]
+            offset += len(content)
+            blocks.append(self._assemble_block(content, block_embeddings, metadata))
+            
+        return blocks
+    
+    def create_document_block(self,
+                              text: str,
+                              metadata: Optional[Dict] = None,
+                              chunker: Optional[TokenWindowChunker] = None,
+                              pooled: bool = False,
+                              batch_size: Optional[int] = None) -> Dict:
+        """
+        Create a block covering a whole document, however long.
+        
+        The document is split into overlapping token windows sized to the
+        model, so nothing is lost to truncation. The windows become the block's
+        content and are encoded in batches; their character offsets are stored
+        in metadata["chunks"].
+        
+        Args:
+            text: Document text
+            metadata: Additional metadata for the block
+            chunker: Chunker to split the document with (default: sized to the model)
+            pooled: Also store a token-weighted mean of the window embeddings
+                as "document_embedding"
+            batch_size: Number of texts per model call (default: the builder's batch_size)
+            
+        Returns:
+            Dict: Block with one embedding per window
+        """
+        chunker = chunker or TokenWindowChunker.for_model(self.model)
+        windows = chunker.chunk(text)
+        if not windows:
+            raise ValueError("Document has no text to embed")
+            
+        content = [window["text"] for window in windows]
+        embeddings = self.create_embeddings(content, batch_size)
+        
+        metadata = dict(metadata or {})
+        metadata["chunks"] = [
+            {"start": window["start"], "end": window["end"], "tokens": window["tokens"]}
+            for window in windows
+        ]
+        block = self._assemble_block(content, embeddings, metadata)
+        
+        if pooled:
+            weights = np.array([window["tokens"] for window in windows], dtype=np.float64)
+            document_embedding = (embeddings * weights[:, None]).sum(axis=0) / weights.sum()
+            block["document_embedding"] = document_embedding.astype(embeddings.dtype).tolist()
+            
+        return block
+    
+    def _assemble_block(self, content: List[str], embeddings: np.ndarray, metadata: Optional[Dict]) -> Dict:
+        """
+        Build the block dictionary for already encoded content.
+        
+        Args:
+            content: Texts of the block
+            embeddings: Embedding matrix with one row per text
+            metadata: Additional metadata for the block
+            
+        Returns:
+            Dict: Block with embeddings and metadata
+        """
+        if self.embedding_dtype:
+            stored_embeddings = encode_embeddings(embeddings, self.embedding_dtype)
+        else:
+            stored_embeddings = [emb.tolist() for emb in embeddings]
+            
         block = {
             "version": "1.0",
             "timestamp": int(time.time()),
             "datetime": datetime.utcnow().isoformat(),
             "model": {
                 "name": self.model_name,
-                "dimensions": embeddings[0].shape[0]
+                "dimensions": int(embeddings.shape[1])
             },
-            "embeddings": [emb.tolist() for emb in embeddings],
+            "embeddings": stored_embeddings,
             "content": content,
             "metadata": metadata or {}
         }
         
         return block
     
-    def save_block(self, block: Dict, filepath: str) -> None:
+    @staticmethod
+    def get_embeddings(block: Dict) -> np.ndarray:
         """
-        Save a block to a JSON file.
+        Get a block's embeddings as a float32 matrix, whatever their stored encoding.
+        
+        Args:
+            block: Block to read
+            
+        Returns:
+            np.ndarray: Matrix with one embedding row per text
+        """
+        return decode_embeddings(block["embeddings"])
+    
+    def save_block(self,
+                   block: Dict,
+                   filepath: Union[str, BlockArchive],
+                   indent: Optional[int] = 2,
+                   format: Optional[str] = None) -> Optional[str]:
+        """
+        Save a block to a JSON file, a binary block container or a block archive.
         
         Args:
             block: Block to save
-            filepath: Path to save the file
+            filepath: Path to save the file, or a BlockArchive to append to
+            indent: JSON indentation, or None for compact output
+            format: "json" or "binary" (default: binary for .ceb files, JSON otherwise)
+            
+        Returns:
+            Optional[str]: The block's id in the archive, when saving to a BlockArchive
         """
+        if isinstance(filepath, BlockArchive):
+            return filepath.append(block)
+        if format is None:
+            format = "binary" if filepath.endswith(FILE_EXTENSION) else "json"
+        if format == "binary":
+            with open(filepath, 'wb') as f:
+                f.write(pack_block(block))
+            return
+            
+        separators = (',', ':') if indent is None else None
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(block, f, indent=2)
+            json.dump(block, f, indent=indent, separators=separators)
             
-    def load_block(self, filepath: str) -> Dict:
+    def load_block(self,
+                   filepath: Union[str, BlockArchive],
+                   as_array: bool = False,
+                   block_id: Optional[str] = None) -> Dict:
         """
-        Load a block from a JSON file.
+        Load a block from a JSON file, a binary block container or a block archive.
+        
+        The file format is detected from its contents. Encoded embeddings are
+        returned as stored, so the block still verifies against its signature;
+        use get_embeddings to decode them.
         
         Args:
-            filepath: Path to load the file from
+            filepath: Path to load the file from, or a BlockArchive to read from
+            as_array: Return the embeddings of a binary container or archive as a
+                numpy matrix, a zero-copy view of the file data for float payloads
+            block_id: Id of the block to load from an archive
             
         Returns:
             Dict: Loaded block
         """
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        if isinstance(filepath, BlockArchive):
+            if block_id is None:
+                raise ValueError("block_id is required to load from a block archive")
+            return filepath.get(block_id, as_array=as_array)
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        if is_container(data):
+            return unpack_block(data, as_array=as_array)
+        return json.loads(data.decode('utf-8'))
@@ -0,0 +1,133 @@
+# Handles the binary block container format
+
+import base64
+import json
+import struct
+from typing import Any, Dict, Tuple
+
+import numpy as np
+from .embedding_codec import DTYPES, is_encoded, decode_embeddings
+
+MAGIC = b"CEBK"
+FORMAT_VERSION = 1
+FILE_EXTENSION = ".ceb"
+
+# magic, version, flags, reserved, metadata length, payload offset, payload length
+_HEADER = struct.Struct("<4sBBHIQQ")
+_ALIGNMENT = 64
+
+def is_container(data: bytes) -> bool:
+    """Check whether bytes start with a block container header."""
+    return data[:len(MAGIC)] == MAGIC
+
+def _all_floats(rows: Any) -> bool:
+    """Check that embeddings are equal-length lists of Python floats."""
+    if not isinstance(rows, list) or not rows or not all(isinstance(row, list) for row in rows):
+        return False
+    width = len(rows[0])
+    return all(len(row) == width and all(type(value) is float for value in row) for row in rows)
+
+def split_embeddings(embeddings: Any) -> Tuple[Dict, bytes]:
+    """
+    Turn a block's embeddings field into a descriptor and a raw payload.
+
+    Returns:
+        Tuple[Dict, bytes]: Descriptor stored with the metadata, and payload bytes
+    """
+    if is_encoded(embeddings):
+        descriptor = {k: v for k, v in embeddings.items() if k != "data"}
+        descriptor["form"] = "encoded"
+        return descriptor, base64.b64decode(embeddings["data"])
+
+    if isinstance(embeddings, np.ndarray) and embeddings.dtype.kind == "f":
+        matrix = embeddings
+        form = "array"
+    elif _all_floats(embeddings):
+        matrix = np.asarray(embeddings, dtype=np.float64)
+        # float32 is lossless for model output; keep float64 for anything else
+        narrowed = matrix.astype(np.float32)
+        if np.array_equal(narrowed.astype(np.float64), matrix):
+            matrix = narrowed
+        form = "list"
+    else:
+        # Ragged or non-float embeddings stay in the metadata section
+        return {"form": "inline"}, b""
+
+    stored_dtype = matrix.dtype.newbyteorder("<").str
+    matrix = np.ascontiguousarray(matrix, dtype=stored_dtype)
+    descriptor = {"form": form, "stored_dtype": stored_dtype, "shape": list(matrix.shape)}
+    return descriptor, matrix.tobytes()
+
+def pack_block(block: Dict) -> bytes:
+    """
+    Serialize a block to the binary container format.
+
+    The container holds a fixed header, a compact JSON metadata section with
+    every field but the embeddings, and the raw embedding bytes aligned to
+    64 bytes.
+
+    Args:
+        block: Block to serialize
+
+    Returns:
+        bytes: Container bytes
+    """
+    descriptor, payload = split_embeddings(block.get("embeddings"))
+    fields = {k: v for k, v in block.items() if k != "embeddings" or descriptor["form"] == "inline"}
+    metadata = json.dumps(
+        {"block": fields, "embeddings": descriptor if "embeddings" in block else None},
+        separators=(",", ":")
+    ).encode("utf-8")
+
+    metadata_end = _HEADER.size + len(metadata)
+    payload_offset = -(-metadata_end // _ALIGNMENT) * _ALIGNMENT
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, 0, len(metadata), payload_offset, len(payload))
+    return b"".join([header, metadata, b"\0" * (payload_offset - metadata_end), payload])
+
+def unpack_block(data: bytes, as_array: bool = False) -> Dict:
+    """
+    Deserialize a block from the binary container format.
+
+    Args:
+        data: Container bytes
+        as_array: Return embeddings as a numpy matrix instead of their JSON form.
+            Float payloads are returned as a zero-copy view of data.
+
+    Returns:
+        Dict: The block, identical to its JSON form unless as_array is set
+    """
+    if len(data) < _HEADER.size or not is_container(data):
+        raise ValueError("Not a block container")
+    magic, version, flags, reserved, metadata_length, payload_offset, payload_length = \
+        _HEADER.unpack_from(data)
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported block container version: {version}")
+
+    metadata_start = _HEADER.size
+    metadata = json.loads(bytes(data[metadata_start:metadata_start + metadata_length]).decode("utf-8"))
+    block = metadata["block"]
+    descriptor = metadata["embeddings"]
+    if descriptor is None or descriptor["form"] == "inline":
+        if as_array and "embeddings" in block:
+            block["embeddings"] = decode_embeddings(block["embeddings"])
+        return block
+
+    if descriptor["form"] == "encoded":
+        stored_dtype = DTYPES[descriptor["dtype"]]
+    else:
+        stored_dtype = descriptor["stored_dtype"]
+    matrix = np.frombuffer(data, dtype=stored_dtype, count=payload_length // np.dtype(stored_dtype).itemsize,
+                           offset=payload_offset).reshape(descriptor["shape"])
+
+    if descriptor["form"] == "encoded":
+        encoded = {k: v for k, v in descriptor.items() if k != "form"}
+        encoded["data"] = base64.b64encode(matrix.tobytes()).decode("ascii")
+        if as_array:
+            block["embeddings"] = matrix if descriptor["dtype"] != "int8" else decode_embeddings(encoded)
+        else:
+            block["embeddings"] = encoded
+    elif as_array:
+        block["embeddings"] = matrix
+    else:
+        block["embeddings"] = matrix.tolist()
+    return block
@@ -0,0 +1,104 @@
+# Handles splitting documents into token windows
+
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_WORD_PATTERN = re.compile(r"\S+")
+
+class TokenWindowChunker:
+    """
+    Splits text into overlapping token windows that fit the embedding model.
+
+    Token boundaries come from the model's tokenizer when it can report
+    character offsets (HuggingFace fast tokenizers), and from whitespace
+    otherwise. Each window keeps the character span it covers in the
+    original text.
+    """
+
+    def __init__(self, tokenizer: Any = None, window_size: int = 256, overlap: int = 32):
+        """
+        Initialize the chunker.
+
+        Args:
+            tokenizer: HuggingFace tokenizer used to find token boundaries (optional)
+            window_size: Maximum number of tokens per window
+            overlap: Number of tokens shared by consecutive windows
+        """
+        if window_size <= 0:
+            raise ValueError("window_size must be positive")
+        if not 0 <= overlap < window_size:
+            raise ValueError("overlap must be between 0 and window_size - 1")
+        self.tokenizer = tokenizer
+        self.window_size = window_size
+        self.overlap = overlap
+
+    @classmethod
+    def for_model(cls, model: Any, overlap: int = 32, window_size: Optional[int] = None) -> "TokenWindowChunker":
+        """
+        Create a chunker sized to a SentenceTransformers model.
+
+        Args:
+            model: The embedding model
+            overlap: Number of tokens shared by consecutive windows
+            window_size: Window size override (default: the model's max_seq_length)
+
+        Returns:
+            TokenWindowChunker: Chunker matching the model's input limit
+        """
+        if window_size is None:
+            max_length = getattr(model, "max_seq_length", None) or 256
+            # Leave room for the special tokens the model adds around each input
+            window_size = max(1, max_length - 2)
+        tokenizer = getattr(model, "tokenizer", None)
+        return cls(tokenizer=tokenizer, window_size=window_size, overlap=min(overlap, window_size // 2))
+
+    def token_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Get the character span of every token in a text.
+
+        Args:
+            text: Text to tokenize
+
+        Returns:
+            List[Tuple[int, int]]: (start, end) character offsets per token
+        """
+        if self.tokenizer is not None:
+            try:
+                encoding = self.tokenizer(text, add_special_tokens=False,
+                                          return_offsets_mapping=True, verbose=False)
+                return [tuple(span) for span in encoding["offset_mapping"]]
+            except (TypeError, KeyError, NotImplementedError):
+                # Slow tokenizers cannot report offsets
+                pass
+        return [match.span() for match in _WORD_PATTERN.finditer(text)]
+
+    def chunk(self, text: str) -> List[Dict]:
+        """
+        Split a text into overlapping token windows.
+
+        Args:
+            text: Text to split
+
+        Returns:
+            List[Dict]: Windows with their text, character span and token count
+        """
+        spans = self.token_spans(text)
+        windows = []
+        step = self.window_size - self.overlap
+        for first in range(0, len(spans), step):
+            last = min(first + self.window_size, len(spans))
+            start, end = spans[first][0], spans[last - 1][1]
+            windows.append({
+                "text": text[start:end],
+                "start": start,
+                "end": end,
+                "tokens": last - first
+            })
+            if last == len(spans):
+                break
+        return windows
+
+    def split(self, text: str) -> Iterator[str]:
+        """Yield the text of every window."""
+        for window in self.chunk(text):
+            yield window["text"]
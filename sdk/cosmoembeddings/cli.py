@@ -2,14 +2,19 @@ import argparse
 import json
 import os
 import sys
+import time
 from typing import Dict, List, Optional
-from .block_builder import BlockBuilder
-from .signer import Signer
-from .validator import CosmoValidator
+
+# Subcommands import what they need, so the CLI starts without loading the
+# embedding model or astronomy stacks it may not use
 
 def create_block(args):
     """Create a new block with embeddings."""
-    builder = BlockBuilder(model_name=args.model)
+    from .block_builder import BlockBuilder
+    from .signer import Signer
+    from .validator import CosmoValidator
+    
+    builder = BlockBuilder(model_name=args.model, embedding_dtype=args.embedding_dtype)
     
     # Read content from file or use direct input
     if args.input_file:
@@ -30,7 +35,7 @@ def create_block(args):
     
     # Sign block if requested
     if args.sign:
-        signer = Signer()
+        signer = Signer(scheme=args.signature_scheme)
         block = signer.sign_block(block)
         
     # Validate block with cosmo signature if requested
@@ -48,14 +53,69 @@ def create_block(args):
     else:
         print(json.dumps(block, indent=2))
         
+def ingest_corpus(args):
+    """Stream a corpus into blocks, one JSON block per output line."""
+    from .block_builder import BlockBuilder
+    from .encoding_pool import EncodingPool
+    from .pipeline import BlockPipeline
+    from .signer import Signer
+    from .validator import CosmoValidator
+    
+    encoder = EncodingPool(args.model, workers=args.workers) if args.workers > 1 else None
+    builder = BlockBuilder(model_name=args.model, batch_size=args.batch_size, encoder=encoder,
+                           embedding_dtype=args.embedding_dtype)
+    signer = Signer(scheme=args.signature_scheme) if args.sign else None
+    validator = CosmoValidator(args.latitude, args.longitude, args.elevation,
+                               refresh_interval=args.sky_refresh) if args.validate else None
+    pipeline = BlockPipeline(
+        builder,
+        signer=signer,
+        validator=validator,
+        chunk_size=args.chunk_size,
+        chunks_per_block=args.chunks_per_block,
+        text_field=args.text_field
+    )
+    
+    output = open(args.output_file, 'w', encoding='utf-8') if args.output_file else sys.stdout
+    count = 0
+    try:
+        for block in pipeline.run(args.input):
+            output.write(json.dumps(block) + "\n")
+            count += 1
+    finally:
+        if args.output_file:
+            output.close()
+        if encoder is not None:
+            encoder.close()
+        if validator is not None:
+            validator.stop_refresher()
+            
+    if args.output_file:
+        print(f"{count} blocks saved to {args.output_file}")
+        
 def verify_block(args):
     """Verify a block's signature and cosmo validation."""
-    # Load block from file
-    with open(args.block_file, 'r', encoding='utf-8') as f:
-        block = json.load(f)
+    from .block_archive import BlockArchive
+    from .block_builder import BlockBuilder
+    
+    # Load block from a JSON file, a binary container or an archive directory
+    builder = BlockBuilder()
+    if os.path.isdir(args.block_file):
+        if args.block_id is None:
+            print("--block-id is required to verify a block of an archive")
+            sys.exit(1)
+        with BlockArchive(args.block_file, readonly=True) as archive:
+            try:
+                block = builder.load_block(archive, block_id=args.block_id)
+            except KeyError:
+                print(f"Block {args.block_id} not found in {args.block_file}")
+                sys.exit(1)
+    else:
+        block = builder.load_block(args.block_file)
         
     # Verify Ed25519 signature if present
     if "signature" in block and "public_key" in block:
+        from .signer import Signer
         signer = Signer()
         if signer.verify_block(block):
             print("Ed25519 signature: VALID")
@@ -66,6 +126,7 @@ def verify_block(args):
         
     # Verify cosmo signature if present
     if "cosmo_signature" in block and "cosmo_hash" in block:
+        from .validator import CosmoValidator
         validator = CosmoValidator(args.latitude, args.longitude, args.elevation)
         is_valid, reason = validator.verify_cosmo_signature(block)
         print(f"Cosmo signature: {'VALID' if is_valid else 'INVALID'}")
@@ -74,6 +135,18 @@ def verify_block(args):
     else:
         print("Cosmo signature: NOT FOUND")
         
+def build_sky_table(args):
+    """Precompute the celestial signatures of a location."""
+    from .sky_table import SkyTable
+    from .validator import CosmoValidator
+    
+    start = args.start if args.start is not None else time.time()
+    validator = CosmoValidator(args.latitude, args.longitude, args.elevation,
+                               ephemeris_path=args.ephemeris_path)
+    table = SkyTable.compute(validator, start, start + args.hours * 3600, step=args.step)
+    table.save(args.output_file)
+    print(f"{len(table)} signatures from {table.start:.0f} to {table.end:.0f} saved to {args.output_file}")
+    
 def main():
     """Main entry point for the CLI."""
     parser = argparse.ArgumentParser(description="CosmoEmbeddings CLI")
@@ -82,25 +155,69 @@ def main():
     # Create block command
     create_parser = subparsers.add_parser("create", help="Create a new block")
     create_parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Model to use for embeddings")
+    create_parser.add_argument("--embedding-dtype", choices=["float32", "float16", "int8"],
+                               help="Store embeddings as base64 binary of this type")
     create_parser.add_argument("--content", help="Content to create embeddings for")
     create_parser.add_argument("--input-file", help="File containing content to create embeddings for")
     create_parser.add_argument("--output-file", help="File to save the block to")
     create_parser.add_argument("--metadata", nargs="+", help="Metadata in key=value format")
     create_parser.add_argument("--sign", action="store_true", help="Sign the block with Ed25519")
+    create_parser.add_argument("--signature-scheme", choices=["legacy", "digest-v1", "merkle-v1"],
+                               default="legacy",
+                               help="Scheme of new signatures (digest-v1 hashes raw embedding bytes, "
+                                    "merkle-v1 signs each batch once)")
     create_parser.add_argument("--validate", action="store_true", help="Validate the block with cosmo signature")
     create_parser.add_argument("--latitude", type=float, default=0.0, help="Latitude for cosmo validation")
     create_parser.add_argument("--longitude", type=float, default=0.0, help="Longitude for cosmo validation")
     create_parser.add_argument("--elevation", type=float, default=0.0, help="Elevation for cosmo validation")
     create_parser.set_defaults(func=create_block)
     
+    # Ingest corpus command
+    ingest_parser = subparsers.add_parser("ingest", help="Stream a corpus into blocks")
+    ingest_parser.add_argument("input", help="Text file, JSON-lines file or directory to ingest")
+    ingest_parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Model to use for embeddings")
+    ingest_parser.add_argument("--embedding-dtype", choices=["float32", "float16", "int8"],
+                               help="Store embeddings as base64 binary of this type")
+    ingest_parser.add_argument("--output-file", help="JSON-lines file to write the blocks to")
+    ingest_parser.add_argument("--batch-size", type=int, default=64, help="Number of texts encoded together")
+    ingest_parser.add_argument("--workers", type=int, default=1, help="Number of encoding worker processes")
+    ingest_parser.add_argument("--chunk-size", type=int, default=1000, help="Maximum chunk length in characters")
+    ingest_parser.add_argument("--chunks-per-block", type=int, default=1, help="Maximum chunks of one document per block")
+    ingest_parser.add_argument("--text-field", default="text", help="Field holding the text in JSON-lines records")
+    ingest_parser.add_argument("--sign", action="store_true", help="Sign the blocks with Ed25519")
+    ingest_parser.add_argument("--signature-scheme", choices=["legacy", "digest-v1", "merkle-v1"],
+                               default="legacy",
+                               help="Scheme of new signatures (digest-v1 hashes raw embedding bytes, "
+                                    "merkle-v1 signs each batch once)")
+    ingest_parser.add_argument("--validate", action="store_true", help="Stamp the blocks with a cosmo signature")
+    ingest_parser.add_argument("--latitude", type=float, default=0.0, help="Latitude for cosmo validation")
+    ingest_parser.add_argument("--longitude", type=float, default=0.0, help="Longitude for cosmo validation")
+    ingest_parser.add_argument("--elevation", type=float, default=0.0, help="Elevation for cosmo validation")
+    ingest_parser.add_argument("--sky-refresh", type=float, metavar="SECONDS",
+                               help="Stamp blocks from a cosmo signature refreshed this often in the background")
+    ingest_parser.set_defaults(func=ingest_corpus)
+    
     # Verify block command
     verify_parser = subparsers.add_parser("verify", help="Verify a block")
-    verify_parser.add_argument("block_file", help="File containing the block to verify")
+    verify_parser.add_argument("block_file", help="JSON or .ceb file containing the block, or a block archive directory")
+    verify_parser.add_argument("--block-id", help="Id of the block to verify in a block archive")
     verify_parser.add_argument("--latitude", type=float, default=0.0, help="Latitude for cosmo validation")
     verify_parser.add_argument("--longitude", type=float, default=0.0, help="Longitude for cosmo validation")
     verify_parser.add_argument("--elevation", type=float, default=0.0, help="Elevation for cosmo validation")
     verify_parser.set_defaults(func=verify_block)
     
+    # Precompute sky table command
+    sky_table_parser = subparsers.add_parser("sky-table", help="Precompute cosmo signatures for a location")
+    sky_table_parser.add_argument("output_file", help=".npz file to save the table to")
+    sky_table_parser.add_argument("--latitude", type=float, default=0.0, help="Latitude of the node")
+    sky_table_parser.add_argument("--longitude", type=float, default=0.0, help="Longitude of the node")
+    sky_table_parser.add_argument("--elevation", type=float, default=0.0, help="Elevation of the node")
+    sky_table_parser.add_argument("--start", type=float, help="First Unix timestamp (default: now)")
+    sky_table_parser.add_argument("--hours", type=float, default=24.0, help="Hours covered by the table")
+    sky_table_parser.add_argument("--step", type=float, default=10.0, help="Seconds between signatures")
+    sky_table_parser.add_argument("--ephemeris-path", help="Ephemeris file or directory")
+    sky_table_parser.set_defaults(func=build_sky_table)
+    
     args = parser.parse_args()
     
     if args.command is None:
@@ -23,6 +23,8 @@ class Config:
             "api_endpoint": "http://localhost:8080",
             "private_key": None,
             "public_key": None,
+            "ephemeris_path": None,  # de421.bsp in the working directory
+            "sky_table_path": None,  # Precomputed signatures of default_location (.npz)
             "cosmo_validation": {
                 "enabled": True,
                 "max_age_seconds": 300,  # 5 minutes
@@ -56,6 +58,13 @@ class Config:
             elev = float(os.environ.get("COSMIC_ELEVATION", "0.0"))
             self.config["default_location"] = (lat, lon, elev)
             
+        # Ephemeris configuration
+        if "COSMIC_EPHEMERIS_PATH" in os.environ:
+            self.config["ephemeris_path"] = os.environ["COSMIC_EPHEMERIS_PATH"]
+            
+        if "COSMIC_SKY_TABLE_PATH" in os.environ:
+            self.config["sky_table_path"] = os.environ["COSMIC_SKY_TABLE_PATH"]
+            
         # Key configuration
         if "COSMIC_PRIVATE_KEY" in os.environ:
             self.config["private_key"] = os.environ["COSMIC_PRIVATE_KEY"]
@@ -0,0 +1,187 @@
+# Handles constellation lookup
+
+import threading
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+DEFAULT_CONSTELLATION = "Orion"
+
+# Simplified sky regions: (min_ra, max_ra, min_dec, max_dec, constellation) in degrees.
+# The first matching rule wins.
+SIMPLE_RULES = (
+    (0, 30, -90, 90, "Andromeda"),
+    (30, 60, -90, 90, "Aries"),
+    (60, 90, -90, 90, "Taurus"),
+    (90, 120, -90, 90, "Gemini"),
+    (120, 150, -90, 90, "Cancer"),
+    (150, 180, -90, 90, "Leo"),
+    (180, 210, -90, 90, "Virgo"),
+    (210, 240, -90, 90, "Libra"),
+    (240, 270, -90, 90, "Scorpius"),
+    (270, 300, -90, 90, "Sagittarius"),
+    (300, 330, -90, 90, "Capricornus"),
+    (330, 360, -90, 90, "Aquarius"),
+    (0, 360, -90, -60, "Piscis Austrinus"),
+    (0, 360, -60, -30, "Grus"),
+    (0, 360, -30, 0, "Sculptor"),
+    (0, 360, 0, 30, "Cetus"),
+    (0, 360, 30, 60, "Perseus"),
+    (0, 360, 60, 90, "Cassiopeia")
+)
+
+Rule = Tuple[float, float, float, float, str]
+
+class ConstellationTable:
+    """
+    Constellation lookup through a precomputed RA/Dec grid.
+
+    The sky is divided into cells of step x step degrees, each holding the
+    index of its constellation, so a lookup of any number of coordinates is a
+    few array operations. Coordinates outside RA [0, 360) and Dec [-90, 90)
+    map to the default constellation. Any boundary source (simple rules, or
+    the IAU boundaries through skyfield) is rasterized into the same grid.
+    """
+
+    def __init__(self, codes: np.ndarray, names: Sequence[str], step: float = 1.0,
+                 default: str = DEFAULT_CONSTELLATION):
+        """
+        Initialize the table.
+
+        Args:
+            codes: Grid of indices into names, with shape (180 / step, 360 / step),
+                rows by increasing declination and columns by increasing right ascension
+            names: Constellation names
+            step: Cell size in degrees
+            default: Constellation of coordinates outside the grid
+        """
+        self.codes = np.asarray(codes)
+        self.names = list(names)
+        self.step = step
+        self.default = default
+        if default not in self.names:
+            self.names.append(default)
+        self.default_code = self.names.index(default)
+        self._names = np.array(self.names, dtype=object)
+
+    @classmethod
+    def from_function(cls,
+                      lookup: Callable[[np.ndarray, np.ndarray], Sequence[str]],
+                      step: float = 1.0,
+                      default: str = DEFAULT_CONSTELLATION) -> "ConstellationTable":
+        """
+        Rasterize a vectorized boundary function into a table.
+
+        Args:
+            lookup: Function mapping arrays of RA and Dec (degrees) to constellation names
+            step: Cell size in degrees; each cell takes the constellation at its center
+            default: Constellation of coordinates outside the grid
+
+        Returns:
+            ConstellationTable: The table
+        """
+        ra_centers = (np.arange(int(round(360 / step))) + 0.5) * step
+        dec_centers = (np.arange(int(round(180 / step))) + 0.5) * step - 90.0
+        ra_grid, dec_grid = np.meshgrid(ra_centers, dec_centers)
+        cell_names = np.asarray(lookup(ra_grid.ravel(), dec_grid.ravel()), dtype=object)
+        names, codes = np.unique(cell_names, return_inverse=True)
+        return cls(codes.reshape(ra_grid.shape).astype(np.int16), [str(name) for name in names], step, default)
+
+    @classmethod
+    def from_rules(cls,
+                   rules: Sequence[Rule] = SIMPLE_RULES,
+                   step: float = 1.0,
+                   default: str = DEFAULT_CONSTELLATION) -> "ConstellationTable":
+        """
+        Build a table from (min_ra, max_ra, min_dec, max_dec, name) rules, first match first.
+
+        The table is exact when every rule boundary is a multiple of step.
+
+        Args:
+            rules: Sky regions in degrees
+            step: Cell size in degrees
+            default: Constellation where no rule matches
+
+        Returns:
+            ConstellationTable: The table
+        """
+        def lookup(ra: np.ndarray, dec: np.ndarray) -> np.ndarray:
+            result = np.full(ra.shape, default, dtype=object)
+            unmatched = np.ones(ra.shape, dtype=bool)
+            for min_ra, max_ra, min_dec, max_dec, name in rules:
+                match = unmatched & (min_ra <= ra) & (ra < max_ra) & (min_dec <= dec) & (dec < max_dec)
+                result[match] = name
+                unmatched &= ~match
+            return result
+        return cls.from_function(lookup, step, default)
+
+    @classmethod
+    def from_skyfield(cls, step: float = 0.25, default: str = DEFAULT_CONSTELLATION) -> "ConstellationTable":
+        """
+        Build a table from the IAU constellation boundaries bundled with skyfield.
+
+        Args:
+            step: Cell size in degrees
+            default: Constellation of coordinates outside the grid
+
+        Returns:
+            ConstellationTable: The table, with full constellation names
+        """
+        from skyfield.api import load_constellation_map, load_constellation_names
+        from skyfield.positionlib import position_of_radec
+
+        constellation_at = load_constellation_map()
+        full_names = dict(load_constellation_names())
+
+        def lookup(ra: np.ndarray, dec: np.ndarray) -> List[str]:
+            abbreviations = constellation_at(position_of_radec(ra / 15.0, dec))
+            return [full_names[abbreviation] for abbreviation in abbreviations]
+        return cls.from_function(lookup, step, default)
+
+    def lookup_codes(self, ra: Union[float, np.ndarray], dec: Union[float, np.ndarray]) -> np.ndarray:
+        """
+        Look up constellation indices.
+
+        Args:
+            ra: Right ascension(s) in degrees
+            dec: Declination(s) in degrees
+
+        Returns:
+            np.ndarray: Indices into names, shaped like the inputs
+        """
+        ra = np.asarray(ra, dtype=np.float64)
+        dec = np.asarray(dec, dtype=np.float64)
+        rows, columns = self.codes.shape
+        inside = (ra >= 0.0) & (ra < 360.0) & (dec >= -90.0) & (dec < 90.0)
+        column = np.clip(np.floor(np.where(inside, ra, 0.0) / self.step).astype(np.int64), 0, columns - 1)
+        row = np.clip(np.floor((np.where(inside, dec, 0.0) + 90.0) / self.step).astype(np.int64), 0, rows - 1)
+        return np.where(inside, self.codes[row, column], self.default_code)
+
+    def lookup(self, ra: Union[float, np.ndarray], dec: Union[float, np.ndarray]) -> np.ndarray:
+        """
+        Look up constellation names.
+
+        Args:
+            ra: Right ascension(s) in degrees
+            dec: Declination(s) in degrees
+
+        Returns:
+            np.ndarray: Object array of names, shaped like the inputs
+        """
+        return self._names[self.lookup_codes(ra, dec)]
+
+    def lookup_one(self, ra: float, dec: float) -> str:
+        """Look up the constellation of a single position."""
+        return self.names[int(self.lookup_codes(ra, dec))]
+
+_default_table: Optional[ConstellationTable] = None
+_lock = threading.Lock()
+
+def default_table() -> ConstellationTable:
+    """Get the process-wide table of the simple constellation rules."""
+    global _default_table
+    if _default_table is None:
+        with _lock:
+            if _default_table is None:
+                _default_table = ConstellationTable.from_rules()
+    return _default_table
@@ -1,240 +0,0 @@
-import requests
-import json
-import time
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime
-import math
-
-class CosmoSignatureGenerator:
-    """Generates cosmo signatures using real astronomical data."""
-    
-    def __init__(self, api_key: Optional[str] = None):
-        """
-        Initialize the cosmo signature generator.
-        
-        Args:
-            api_key: API key for astronomical data services (optional)
-        """
-        self.api_key = api_key
-        
-    def get_star_positions(self, 
-                          latitude: float, 
-                          longitude: float, 
-                          elevation: float = 0.0,
-                          timestamp: Optional[float] = None) -> List[Dict]:
-        """
-        Get star positions from an astronomical API.
-        
-        Args:
-            latitude: Latitude in degrees
-            longitude: Longitude in degrees
-            elevation: Elevation in meters (default: 0.0)
-            timestamp: Unix timestamp (default: current time)
-            
-        Returns:
-            List[Dict]: List of star positions with magnitude and coordinates
-        """
-        # Use current time if no timestamp provided
-        if timestamp is None:
-            timestamp = time.time()
-            
-        # Format the date for the API
-        date = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%dT%H:%M:%S")
-        
-        # Construct the API URL
-        # Note: This is a placeholder. We need to integrate with a real astronomical API
-        # such as Astronomy API, Stellarium Web API, or similar
-        url = f"https://api.astronomyapi.com/v1/objects/stars"
-        
-        params = {
-            "latitude": latitude,
-            "longitude": longitude,
-            "elevation": elevation,
-            "date": date,
-            "format": "json"
-        }
-        
-        headers = {}
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
-            
-        try:
-            response = requests.get(url, params=params, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Extract star positions from the response
-            # This is a placeholder. The actual response format will depend on the API used
-            stars = []
-            for star in data.get("stars", []):
-                stars.append({
-                    "name": star.get("name", ""),
-                    "magnitude": star.get("magnitude", 0.0),
-                    "ra": star.get("ra", 0.0),  # Right ascension
-                    "dec": star.get("dec", 0.0),  # Declination
-                    "distance": star.get("distance", 0.0)  # Distance in light years
-                })
-                
-            return stars
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching star positions: {e}")
-            # Return a fallback set of stars for testing
-            return self._get_fallback_stars()
-            
-    def _get_fallback_stars(self) -> List[Dict]:
-        """
-        Get a fallback set of stars for testing when the API is unavailable.
-        
-        Returns:
-            List[Dict]: List of star positions
-        """
-        return [
-            {"name": "Sirius", "magnitude": -1.46, "ra": 101.2874, "dec": -16.7161, "distance": 8.6},
-            {"name": "Canopus", "magnitude": -0.74, "ra": 95.9879, "dec": -52.6957, "distance": 310.0},
-            {"name": "Arcturus", "magnitude": -0.05, "ra": 213.9153, "dec": 19.1824, "distance": 36.7},
-            {"name": "Vega", "magnitude": 0.03, "ra": 279.2347, "dec": 38.7837, "distance": 25.0},
-            {"name": "Capella", "magnitude": 0.08, "ra": 79.1723, "dec": 45.9980, "distance": 42.2},
-            {"name": "Rigel", "magnitude": 0.12, "ra": 78.6345, "dec": -8.2016, "distance": 860.0},
-            {"name": "Procyon", "magnitude": 0.34, "ra": 114.8255, "dec": 5.2250, "distance": 11.4},
-            {"name": "Achernar", "magnitude": 0.46, "ra": 24.4285, "dec": -57.2368, "distance": 139.0},
-            {"name": "Betelgeuse", "magnitude": 0.50, "ra": 88.7929, "dec": 7.4071, "distance": 642.0},
-            {"name": "Hadar", "magnitude": 0.61, "ra": 210.9559, "dec": -60.3738, "distance": 390.0}
-        ]
-        
-    def generate_signature(self, 
-                          latitude: float, 
-                          longitude: float, 
-                          elevation: float = 0.0,
-                          timestamp: Optional[float] = None,
-                          num_stars: int = 5) -> str:
-        """
-        Generate a cosmo signature based on star positions.
-        
-        Args:
-            latitude: Latitude in degrees
-            longitude: Longitude in degrees
-            elevation: Elevation in meters (default: 0.0)
-            timestamp: Unix timestamp (default: current time)
-            num_stars: Number of stars to include in the signature (default: 5)
-            
-        Returns:
-            str: Cosmo signature string
-        """
-        # Get star positions
-        stars = self.get_star_positions(latitude, longitude, elevation, timestamp)
-        
-        # Sort stars by magnitude (brightest first)
-        stars.sort(key=lambda x: x["magnitude"])
-        
-        # Take the top N stars
-        top_stars = stars[:num_stars]
-        
-        # Create a signature string
-        # Format: ConstellationName-BrightestStarMagnitude
-        # Example: Orion-127.5
-        if top_stars:
-            # Get the constellation of the brightest star
-            constellation = self._get_constellation(top_stars[0]["ra"], top_stars[0]["dec"])
-            
-            # Get the magnitude of the brightest star
-            magnitude = top_stars[0]["magnitude"]
-            
-            # Format the signature
-            signature = f"{constellation}-{abs(magnitude):.1f}"
-            
-            return signature
-        else:
-            # Fallback if no stars are available
-            return "Unknown-0.0"
-            
-    def _get_constellation(self, ra: float, dec: float) -> str:
-        """
-        Get the constellation name for given coordinates.
-        
-        Args:
-            ra: Right ascension in degrees
-            dec: Declination in degrees
-            
-        Returns:
-            str: Constellation name
-        """
-        # This is a simplified implementation
-        # A real implementation would use a proper constellation database
-        
-        # Map coordinates to constellations
-        # Format: (min_ra, max_ra, min_dec, max_dec, constellation)
-        constellations = [
-            (0, 30, -90, 90, "Andromeda"),
-            (30, 60, -90, 90, "Aries"),
-            (60, 90, -90, 90, "Taurus"),
-            (90, 120, -90, 90, "Gemini"),
-            (120, 150, -90, 90, "Cancer"),
-            (150, 180, -90, 90, "Leo"),
-            (180, 210, -90, 90, "Virgo"),
-            (210, 240, -90, 90, "Libra"),
-            (240, 270, -90, 90, "Scorpius"),
-            (270, 300, -90, 90, "Sagittarius"),
-            (300, 330, -90, 90, "Capricornus"),
-            (330, 360, -90, 90, "Aquarius"),
-            (0, 360, -90, -60, "Piscis Austrinus"),
-            (0, 360, -60, -30, "Grus"),
-            (0, 360, -30, 0, "Sculptor"),
-            (0, 360, 0, 30, "Cetus"),
-            (0, 360, 30, 60, "Perseus"),
-            (0, 360, 60, 90, "Cassiopeia")
-        ]
-        
-        for min_ra, max_ra, min_dec, max_dec, constellation in constellations:
-            if min_ra <= ra < max_ra and min_dec <= dec < max_dec:
-                return constellation
-                
-        # Default to a common constellation if no match
-        return "Orion"
-        
-    def verify_signature(self, 
-                        signature: str, 
-                        latitude: float, 
-                        longitude: float, 
-                        elevation: float = 0.0,
-                        timestamp: Optional[float] = None,
-                        tolerance: float = 0.5) -> bool:
-        """
-        Verify a cosmo signature against the current sky.
-        
-        Args:
-            signature: Cosmo signature to verify
-            latitude: Latitude in degrees
-            longitude: Longitude in degrees
-            elevation: Elevation in meters (default: 0.0)
-            timestamp: Unix timestamp (default: current time)
-            tolerance: Magnitude tolerance for verification (default: 0.5)
-            
-        Returns:
-            bool: True if the signature is valid, False otherwise
-        """
-        # Parse the signature
-        try:
-            constellation, magnitude_str = signature.split("-")
-            expected_magnitude = float(magnitude_str)
-        except (ValueError, AttributeError):
-            return False
-            
-        # Get current star positions
-        stars = self.get_star_positions(latitude, longitude, elevation, timestamp)
-        
-        # Find the brightest star in the expected constellation
-        brightest_in_constellation = None
-        for star in stars:
-            star_constellation = self._get_constellation(star["ra"], star["dec"])
-            if star_constellation == constellation:
-                if brightest_in_constellation is None or star["magnitude"] < brightest_in_constellation["magnitude"]:
-                    brightest_in_constellation = star
-                    
-        # If no star found in the expected constellation, verification fails
-        if brightest_in_constellation is None:
-            return False
-            
-        # Check if the magnitude is within the tolerance
-        actual_magnitude = abs(brightest_in_constellation["magnitude"])
-        return abs(actual_magnitude - expected_magnitude) <= tolerance 
\ No newline at end of file
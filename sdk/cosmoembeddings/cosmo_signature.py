@@ -0,0 +1,215 @@
+import json
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import math
+import numpy as np
+from .constellations import ConstellationTable, default_table
+from .star_catalog import StarCatalog, default_catalog
+from .star_fetch import StarDataFetcher
+
+class CosmoSignatureGenerator:
+    """
+    Generates cosmo signatures using real astronomical data.
+    
+    Star positions come from a local catalog by default, computed offline and
+    deterministically. An astronomical API is only queried when an API key is
+    configured, and the local catalog stands in when it fails.
+    """
+    
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 catalog: Optional[StarCatalog] = None,
+                 timeout: Tuple[float, float] = (3.05, 10.0),
+                 constellations: Optional[ConstellationTable] = None,
+                 fetcher: Optional[StarDataFetcher] = None):
+        """
+        Initialize the cosmo signature generator.
+        
+        Args:
+            api_key: API key for astronomical data services (optional)
+            catalog: Local star catalog (default: the brightest stars)
+            timeout: (connect, read) timeout of API requests in seconds
+            constellations: Constellation lookup table (default: the simple sky regions)
+            fetcher: Star data fetcher (default: one for the API key, if any)
+        """
+        self.api_key = api_key
+        self.catalog = catalog or default_catalog()
+        self.timeout = timeout
+        self.constellations = constellations or default_table()
+        if fetcher is None and api_key:
+            fetcher = StarDataFetcher(api_key, timeout=timeout)
+        self.fetcher = fetcher
+        
+    def get_star_positions(self, 
+                          latitude: float, 
+                          longitude: float, 
+                          elevation: float = 0.0,
+                          timestamp: Optional[float] = None) -> List[Dict]:
+        """
+        Get the positions of the stars above the observer's horizon.
+        
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            elevation: Elevation in meters (default: 0.0)
+            timestamp: Unix timestamp (default: current time)
+            
+        Returns:
+            List[Dict]: List of star positions with magnitude and coordinates
+        """
+        # Use current time if no timestamp provided
+        if timestamp is None:
+            timestamp = time.time()
+            
+        if self.fetcher is not None:
+            stars = self._fetch_star_positions(latitude, longitude, elevation, timestamp)
+            if stars:
+                return stars
+        return self.catalog.visible_stars(latitude, longitude, elevation, timestamp)
+    
+    def _fetch_star_positions(self,
+                              latitude: float,
+                              longitude: float,
+                              elevation: float,
+                              timestamp: float) -> List[Dict]:
+        """
+        Get star positions from an astronomical API.
+        
+        Returns:
+            List[Dict]: Star positions, or an empty list if there is no fetcher or the fetch failed
+        """
+        if self.fetcher is None:
+            return []
+        return self.fetcher.fetch(latitude, longitude, elevation, timestamp)
+    
+    def prefetch(self,
+                 latitude: float,
+                 longitude: float,
+                 elevation: float,
+                 timestamps: Sequence[float]) -> None:
+        """
+        Fetch the star positions of many timestamps concurrently, ahead of signing them.
+        
+        Does nothing without an API fetcher, since local positions need no fetching.
+        
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            elevation: Elevation in meters
+            timestamps: Unix timestamps
+        """
+        if self.fetcher is not None:
+            self.fetcher.prefetch(latitude, longitude, elevation, timestamps)
+        
+    def _star_arrays(self,
+                     latitude: float,
+                     longitude: float,
+                     elevation: float = 0.0,
+                     timestamp: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Get the visible stars' magnitudes and coordinates as arrays."""
+        if timestamp is None:
+            timestamp = time.time()
+        if self.fetcher is not None:
+            stars = self._fetch_star_positions(latitude, longitude, elevation, timestamp)
+            if stars:
+                return {field: np.array([star[field] for star in stars], dtype=np.float64)
+                        for field in ("magnitude", "ra", "dec")}
+        return self.catalog.visible(latitude, longitude, elevation, timestamp)
+        
+    def generate_signature(self, 
+                          latitude: float, 
+                          longitude: float, 
+                          elevation: float = 0.0,
+                          timestamp: Optional[float] = None,
+                          num_stars: int = 5) -> str:
+        """
+        Generate a cosmo signature based on star positions.
+        
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            elevation: Elevation in meters (default: 0.0)
+            timestamp: Unix timestamp (default: current time)
+            num_stars: Number of stars to include in the signature (default: 5)
+            
+        Returns:
+            str: Cosmo signature string
+        """
+        # Get star positions
+        stars = self._star_arrays(latitude, longitude, elevation, timestamp)
+        
+        # Create a signature string
+        # Format: ConstellationName-BrightestStarMagnitude
+        # Example: Orion-127.5
+        if len(stars["magnitude"]) and num_stars > 0:
+            # The brightest star (the first one on ties)
+            brightest = int(np.argmin(stars["magnitude"]))
+            
+            # Get the constellation of the brightest star
+            constellation = self.constellations.lookup_one(stars["ra"][brightest], stars["dec"][brightest])
+            
+            # Get the magnitude of the brightest star
+            magnitude = stars["magnitude"][brightest]
+            
+            # Format the signature
+            signature = f"{constellation}-{abs(magnitude):.1f}"
+            
+            return signature
+        else:
+            # Fallback if no stars are available
+            return "Unknown-0.0"
+            
+    def _get_constellation(self, ra: float, dec: float) -> str:
+        """
+        Get the constellation name for given coordinates.
+        
+        Args:
+            ra: Right ascension in degrees
+            dec: Declination in degrees
+            
+        Returns:
+            str: Constellation name
+        """
+        return self.constellations.lookup_one(ra, dec)
+        
+    def verify_signature(self, 
+                        signature: str, 
+                        latitude: float, 
+                        longitude: float, 
+                        elevation: float = 0.0,
+                        timestamp: Optional[float] = None,
+                        tolerance: float = 0.5) -> bool:
+        """
+        Verify a cosmo signature against the current sky.
+        
+        Args:
+            signature: Cosmo signature to verify
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            elevation: Elevation in meters (default: 0.0)
+            timestamp: Unix timestamp (default: current time)
+            tolerance: Magnitude tolerance for verification (default: 0.5)
+            
+        Returns:
+            bool: True if the signature is valid, False otherwise
+        """
+        # Parse the signature
+        try:
+            constellation, magnitude_str = signature.split("-")
+            expected_magnitude = float(magnitude_str)
+        except (ValueError, AttributeError):
+            return False
+            
+        # Get current star positions
+        stars = self._star_arrays(latitude, longitude, elevation, timestamp)
+        
+        # Find the brightest star in the expected constellation
+        in_constellation = self.constellations.lookup(stars["ra"], stars["dec"]) == constellation
+                    
+        # If no star found in the expected constellation, verification fails
+        if not in_constellation.any():
+            return False
+            
+        # Check if the magnitude is within the tolerance
+        actual_magnitude = abs(stars["magnitude"][in_constellation].min())
+        return abs(actual_magnitude - expected_magnitude) <= tolerance 
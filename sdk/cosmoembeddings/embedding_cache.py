@@ -0,0 +1,269 @@
+# Handles embedding caching
+
+import hashlib
+import json
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache keyed by (model name, sha256 of the normalized text).
+
+    Entries live in an in-process LRU tier and, when a directory is given, in an
+    on-disk tier made of an append-only float32 file plus a JSON-lines index.
+    The data file is memory-mapped on open; once it grows past max_disk_bytes
+    it is compacted, dropping the oldest entries first.
+    """
+
+    DATA_FILE = "embeddings.f32"
+    INDEX_FILE = "index.jsonl"
+
+    def __init__(self,
+                 max_entries: int = 10000,
+                 directory: Optional[str] = None,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of embeddings kept in memory
+            directory: Directory for the on-disk tier (optional)
+            max_disk_bytes: Size bound of the on-disk data file
+        """
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._index: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()
+        self._data: Optional[np.memmap] = None
+        self._data_file = None
+        self._index_file = None
+        self._disk_rows = 0
+        self._lock = threading.RLock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._open_disk_tier()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize text so that trivially different copies share a cache entry."""
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    @classmethod
+    def make_key(cls, model_name: str, text: str) -> str:
+        """
+        Build the cache key for a text embedded with a given model.
+
+        Args:
+            model_name: Name of the embedding model
+            text: Text that was embedded
+
+        Returns:
+            str: Cache key
+        """
+        digest = hashlib.sha256(cls.normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{model_name}:{digest}"
+
+    def get(self, model_name: str, text: str) -> Optional[np.ndarray]:
+        """
+        Look up the embedding of a text.
+
+        Args:
+            model_name: Name of the embedding model
+            text: Text to look up
+
+        Returns:
+            Optional[np.ndarray]: Cached embedding, or None on a miss
+        """
+        key = self.make_key(model_name, text)
+        with self._lock:
+            embedding = self._memory.get(key)
+            if embedding is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return embedding
+
+            embedding = self._read_disk(key)
+            if embedding is not None:
+                self.disk_hits += 1
+                self._remember(key, embedding)
+                return embedding
+
+            self.misses += 1
+            return None
+
+    def put(self, model_name: str, text: str, embedding: np.ndarray) -> None:
+        """
+        Store the embedding of a text.
+
+        Args:
+            model_name: Name of the embedding model
+            text: Text that was embedded
+            embedding: Embedding vector
+        """
+        key = self.make_key(model_name, text)
+        embedding = np.array(embedding, dtype=np.float32).reshape(-1)
+        with self._lock:
+            self._remember(key, embedding)
+            if self.directory and key not in self._index:
+                self._append_disk(key, embedding)
+
+    def get_many(self, model_name: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up several texts, returning None for every miss."""
+        return [self.get(model_name, text) for text in texts]
+
+    def put_many(self, model_name: str, texts: List[str], embeddings: np.ndarray) -> None:
+        """Store the embeddings of several texts."""
+        for text, embedding in zip(texts, embeddings):
+            self.put(model_name, text, embedding)
+
+    def stats(self) -> Dict:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict: Hit/miss counters and tier sizes
+        """
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._index),
+                "disk_bytes": self._disk_rows * 4
+            }
+
+    def clear(self) -> None:
+        """Drop the in-memory tier and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            self.memory_hits = self.disk_hits = self.misses = 0
+
+    def close(self) -> None:
+        """Flush and close the on-disk tier."""
+        with self._lock:
+            if self._data_file:
+                self._data_file.close()
+                self._data_file = None
+            if self._index_file:
+                self._index_file.close()
+                self._index_file = None
+            self._data = None
+
+    def _remember(self, key: str, embedding: np.ndarray) -> None:
+        """Insert an entry in the LRU tier, evicting the least recently used one."""
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _open_disk_tier(self) -> None:
+        """Load the index and memory-map the data file."""
+        index_path = os.path.join(self.directory, self.INDEX_FILE)
+        data_path = os.path.join(self.directory, self.DATA_FILE)
+
+        self._index.clear()
+        index_end = 0
+        if os.path.exists(index_path):
+            with open(index_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # A torn last line from an interrupted append
+                        break
+                    index_end += len(line)
+                    try:
+                        entry = json.loads(line)
+                    except (UnicodeDecodeError, json.JSONDecodeError):
+                        continue
+                    self._index[entry["key"]] = (entry["offset"], entry["dim"])
+            # Later entries would otherwise be appended to the torn line
+            os.truncate(index_path, index_end)
+
+        data_rows = os.path.getsize(data_path) // 4 if os.path.exists(data_path) else 0
+        # Drop index entries pointing past the end of a truncated data file
+        for key, (offset, dim) in list(self._index.items()):
+            if offset + dim > data_rows:
+                del self._index[key]
+        # Rows past the last indexed entry, or a partial row, were never committed;
+        # new entries go right after the indexed ones
+        self._disk_rows = max((offset + dim for offset, dim in self._index.values()), default=0)
+        if os.path.exists(data_path) and os.path.getsize(data_path) != self._disk_rows * 4:
+            os.truncate(data_path, self._disk_rows * 4)
+
+        self._data_file = open(data_path, "ab")
+        self._index_file = open(index_path, "a", encoding="utf-8")
+        self._map_data()
+
+    def _map_data(self) -> None:
+        """Memory-map the current contents of the data file."""
+        data_path = os.path.join(self.directory, self.DATA_FILE)
+        self._data_file.flush()
+        if self._disk_rows:
+            self._data = np.memmap(data_path, dtype="<f4", mode="r", shape=(self._disk_rows,))
+        else:
+            self._data = None
+
+    def _read_disk(self, key: str) -> Optional[np.ndarray]:
+        """Read an entry from the on-disk tier."""
+        location = self._index.get(key)
+        if location is None:
+            return None
+        offset, dim = location
+        if self._data is None or offset + dim > self._data.shape[0]:
+            self._map_data()
+        return np.array(self._data[offset:offset + dim])
+
+    def _append_disk(self, key: str, embedding: np.ndarray) -> None:
+        """Append an entry to the on-disk tier, compacting it when it gets too large."""
+        offset = self._disk_rows
+        self._data_file.write(embedding.astype("<f4").tobytes())
+        self._index_file.write(json.dumps({"key": key, "offset": offset, "dim": embedding.shape[0]}) + "\n")
+        self._index_file.flush()
+        self._index[key] = (offset, embedding.shape[0])
+        self._disk_rows += embedding.shape[0]
+
+        if self._disk_rows * 4 > self.max_disk_bytes:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the on-disk tier keeping the newest entries within half of max_disk_bytes."""
+        self._map_data()
+        budget = self.max_disk_bytes // 2 // 4
+        kept = []
+        rows = 0
+        for key, (offset, dim) in reversed(self._index.items()):
+            if rows + dim > budget:
+                break
+            kept.append((key, offset, dim))
+            rows += dim
+        kept.reverse()
+
+        data_path = os.path.join(self.directory, self.DATA_FILE)
+        index_path = os.path.join(self.directory, self.INDEX_FILE)
+        with open(data_path + ".tmp", "wb") as data_out, open(index_path + ".tmp", "w", encoding="utf-8") as index_out:
+            position = 0
+            for key, offset, dim in kept:
+                data_out.write(np.asarray(self._data[offset:offset + dim]).tobytes())
+                index_out.write(json.dumps({"key": key, "offset": position, "dim": dim}) + "\n")
+                position += dim
+
+        self.close()
+        os.replace(data_path + ".tmp", data_path)
+        os.replace(index_path + ".tmp", index_path)
+        self._open_disk_tier()
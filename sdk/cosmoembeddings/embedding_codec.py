@@ -0,0 +1,96 @@
+# Handles compact embedding encodings
+
+import base64
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+# Little-endian storage type of every supported encoding
+DTYPES = {
+    "float32": "<f4",
+    "float16": "<f2",
+    "int8": "i1"
+}
+
+def is_encoded(embeddings: Any) -> bool:
+    """Check whether a block's embeddings field holds an encoded matrix."""
+    return isinstance(embeddings, dict) and "dtype" in embeddings and "data" in embeddings
+
+def quantize_int8(matrix: np.ndarray) -> Dict:
+    """
+    Scalar-quantize a matrix to int8 with a scale and offset per row.
+
+    Args:
+        matrix: float32 matrix
+
+    Returns:
+        Dict: int8 codes with the per-row scale and offset
+    """
+    low = matrix.min(axis=1) if matrix.size else np.zeros(matrix.shape[0], dtype=np.float32)
+    high = matrix.max(axis=1) if matrix.size else np.zeros(matrix.shape[0], dtype=np.float32)
+    scale = ((high - low) / 255.0).astype(np.float32)
+    scale[scale == 0] = 1.0
+    offset = low.astype(np.float32)
+    codes = np.rint((matrix - offset[:, None]) / scale[:, None]) - 128
+    return {
+        "codes": np.clip(codes, -128, 127).astype(np.int8),
+        "scale": scale,
+        "offset": offset
+    }
+
+def encode_embeddings(embeddings: Union[np.ndarray, List], dtype: str = "float32") -> Dict:
+    """
+    Encode an embedding matrix as base64 binary.
+
+    Args:
+        embeddings: Matrix (or list of vectors) of embeddings
+        dtype: Storage type: "float32", "float16" or "int8" (scalar-quantized)
+
+    Returns:
+        Dict: Encoded embeddings, suitable for a block's "embeddings" field
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+
+    encoded = {
+        "encoding": "base64",
+        "dtype": dtype,
+        "shape": [int(n) for n in matrix.shape]
+    }
+    if dtype == "int8":
+        quantized = quantize_int8(matrix)
+        payload = quantized["codes"]
+        encoded["scale"] = [float(v) for v in quantized["scale"]]
+        encoded["offset"] = [float(v) for v in quantized["offset"]]
+    else:
+        payload = matrix.astype(DTYPES[dtype])
+    encoded["data"] = base64.b64encode(payload.tobytes()).decode("ascii")
+    return encoded
+
+def decode_embeddings(embeddings: Any) -> np.ndarray:
+    """
+    Decode a block's embeddings field into a float32 matrix.
+
+    Args:
+        embeddings: Either a list of vectors or an encoded matrix
+
+    Returns:
+        np.ndarray: float32 matrix with one row per embedding
+    """
+    if not is_encoded(embeddings):
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        return matrix[None, :] if matrix.ndim == 1 else matrix
+
+    dtype = embeddings["dtype"]
+    if dtype not in DTYPES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+    data = base64.b64decode(embeddings["data"])
+    matrix = np.frombuffer(data, dtype=DTYPES[dtype]).reshape(embeddings["shape"])
+    if dtype == "int8":
+        scale = np.asarray(embeddings["scale"], dtype=np.float32)
+        offset = np.asarray(embeddings["offset"], dtype=np.float32)
+        return (matrix.astype(np.float32) + 128) * scale[:, None] + offset[:, None]
+    return matrix.astype(np.float32)
@@ -0,0 +1,122 @@
+# Handles multi-process encoding
+
+import multiprocessing
+import os
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+from .model_pool import ModelPool, load_sentence_transformer
+
+# Model held by each worker process, loaded once by the pool initializer
+_worker_model: Any = None
+
+def _init_worker(model_name: str, loader: Callable[[str], Any], threads_per_worker: Optional[int]) -> None:
+    """Load the model in a freshly started worker process."""
+    global _worker_model
+    if threads_per_worker:
+        # Keep workers from oversubscribing the cores with intra-op threads
+        try:
+            import torch
+            torch.set_num_threads(threads_per_worker)
+        except ImportError:
+            pass
+    _worker_model = ModelPool(loader=loader).get(model_name)
+
+def _encode_shard(texts: List[str], batch_size: int) -> np.ndarray:
+    """Encode one shard of texts in a worker process."""
+    return np.asarray(_worker_model.encode(texts, batch_size=batch_size))
+
+class EncodingPool:
+    """
+    Encoding engine that shards texts across a pool of worker processes.
+
+    Each worker loads its own copy of the model once, when the pool starts.
+    Shards are dispatched in parallel and their results are reassembled in
+    input order.
+    """
+
+    def __init__(self,
+                 model_name: str = "all-MiniLM-L6-v2",
+                 workers: Optional[int] = None,
+                 shard_size: Optional[int] = None,
+                 threads_per_worker: Optional[int] = 1,
+                 loader: Optional[Callable[[str], Any]] = None,
+                 start_method: Optional[str] = None):
+        """
+        Initialize the encoding pool. Worker processes start on first use.
+
+        Args:
+            model_name: Name of the model every worker loads
+            workers: Number of worker processes (default: number of CPUs)
+            shard_size: Texts sent to a worker per task (default: 4 batches)
+            threads_per_worker: Torch threads per worker (None keeps torch's default)
+            loader: Picklable function that loads a model by name (default: SentenceTransformer)
+            start_method: multiprocessing start method (default: the platform default)
+        """
+        self.model_name = model_name
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.threads_per_worker = threads_per_worker
+        self.loader = loader or load_sentence_transformer
+        self.start_method = start_method
+        self._pool = None
+
+    def start(self) -> None:
+        """Start the worker processes and load the model in each of them."""
+        if self._pool is None:
+            context = multiprocessing.get_context(self.start_method)
+            self._pool = context.Pool(
+                processes=self.workers,
+                initializer=_init_worker,
+                initargs=(self.model_name, self.loader, self.threads_per_worker)
+            )
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Encode texts across the worker processes.
+
+        Args:
+            texts: Texts to encode
+            batch_size: Number of texts per model call inside a worker
+
+        Returns:
+            np.ndarray: Matrix with one embedding row per text, in input order
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        self.start()
+
+        shard_size = self.shard_size_for(len(texts), batch_size)
+        shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+
+        results = self._pool.starmap(_encode_shard, [(shard, batch_size) for shard in shards])
+        return np.vstack(results)
+
+    def shard_size_for(self, count: int, batch_size: int = 32) -> int:
+        """
+        Get the number of texts per shard when encoding count texts.
+
+        Args:
+            count: Number of texts encoded
+            batch_size: Number of texts per model call inside a worker
+
+        Returns:
+            int: Texts per shard
+        """
+        shard_size = self.shard_size or batch_size * 4
+        # Spread small inputs over all workers instead of filling a single shard
+        return max(1, min(shard_size, -(-count // self.workers)))
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> "EncodingPool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,99 @@
+# Handles loading the planetary ephemeris
+
+import os
+import threading
+from typing import Dict, Optional
+
+from skyfield.api import Loader, load, load_file
+from skyfield.timelib import Timescale
+
+DEFAULT_EPHEMERIS = "de421.bsp"
+EPHEMERIS_PATH_ENV = "COSMIC_EPHEMERIS_PATH"
+
+class Ephemeris:
+    """
+    A planetary ephemeris with its timescale and the bodies cosmo signatures use.
+
+    The ephemeris file is opened once; skyfield's SPK reader memory-maps it, so
+    segments are paged in on demand and shared between processes. The handles
+    are read-only and safe to share between threads.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Load an ephemeris.
+
+        Args:
+            path: Ephemeris file, or a directory to find (or download) de421.bsp in
+                (default: the COSMIC_EPHEMERIS_PATH environment variable, then de421.bsp
+                in the working directory)
+        """
+        self.path = resolve_ephemeris_path(path)
+        if os.path.isdir(self.path):
+            self.planets = Loader(self.path)(DEFAULT_EPHEMERIS)
+        elif os.path.exists(self.path):
+            self.planets = load_file(self.path)
+        else:
+            # skyfield's default loader downloads well-known ephemerides by name
+            self.planets = load(self.path)
+        self.timescale = get_timescale()
+        self.sun = self.planets["sun"]
+        self.moon = self.planets["moon"]
+        self.earth = self.planets["earth"]
+
+_ephemerides: Dict[str, Ephemeris] = {}
+_timescale: Optional[Timescale] = None
+_lock = threading.RLock()
+
+def get_timescale() -> Timescale:
+    """Get the process-wide skyfield timescale, built from skyfield's builtin data without downloads."""
+    global _timescale
+    if _timescale is None:
+        with _lock:
+            if _timescale is None:
+                _timescale = load.timescale()
+    return _timescale
+
+def resolve_ephemeris_path(path: Optional[str] = None) -> str:
+    """
+    Resolve the ephemeris location to use.
+
+    Args:
+        path: Explicit path (optional)
+
+    Returns:
+        str: The path argument, else $COSMIC_EPHEMERIS_PATH, else de421.bsp
+    """
+    return path or os.environ.get(EPHEMERIS_PATH_ENV) or DEFAULT_EPHEMERIS
+
+def get_ephemeris(path: Optional[str] = None) -> Ephemeris:
+    """
+    Get the process-wide ephemeris for a path, loading it on first use.
+
+    Args:
+        path: Ephemeris location (see resolve_ephemeris_path)
+
+    Returns:
+        Ephemeris: The shared ephemeris
+    """
+    resolved = resolve_ephemeris_path(path)
+    ephemeris = _ephemerides.get(resolved)
+    if ephemeris is None:
+        with _lock:
+            ephemeris = _ephemerides.get(resolved)
+            if ephemeris is None:
+                ephemeris = Ephemeris(resolved)
+                _ephemerides[resolved] = ephemeris
+    return ephemeris
+
+def preload(path: Optional[str] = None) -> Ephemeris:
+    """
+    Load the ephemeris ahead of time, e.g. at node startup.
+
+    Args:
+        path: Ephemeris location (see resolve_ephemeris_path)
+
+    Returns:
+        Ephemeris: The shared ephemeris
+    """
+    return get_ephemeris(path)
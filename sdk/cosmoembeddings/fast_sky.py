@@ -0,0 +1,131 @@
+# Handles fast approximate sun and moon positions
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Sequence
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+# Largest error of interpolated positions against skyfield, for the default
+# segment length and degree: the angle between the interpolated and exact
+# directions of the sun and moon (so also the altitude error; the azimuth error
+# is this divided by the cosine of the altitude), and the relative error of
+# their distances. The moon phase angle is within FAST_SKY_ERROR_DEGREES too.
+FAST_SKY_ERROR_DEGREES = 1e-6
+FAST_SKY_DISTANCE_ERROR = 1e-9
+
+_BODIES = ("sun", "moon")
+
+# Interpolated quantities, one column of a segment's coefficient matrix each
+_SERIES = ("sun_north", "sun_east", "sun_up", "sun_distance",
+           "moon_north", "moon_east", "moon_up", "moon_distance", "moon_phase")
+
+class InterpolatedSky:
+    """
+    Sun and moon positions interpolated from Chebyshev series.
+
+    Time is cut into fixed segments aligned on multiples of the segment length
+    since the Unix epoch. The first query falling in a segment evaluates the
+    exact positions at the segment's Chebyshev nodes in one vectorized call and
+    fits a series per quantity; later queries are polynomial evaluations in
+    NumPy. Directions are interpolated as north/east/up unit vector components,
+    which stay smooth through azimuth wrap-around and near the zenith. Since
+    segments do not depend on the order of queries, every node gets the same
+    values for the same timestamp.
+    """
+
+    def __init__(self,
+                 compute: Callable[[Sequence[float]], Dict[str, np.ndarray]],
+                 segment_seconds: float = 3600.0,
+                 degree: int = 12,
+                 max_segments: int = 1024):
+        """
+        Initialize the interpolator.
+
+        Args:
+            compute: Exact positions of many timestamps, returning the arrays
+                CosmoValidator computes (sun/moon altitude, azimuth, distance
+                and the moon phase)
+            segment_seconds: Length of a fitted segment in seconds
+            degree: Degree of the Chebyshev series
+            max_segments: Most fitted segments kept, least recently used dropped first
+        """
+        self.compute = compute
+        self.segment_seconds = float(segment_seconds)
+        self.degree = degree
+        self.max_segments = max_segments
+
+        # Chebyshev nodes of the first kind on [-1, 1]
+        count = degree + 1
+        self._nodes = np.cos(np.pi * (np.arange(count) + 0.5) / count)
+        self._segments: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def positions(self, timestamps: Sequence[float]) -> Dict[str, np.ndarray]:
+        """
+        Interpolate sun and moon positions.
+
+        Args:
+            timestamps: Unix timestamps
+
+        Returns:
+            Dict[str, np.ndarray]: The same arrays as the exact computation
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        indices = np.floor(timestamps / self.segment_seconds).astype(np.int64)
+        values = np.empty((len(timestamps), len(_SERIES)))
+        for index in np.unique(indices):
+            in_segment = indices == index
+            # Position within the segment, mapped to [-1, 1]
+            x = 2.0 * (timestamps[in_segment] / self.segment_seconds - index) - 1.0
+            values[in_segment] = self._basis(x) @ self._segment(int(index))
+        series = dict(zip(_SERIES, values.T))
+
+        positions = {}
+        for body in _BODIES:
+            north, east, up = series[f"{body}_north"], series[f"{body}_east"], series[f"{body}_up"]
+            norm = np.sqrt(north ** 2 + east ** 2 + up ** 2)
+            positions[f"{body}_altitude"] = np.degrees(np.arcsin(np.clip(up / norm, -1.0, 1.0)))
+            positions[f"{body}_azimuth"] = np.degrees(np.arctan2(east, north)) % 360.0
+            positions[f"{body}_distance"] = series[f"{body}_distance"]
+        positions["moon_phase"] = series["moon_phase"]
+        return positions
+
+    def _basis(self, x: np.ndarray) -> np.ndarray:
+        """Evaluate the Chebyshev polynomials up to the degree at points in [-1, 1]."""
+        basis = np.empty((len(x), self.degree + 1))
+        basis[:, 0] = 1.0
+        if self.degree > 0:
+            basis[:, 1] = x
+        for k in range(2, self.degree + 1):
+            basis[:, k] = 2.0 * x * basis[:, k - 1] - basis[:, k - 2]
+        return basis
+
+    def _segment(self, index: int) -> np.ndarray:
+        """Get the Chebyshev coefficients of a segment, one column per series, fitting them on first use."""
+        with self._lock:
+            coefficients = self._segments.get(index)
+            if coefficients is not None:
+                self._segments.move_to_end(index)
+                return coefficients
+
+        times = (index + (self._nodes + 1.0) / 2.0) * self.segment_seconds
+        exact = self.compute([float(t) for t in times])
+        values = {"moon_phase": np.asarray(exact["moon_phase"], dtype=np.float64)}
+        for body in _BODIES:
+            altitude = np.radians(exact[f"{body}_altitude"])
+            azimuth = np.radians(exact[f"{body}_azimuth"])
+            values[f"{body}_north"] = np.cos(altitude) * np.cos(azimuth)
+            values[f"{body}_east"] = np.cos(altitude) * np.sin(azimuth)
+            values[f"{body}_up"] = np.sin(altitude)
+            values[f"{body}_distance"] = np.asarray(exact[f"{body}_distance"], dtype=np.float64)
+        # As many nodes as coefficients: the fit interpolates the nodes exactly
+        coefficients = chebyshev.chebfit(self._nodes, np.column_stack([values[name] for name in _SERIES]),
+                                         self.degree)
+
+        with self._lock:
+            self._segments[index] = coefficients
+            while len(self._segments) > self.max_segments:
+                self._segments.popitem(last=False)
+        return coefficients
@@ -0,0 +1,93 @@
+# Handles Merkle trees over block digests
+
+import hashlib
+from typing import List, Sequence
+
+# Domain separation between leaves and inner nodes
+_LEAF_PREFIX = b"\x00"
+_NODE_PREFIX = b"\x01"
+
+def leaf_hash(data: bytes) -> bytes:
+    """Hash a leaf of the tree."""
+    return hashlib.sha256(_LEAF_PREFIX + data).digest()
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    """Hash two child nodes into their parent."""
+    return hashlib.sha256(_NODE_PREFIX + left + right).digest()
+
+def build_levels(leaves: Sequence[bytes]) -> List[List[bytes]]:
+    """
+    Build every level of a Merkle tree, from the leaves up to the root.
+
+    The last node of an odd-sized level is promoted to the next level
+    unchanged instead of being paired with a copy of itself.
+
+    Args:
+        leaves: Leaf hashes
+
+    Returns:
+        List[List[bytes]]: Levels, the first being the leaves and the last the root
+    """
+    if not leaves:
+        raise ValueError("A Merkle tree needs at least one leaf")
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+def inclusion_proof(levels: List[List[bytes]], index: int) -> List[bytes]:
+    """
+    Get the sibling hashes proving that a leaf belongs to a tree.
+
+    Args:
+        levels: Levels from build_levels
+        index: Position of the leaf
+
+    Returns:
+        List[bytes]: Sibling hashes from the leaf level upwards
+    """
+    path = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append(level[sibling])
+        index //= 2
+    return path
+
+def root_from_proof(leaf: bytes, index: int, size: int, path: Sequence[bytes]) -> bytes:
+    """
+    Recompute the root of a tree from a leaf and its inclusion proof.
+
+    Args:
+        leaf: Leaf hash
+        index: Position of the leaf
+        size: Number of leaves in the tree
+        path: Sibling hashes from inclusion_proof
+
+    Returns:
+        bytes: The root hash
+
+    Raises:
+        ValueError: If the proof does not fit a tree of this size
+    """
+    if not 0 <= index < size:
+        raise ValueError("Leaf index out of range")
+    node = leaf
+    siblings = iter(path)
+    try:
+        while size > 1:
+            if index % 2:
+                node = node_hash(next(siblings), node)
+            elif index + 1 < size:
+                node = node_hash(node, next(siblings))
+            index //= 2
+            size = (size + 1) // 2
+    except StopIteration:
+        raise ValueError("Inclusion proof is too short")
+    if next(siblings, None) is not None:
+        raise ValueError("Inclusion proof is too long")
+    return node
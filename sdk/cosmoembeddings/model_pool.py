@@ -0,0 +1,86 @@
+# Handles shared embedding models
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+def load_sentence_transformer(model_name: str) -> Any:
+    """Load a SentenceTransformers model by name."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+class ModelPool:
+    """
+    Process-wide registry that loads each embedding model once and shares it.
+
+    Models are loaded on first use. Loading is serialized per model name, so
+    concurrent callers asking for the same model wait for a single load while
+    different models can load in parallel.
+    """
+
+    def __init__(self, loader: Optional[Callable[[str], Any]] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            loader: Function that loads a model by name (default: SentenceTransformer)
+        """
+        self.loader = loader or load_sentence_transformer
+        self._models: Dict[str, Any] = {}
+        self._model_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str) -> Any:
+        """
+        Get a model, loading it if this process has not loaded it yet.
+
+        Args:
+            model_name: Name of the model
+
+        Returns:
+            The shared model instance
+        """
+        model = self._models.get(model_name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model_lock = self._model_locks.setdefault(model_name, threading.Lock())
+
+        with model_lock:
+            # Another thread may have finished loading while we waited
+            model = self._models.get(model_name)
+            if model is None:
+                model = self.loader(model_name)
+                self._models[model_name] = model
+            return model
+
+    def warmup(self, *model_names: str) -> None:
+        """
+        Load models ahead of time, e.g. at node startup.
+
+        Args:
+            model_names: Names of the models to load
+        """
+        for model_name in model_names:
+            self.get(model_name)
+
+    def is_loaded(self, model_name: str) -> bool:
+        """Check whether a model is already loaded."""
+        return model_name in self._models
+
+    def loaded_models(self) -> List[str]:
+        """Get the names of the loaded models."""
+        return list(self._models)
+
+    def release(self, model_name: str) -> None:
+        """
+        Drop a model from the pool so it can be garbage collected.
+
+        Args:
+            model_name: Name of the model
+        """
+        with self._lock:
+            self._models.pop(model_name, None)
+
+# Pool shared by every BlockBuilder that does not get its own
+default_pool = ModelPool()
@@ -9,7 +9,6 @@ import time
 from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
 from .config import Config
-from .discovery import DiscoveryService
 
 @dataclass
 class NodeIdentity:
@@ -34,6 +33,8 @@ class Node:
         self.identity = self._create_identity()
         self.peers: Dict[str, NodeIdentity] = {}
         self.discovery_port = config.get("discovery_port", 8091)
+        # Imported here: discovery imports NodeIdentity from this module
+        from .discovery import DiscoveryService
         self.discovery_service = DiscoveryService(port=self.discovery_port)
         
     def _create_identity(self) -> NodeIdentity:
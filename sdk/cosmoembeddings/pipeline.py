@@ -0,0 +1,246 @@
+# Handles streaming ingestion of corpora into blocks
+
+import json
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .block_builder import BlockBuilder
+from .chunker import TokenWindowChunker
+from .signer import MERKLE_SCHEME
+
+def chunk_text(text: str, chunk_size: int = 1000) -> Iterator[str]:
+    """
+    Split text into chunks of at most chunk_size characters.
+
+    Chunks end on paragraph breaks where possible, then on whitespace, and
+    only split words that are longer than a whole chunk.
+
+    Args:
+        text: Text to split
+        chunk_size: Maximum chunk length in characters
+
+    Returns:
+        Iterator[str]: Non-empty chunks in document order
+    """
+    text = text.strip()
+    while text:
+        if len(text) <= chunk_size:
+            yield text
+            return
+        window = text[:chunk_size + 1]
+        cut = window.rfind("\n\n")
+        if cut <= 0:
+            cut = max(window.rfind(" "), window.rfind("\n"))
+        if cut <= 0:
+            cut = chunk_size
+        chunk = text[:cut].strip()
+        if chunk:
+            yield chunk
+        text = text[cut:].lstrip()
+
+def _split_with_offsets(text: str, chunk_size: int,
+                        chunker: Optional[TokenWindowChunker] = None) -> Iterator[Tuple[str, int, int]]:
+    """Yield (chunk, start, end) for the chunks of a text, with their character span in it."""
+    if chunker is not None:
+        for window in chunker.chunk(text):
+            yield window["text"], window["start"], window["end"]
+        return
+    position = 0
+    for chunk in chunk_text(text, chunk_size):
+        # Chunks are stripped slices of the text, in order
+        start = text.index(chunk, position)
+        position = start + len(chunk)
+        yield chunk, start, position
+
+def _iter_text_file(path: str, chunk_size: int,
+                    chunker: Optional[TokenWindowChunker] = None) -> Iterator[Tuple[str, Dict]]:
+    """Read a text file paragraph by paragraph and yield (chunk, offsets) pairs without loading it whole."""
+    buffer: List[str] = []
+    buffered = 0
+    # Characters of the file already flushed, so offsets are relative to the whole file
+    flushed = 0
+
+    def flush() -> Iterator[Tuple[str, Dict]]:
+        for chunk, start, end in _split_with_offsets("".join(buffer), chunk_size, chunker):
+            yield chunk, {"start": flushed + start, "end": flushed + end}
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            buffer.append(line)
+            buffered += len(line)
+            # Flush on paragraph breaks once a chunk worth of text is pending,
+            # or with no paragraph break in sight
+            if (buffered >= chunk_size and not line.strip()) or buffered >= 4 * chunk_size:
+                yield from flush()
+                flushed += buffered
+                buffer, buffered = [], 0
+    if buffer:
+        yield from flush()
+
+def _iter_jsonl_file(path: str, chunk_size: int, text_field: str,
+                     chunker: Optional[TokenWindowChunker] = None) -> Iterator[Tuple[str, Dict]]:
+    """Yield (chunk, metadata) pairs from a JSON-lines file, one record at a time."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                text, extra = record, {}
+            else:
+                text = record.get(text_field, "")
+                extra = {k: v for k, v in record.items() if k != text_field}
+            if chunker is not None:
+                # Token windows, with their character offsets in the record's text
+                for index, window in enumerate(chunker.chunk(text)):
+                    yield window["text"], {**extra, "source": path, "record": line_number, "chunk": index,
+                                           "start": window["start"], "end": window["end"]}
+            else:
+                for index, chunk in enumerate(chunk_text(text, chunk_size)):
+                    yield chunk, {**extra, "source": path, "record": line_number, "chunk": index}
+
+def _iter_files(source: str) -> Iterator[str]:
+    """Yield the files under a path in a stable order."""
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if not name.startswith("."):
+                    yield os.path.join(root, name)
+    else:
+        yield source
+
+def iter_chunks(source: str,
+                chunk_size: int = 1000,
+                text_field: str = "text",
+                chunker: Optional[TokenWindowChunker] = None) -> Iterator[Tuple[str, Dict]]:
+    """
+    Lazily read a corpus and yield text chunks with their provenance.
+
+    Args:
+        source: A text file, a JSON-lines file (.jsonl) or a directory of them
+        chunk_size: Maximum chunk length in characters (read size for text files
+            when a chunker is given)
+        text_field: Field holding the text in JSON-lines records
+        chunker: Token-window chunker to split the text with (optional)
+
+    Returns:
+        Iterator[Tuple[str, Dict]]: (chunk, metadata) pairs; chunks of text files,
+        and token windows, carry their "start" and "end" character offsets
+    """
+    for path in _iter_files(source):
+        if path.endswith(".jsonl"):
+            yield from _iter_jsonl_file(path, chunk_size, text_field, chunker)
+        else:
+            for index, (chunk, offsets) in enumerate(_iter_text_file(path, chunk_size, chunker)):
+                yield chunk, {"source": path, "chunk": index, **offsets}
+
+class BlockPipeline:
+    """
+    Streams a corpus into finished blocks with memory bounded by the batch size.
+
+    Chunks are grouped into blocks, encoded in shared batches through
+    BlockBuilder.create_blocks, optionally cosmo-stamped and signed, and
+    yielded one by one.
+    """
+
+    def __init__(self,
+                 builder: BlockBuilder,
+                 signer=None,
+                 validator=None,
+                 chunk_size: int = 1000,
+                 chunks_per_block: int = 1,
+                 batch_size: Optional[int] = None,
+                 text_field: str = "text",
+                 chunker: Optional[TokenWindowChunker] = None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            builder: BlockBuilder used to encode the chunks
+            signer: Signer used to sign each block (optional)
+            validator: CosmoValidator used to stamp each block (optional)
+            chunk_size: Maximum chunk length in characters
+            chunks_per_block: Maximum number of chunks of one document per block
+            batch_size: Number of texts encoded together (default: the builder's batch_size)
+            text_field: Field holding the text in JSON-lines records
+            chunker: Token-window chunker replacing character chunking (optional)
+        """
+        self.builder = builder
+        self.signer = signer
+        self.validator = validator
+        self.chunk_size = chunk_size
+        self.chunks_per_block = chunks_per_block
+        self.batch_size = batch_size or builder.batch_size
+        self.text_field = text_field
+        self.chunker = chunker
+
+    def run(self, source: str) -> Iterator[Dict]:
+        """
+        Ingest a corpus.
+
+        Args:
+            source: A text file, a JSON-lines file or a directory of them
+
+        Returns:
+            Iterator[Dict]: Finished blocks in corpus order
+        """
+        return self.process(iter_chunks(source, self.chunk_size, self.text_field, self.chunker))
+
+    def process(self, chunks: Iterable[Tuple[str, Dict]]) -> Iterator[Dict]:
+        """
+        Turn a stream of (chunk, metadata) pairs into blocks.
+
+        Args:
+            chunks: Text chunks with their metadata
+
+        Returns:
+            Iterator[Dict]: Finished blocks in input order
+        """
+        pending: List[Tuple[List[str], Dict]] = []
+        pending_texts = 0
+        for documents in self._group(chunks):
+            pending.append(documents)
+            pending_texts += len(documents[0])
+            if pending_texts >= self.batch_size:
+                yield from self._finish(pending)
+                pending, pending_texts = [], 0
+        if pending:
+            yield from self._finish(pending)
+
+    def _group(self, chunks: Iterable[Tuple[str, Dict]]) -> Iterator[Tuple[List[str], Dict]]:
+        """Group consecutive chunks of the same document into block contents."""
+        texts: List[str] = []
+        metadata: Optional[Dict] = None
+        document = None
+        for text, chunk_metadata in chunks:
+            chunk_document = {k: v for k, v in chunk_metadata.items() if k not in ("chunk", "start", "end")}
+            if texts and (chunk_document != document or len(texts) >= self.chunks_per_block):
+                yield texts, metadata
+                texts = []
+            if not texts:
+                document = chunk_document
+                metadata = {k: v for k, v in chunk_metadata.items() if k not in ("start", "end")}
+            if "start" in chunk_metadata:
+                # Token windows record their character offsets, as create_document_block does
+                metadata.setdefault("chunks", []).append({"start": chunk_metadata["start"],
+                                                          "end": chunk_metadata["end"]})
+            texts.append(text)
+        if texts:
+            yield texts, metadata
+
+    def _finish(self, documents: List[Tuple[List[str], Dict]]) -> Iterator[Dict]:
+        """Encode a batch of block contents and stamp and sign the resulting blocks."""
+        blocks = self.builder.create_blocks(documents, batch_size=self.batch_size)
+        if self.validator is not None:
+            # Stamp before signing so the signature covers the cosmo fields
+            for is_valid, reason in self.validator.validate_blocks(blocks):
+                if not is_valid:
+                    raise ValueError(f"Cosmo validation failed: {reason}")
+        if self.signer is not None:
+            if getattr(self.signer, "scheme", None) == MERKLE_SCHEME:
+                # One signature over the whole batch
+                blocks = self.signer.sign_batch(blocks)
+            else:
+                blocks = [self.signer.sign_block(block) for block in blocks]
+        yield from blocks
@@ -4,20 +4,77 @@ import nacl.signing
 import nacl.encoding
 import json
 import base64
-from typing import Dict, Any, Optional
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, Iterable, List, Optional
+
+import numpy as np
+from .merkle import build_levels, inclusion_proof, leaf_hash, root_from_proof
+
+if TYPE_CHECKING:
+    from .verdict_cache import VerdictCache
+
+LEGACY_SCHEME = "legacy"
+DIGEST_SCHEME = "digest-v1"
+MERKLE_SCHEME = "merkle-v1"
+SIGNATURE_SCHEMES = (LEGACY_SCHEME, DIGEST_SCHEME, MERKLE_SCHEME)
+
+_DIGEST_PREFIX = b"cosmoembeddings/digest-v1\n"
+_MERKLE_PREFIX = b"cosmoembeddings/merkle-v1\n"
+_UNSIGNED_FIELDS = ('signature', 'public_key')
+
+@lru_cache(maxsize=4096)
+def _load_verify_key(public_key: str) -> nacl.signing.VerifyKey:
+    """Decode a base64 public key into a VerifyKey, cached per key."""
+    return nacl.signing.VerifyKey(base64.b64decode(public_key))
+
+@lru_cache(maxsize=4096)
+def _verify_root(public_key: str, signature: str, root: bytes, size: int) -> bool:
+    """Check a Merkle root signature, cached so a batch pays for it once."""
+    try:
+        message = _MERKLE_PREFIX + root + size.to_bytes(8, 'little')
+        _load_verify_key(public_key).verify(message, base64.b64decode(signature))
+        return True
+    except (nacl.exceptions.BadSignatureError, ValueError, TypeError):
+        return False
+
+def _verify_chunk(blocks: List[Dict[str, Any]]) -> List[bool]:
+    """Verify a chunk of blocks; module-level so process pools can run it."""
+    return [Signer.verify_block(block) for block in blocks]
 
 class Signer:
-    """Class for handling Ed25519 block signatures using pynacl."""
+    """
+    Class for handling Ed25519 block signatures using pynacl.
+    
+    Three signing schemes are supported. "legacy" signs the sorted-key JSON
+    of the whole block. "digest-v1" signs a fixed-size digest of the block: a
+    hash of the raw embedding bytes and a hash of the canonical JSON of the
+    other fields, so no float is ever formatted as text. "merkle-v1" signs
+    the root of a Merkle tree over the digests of a batch of blocks once, and
+    gives each block an inclusion proof. Blocks carry a "signature_scheme"
+    field; blocks without one are legacy-signed.
+    """
     
-    def __init__(self):
-        """Initialize a new signer with a random key pair."""
+    def __init__(self, scheme: str = LEGACY_SCHEME):
+        """
+        Initialize a new signer with a random key pair.
+        
+        Args:
+            scheme: Signing scheme for new signatures: "legacy", "digest-v1" or
+                "merkle-v1" (sign_block then signs a batch of one block)
+        """
+        if scheme not in SIGNATURE_SCHEMES:
+            raise ValueError(f"Unknown signature scheme: {scheme}")
+        self.scheme = scheme
         self.signing_key = nacl.signing.SigningKey.generate()
         self.verify_key = self.signing_key.verify_key
     
     @classmethod
-    def from_seed(cls, seed: bytes) -> 'Signer':
+    def from_seed(cls, seed: bytes, scheme: str = LEGACY_SCHEME) -> 'Signer':
         """Create a signer from a seed."""
-        instance = cls()
+        instance = cls(scheme)
         instance.signing_key = nacl.signing.SigningKey(seed)
         instance.verify_key = instance.signing_key.verify_key
         return instance
@@ -30,6 +87,152 @@ class Signer:
         """Get the private key in base64 format."""
         return base64.b64encode(bytes(self.signing_key)).decode('utf-8')
     
+    @staticmethod
+    def _json_default(value: Any) -> Any:
+        """Serialize numpy arrays and scalars the way their JSON form would read back."""
+        if hasattr(value, 'tolist'):
+            return value.tolist()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    
+    @classmethod
+    def _canonical_message(cls, block: Dict[str, Any]) -> bytes:
+        """
+        Build the signed message for a block: its sorted-key JSON without signature fields.
+        
+        Embeddings may be JSON arrays, numpy arrays or encoded matrices; each
+        is signed in the form it is stored in.
+        """
+        block_to_sign = {k: v for k, v in block.items() if k not in _UNSIGNED_FIELDS}
+        return json.dumps(block_to_sign, sort_keys=True, default=cls._json_default).encode('utf-8')
+    
+    @classmethod
+    def _embeddings_digest(cls, embeddings: Any) -> bytes:
+        """
+        Hash a block's embeddings from their raw bytes.
+        
+        Numeric matrices, as JSON arrays or numpy arrays, hash as little-endian
+        float64 together with their shape, so a block hashes the same whether
+        its embeddings were loaded as lists or as float32 arrays. Encoded
+        matrices hash their descriptor and their decoded payload bytes.
+        """
+        digest = hashlib.sha256()
+        if isinstance(embeddings, dict) and "data" in embeddings:
+            descriptor = {k: v for k, v in embeddings.items() if k != "data"}
+            digest.update(b"encoded\n")
+            digest.update(json.dumps(descriptor, sort_keys=True).encode('utf-8'))
+            digest.update(base64.b64decode(embeddings["data"]))
+            return digest.digest()
+        
+        matrix = None
+        if embeddings is not None:
+            try:
+                matrix = np.asarray(embeddings)
+            except ValueError:
+                # Ragged lists
+                pass
+        if matrix is not None and matrix.dtype.kind in "fiu":
+            digest.update(b"matrix\n")
+            digest.update(json.dumps(list(matrix.shape)).encode('utf-8'))
+            matrix = matrix.reshape(-1)
+            # Convert and hash in slices to bound the temporary copies
+            for start in range(0, matrix.size, 1 << 16):
+                digest.update(np.ascontiguousarray(matrix[start:start + (1 << 16)], dtype='<f8'))
+        else:
+            # Missing or non-numeric embeddings are hashed as canonical JSON
+            digest.update(b"json\n")
+            digest.update(json.dumps(embeddings, sort_keys=True, default=cls._json_default).encode('utf-8'))
+        return digest.digest()
+    
+    @classmethod
+    def _digest_message(cls, block: Dict[str, Any]) -> bytes:
+        """
+        Build the signed message of the digest-v1 scheme.
+        
+        The message is a scheme prefix, the sha256 of the sorted-key JSON of
+        every field but the embeddings and signature fields, and the
+        embeddings digest.
+        """
+        fields = {k: v for k, v in block.items() if k not in _UNSIGNED_FIELDS and k != 'embeddings'}
+        fields_digest = hashlib.sha256(
+            json.dumps(fields, sort_keys=True, default=cls._json_default).encode('utf-8')
+        ).digest()
+        return _DIGEST_PREFIX + fields_digest + cls._embeddings_digest(block.get('embeddings'))
+    
+    @classmethod
+    def block_digest(cls, block: Dict[str, Any]) -> bytes:
+        """
+        Hash every field of a block but its signature fields, whatever its scheme.
+        
+        Args:
+            block: The block
+            
+        Returns:
+            bytes: sha256 digest of the block's digest-v1 message
+        """
+        return hashlib.sha256(cls._digest_message(block)).digest()
+    
+    @classmethod
+    def signed_message(cls, block: Dict[str, Any]) -> bytes:
+        """
+        Get the message a block's signature covers, following its signature scheme.
+        
+        Args:
+            block: The block
+            
+        Returns:
+            bytes: The signed message
+        """
+        scheme = block.get('signature_scheme', LEGACY_SCHEME)
+        if scheme == DIGEST_SCHEME:
+            return cls._digest_message(block)
+        if scheme == LEGACY_SCHEME:
+            return cls._canonical_message(block)
+        if scheme == MERKLE_SCHEME:
+            proof = block['merkle_proof']
+            return _MERKLE_PREFIX + bytes.fromhex(proof['root']) + int(proof['size']).to_bytes(8, 'little')
+        raise ValueError(f"Unknown signature scheme: {scheme}")
+    
+    @classmethod
+    def _merkle_leaf(cls, block: Dict[str, Any]) -> bytes:
+        """Hash a block into its Merkle leaf: the digest-v1 message of everything but the proof."""
+        return leaf_hash(cls._digest_message({k: v for k, v in block.items() if k != 'merkle_proof'}))
+    
+    def sign_batch(self, blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Sign a batch of blocks with a single Ed25519 signature.
+        
+        A Merkle tree is built over the blocks' digests and its root is signed.
+        Every block gets the root signature and a "merkle_proof" with the root,
+        its leaf index, the batch size and the sibling hashes linking its leaf
+        to the root.
+        
+        Args:
+            blocks: The blocks to sign
+            
+        Returns:
+            The blocks with added signatures and proofs
+        """
+        if not blocks:
+            return blocks
+        for block in blocks:
+            block['signature_scheme'] = MERKLE_SCHEME
+        levels = build_levels([self._merkle_leaf(block) for block in blocks])
+        root = levels[-1][0]
+        message = _MERKLE_PREFIX + root + len(blocks).to_bytes(8, 'little')
+        signature = base64.b64encode(self.signing_key.sign(message).signature).decode('utf-8')
+        public_key = self.get_public_key()
+        
+        for index, block in enumerate(blocks):
+            block['merkle_proof'] = {
+                'root': root.hex(),
+                'index': index,
+                'size': len(blocks),
+                'path': [node.hex() for node in inclusion_proof(levels, index)]
+            }
+            block['signature'] = signature
+            block['public_key'] = public_key
+        return blocks
+    
     def sign_block(self, block: Dict[str, Any]) -> Dict[str, Any]:
         """
         Sign a block using Ed25519.
@@ -40,13 +243,15 @@ class Signer:
         Returns:
             The block with added signature
         """
-        # Create a copy of the block without the signature
-        block_to_sign = block.copy()
-        if 'signature' in block_to_sign:
-            del block_to_sign['signature']
-            
-        # Convert to JSON and encode
-        message = json.dumps(block_to_sign, sort_keys=True).encode('utf-8')
+        if self.scheme == MERKLE_SCHEME:
+            return self.sign_batch([block])[0]
+        
+        # The scheme is part of the signed fields, so it cannot be swapped
+        if self.scheme == LEGACY_SCHEME:
+            block.pop('signature_scheme', None)
+        else:
+            block['signature_scheme'] = self.scheme
+        message = self.signed_message(block)
         
         # Sign the message
         signature = self.signing_key.sign(message)
@@ -58,38 +263,114 @@ class Signer:
         return block
     
     @staticmethod
-    def verify_block(block: Dict[str, Any]) -> bool:
+    def verify_block(block: Dict[str, Any], cache: Optional["VerdictCache"] = None) -> bool:
         """
         Verify a block's signature.
         
         Args:
             block: The block to verify
+            cache: VerdictCache consulted first and updated with the verdict (optional)
             
         Returns:
             True if signature is valid, False otherwise
         """
         if 'signature' not in block or 'public_key' not in block:
             return False
-            
+        if cache is None:
+            return Signer._verify_signature(block)
+        
+        key = Signer._cache_key(block, cache)
+        if key is None:
+            return False
+        verdict = cache.get(key)
+        if verdict is not None:
+            return verdict[0]
+        is_valid = Signer._verify_signature(block)
+        cache.put(key, is_valid)
+        return is_valid
+    
+    @staticmethod
+    def _cache_key(block: Dict[str, Any], cache: "VerdictCache") -> Optional[str]:
+        """Get a block's verdict cache key, or None if the block is too malformed to hash."""
         try:
-            # Get the public key and signature
-            public_key = base64.b64decode(block['public_key'])
-            signature = base64.b64decode(block['signature'])
-            
-            # Create verifying key
-            verify_key = nacl.signing.VerifyKey(public_key)
+            return cache.make_key(block)
+        except (ValueError, KeyError, TypeError):
+            # Such as embeddings whose data is not valid base64
+            return None
+    
+    @staticmethod
+    def _verify_signature(block: Dict[str, Any]) -> bool:
+        """Check a block's signature under its signature scheme."""
+        try:
+            if block.get('signature_scheme') == MERKLE_SCHEME:
+                # Check the proof with hashes, then the (cached) root signature
+                proof = block['merkle_proof']
+                root = bytes.fromhex(proof['root'])
+                size = int(proof['size'])
+                path = [bytes.fromhex(node) for node in proof['path']]
+                if root_from_proof(Signer._merkle_leaf(block), int(proof['index']), size, path) != root:
+                    return False
+                return _verify_root(block['public_key'], block['signature'], root, size)
             
-            # Create a copy of the block without the signature
-            block_to_verify = block.copy()
-            del block_to_verify['signature']
-            del block_to_verify['public_key']
+            # Get the (cached) verifying key and the signature
+            verify_key = _load_verify_key(block['public_key'])
+            signature = base64.b64decode(block['signature'])
             
-            # Convert to JSON and encode
-            message = json.dumps(block_to_verify, sort_keys=True).encode('utf-8')
+            # Rebuild the message under the block's signature scheme
+            message = Signer.signed_message(block)
             
             # Verify the signature
             verify_key.verify(message, signature)
             return True
             
-        except (nacl.exceptions.BadSignatureError, ValueError, KeyError):
+        except (nacl.exceptions.BadSignatureError, ValueError, KeyError, TypeError):
             return False
+    
+    @staticmethod
+    def verify_blocks(blocks: Iterable[Dict[str, Any]],
+                      workers: Optional[int] = None,
+                      executor: str = "thread",
+                      chunk_size: int = 64,
+                      cache: Optional["VerdictCache"] = None) -> List[bool]:
+        """
+        Verify many blocks' signatures in parallel.
+        
+        Blocks are verified in chunks on a pool of workers. Threads suit small
+        blocks, since pynacl releases the GIL while verifying; processes also
+        parallelize the JSON canonicalization of large blocks, at the cost of
+        pickling them to the workers.
+        
+        Args:
+            blocks: Blocks to verify
+            workers: Number of workers (default: the number of CPUs)
+            executor: "thread" or "process"
+            chunk_size: Number of blocks handed to a worker at a time
+            cache: VerdictCache consulted first; only misses are verified (optional)
+            
+        Returns:
+            List[bool]: Verdict of every block, in input order
+        """
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor: {executor}")
+        blocks = list(blocks)
+        if cache is not None:
+            keys = [Signer._cache_key(block, cache) for block in blocks]
+            verdicts = [cache.get(key) if key is not None else (False, "") for key in keys]
+            missing = [i for i, verdict in enumerate(verdicts) if verdict is None]
+            fresh = Signer.verify_blocks([blocks[i] for i in missing], workers, executor, chunk_size)
+            for i, is_valid in zip(missing, fresh):
+                cache.put(keys[i], is_valid)
+                verdicts[i] = (is_valid, "")
+            return [verdict[0] for verdict in verdicts]
+        
+        workers = workers or os.cpu_count() or 1
+        chunks = [blocks[i:i + chunk_size] for i in range(0, len(blocks), chunk_size)]
+        if workers == 1 or len(chunks) <= 1:
+            return _verify_chunk(blocks)
+        
+        pool_class = ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+        with pool_class(max_workers=min(workers, len(chunks))) as pool:
+            verdicts: List[bool] = []
+            for chunk_verdicts in pool.map(_verify_chunk, chunks):
+                verdicts.extend(chunk_verdicts)
+            return verdicts
@@ -0,0 +1,133 @@
+# Handles keeping the current celestial signature warm in the background
+
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+
+class SkySnapshot(NamedTuple):
+    """A celestial signature computed ahead of time, and the time it was computed for."""
+    timestamp: float
+    signature: Dict
+
+class SkyStateRefresher:
+    """
+    Background thread recomputing the celestial signature of a fixed location.
+
+    Every interval the thread computes the signature for the middle of the
+    coming interval and publishes it as an immutable snapshot, replacing the
+    previous one with a single reference assignment. Readers never block and
+    always see a complete snapshot; if a computation fails the last snapshot is
+    kept until it ages out of the readers' tolerance.
+    """
+
+    def __init__(self,
+                 compute: Callable[[float], Dict],
+                 interval: float = 10.0,
+                 clock: Callable[[], float] = time.time):
+        """
+        Initialize the refresher.
+
+        Args:
+            compute: Function computing the celestial signature of a Unix timestamp
+            interval: Seconds between computations
+            clock: Source of the current Unix time
+        """
+        if interval <= 0:
+            raise ValueError("Refresh interval must be positive")
+        self.compute = compute
+        self.interval = interval
+        self.clock = clock
+
+        self._snapshot: Optional[SkySnapshot] = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.refreshes = 0
+        self.errors = 0
+        self.last_duration = 0.0
+
+    @property
+    def snapshot(self) -> Optional[SkySnapshot]:
+        """The latest snapshot, or None before the first computation finishes."""
+        return self._snapshot
+
+    @property
+    def running(self) -> bool:
+        """Whether the background thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def refresh(self) -> SkySnapshot:
+        """
+        Compute and publish a snapshot now.
+
+        Returns:
+            SkySnapshot: The new snapshot
+        """
+        start = time.perf_counter()
+        timestamp = self.clock() + self.interval / 2
+        snapshot = SkySnapshot(timestamp, self.compute(timestamp))
+        self._snapshot = snapshot
+        self.last_duration = time.perf_counter() - start
+        self.refreshes += 1
+        self._ready.set()
+        return snapshot
+
+    def start(self) -> None:
+        """Start the background thread; the first snapshot is computed right away."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sky-state-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background thread.
+
+        Args:
+            timeout: Seconds to wait for a computation in progress (default: wait until done)
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the first snapshot.
+
+        Args:
+            timeout: Seconds to wait (default: forever)
+
+        Returns:
+            bool: Whether a snapshot is available
+        """
+        return self._ready.wait(timeout)
+
+    def current(self, timestamp: float, tolerance: float) -> Optional[SkySnapshot]:
+        """
+        Get the latest snapshot if it is close enough to a timestamp.
+
+        Args:
+            timestamp: Unix timestamp to serve
+            tolerance: Largest accepted distance in seconds from the snapshot's timestamp
+
+        Returns:
+            Optional[SkySnapshot]: The snapshot, or None if there is none close enough
+        """
+        snapshot = self._snapshot
+        if snapshot is None or abs(timestamp - snapshot.timestamp) > tolerance:
+            return None
+        return snapshot
+
+    def _run(self) -> None:
+        """Recompute snapshots until stopped."""
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the last snapshot; readers fall back once it is too old
+                self.errors += 1
+                print(f"Error refreshing the sky state: {e}")
+            self._stop.wait(self.interval)
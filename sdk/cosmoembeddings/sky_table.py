@@ -0,0 +1,203 @@
+# Handles precomputed celestial signature tables
+
+import math
+import os
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .validator import CosmoValidator
+
+# Sun and moon values of a celestial signature, one column each
+POSITION_FIELDS = (
+    "sun_altitude",
+    "sun_azimuth",
+    "sun_distance",
+    "moon_altitude",
+    "moon_azimuth",
+    "moon_distance",
+    "moon_phase"
+)
+
+class SkyTable:
+    """
+    Celestial signatures of a fixed observer, precomputed over a time range.
+
+    Sample times are kept sorted in a NumPy array, so a lookup is a binary
+    search that returns the nearest sample within the tolerance (half a step by
+    default). Cosmo signature strings are stored once each and referenced by
+    index. Tables are saved as compressed .npz files without pickled objects.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self,
+                 latitude: float,
+                 longitude: float,
+                 elevation: float,
+                 timestamps: np.ndarray,
+                 positions: Dict[str, np.ndarray],
+                 signature_codes: np.ndarray,
+                 signature_names: Sequence[str],
+                 step: float,
+                 tolerance: Optional[float] = None):
+        """
+        Initialize the table.
+
+        Args:
+            latitude: Observer latitude in degrees
+            longitude: Observer longitude in degrees
+            elevation: Observer elevation in meters
+            timestamps: Sorted Unix timestamps of the samples
+            positions: One array per POSITION_FIELDS entry, aligned with timestamps
+            signature_codes: Index into signature_names of each sample's cosmo signature
+            signature_names: Distinct cosmo signature strings
+            step: Seconds between samples
+            tolerance: Largest distance in seconds from a sample served by lookups
+                (default: half a step)
+        """
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.elevation = float(elevation)
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.positions = {field: np.asarray(positions[field], dtype=np.float64) for field in POSITION_FIELDS}
+        self.signature_codes = np.asarray(signature_codes, dtype=np.int32)
+        self.signature_names = [str(name) for name in signature_names]
+        self.step = float(step)
+        self.tolerance = self.step / 2 if tolerance is None else float(tolerance)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def start(self) -> float:
+        """Timestamp of the first sample."""
+        return float(self.timestamps[0])
+
+    @property
+    def end(self) -> float:
+        """Timestamp of the last sample."""
+        return float(self.timestamps[-1])
+
+    @classmethod
+    def compute(cls,
+                validator: "CosmoValidator",
+                start: float,
+                end: float,
+                step: float = 10.0,
+                chunk_size: int = 4096) -> "SkyTable":
+        """
+        Precompute the celestial signatures of a validator's location.
+
+        Args:
+            validator: CosmoValidator whose location, ephemeris and signature
+                generator produce the samples
+            start: First Unix timestamp
+            end: Last Unix timestamp (included when it falls on a step)
+            step: Seconds between samples
+            chunk_size: Number of samples whose positions are computed together
+
+        Returns:
+            SkyTable: The table
+        """
+        if step <= 0:
+            raise ValueError("Step must be positive")
+        if end < start:
+            raise ValueError("End must not precede start")
+        timestamps = start + np.arange(int(math.floor((end - start) / step)) + 1) * step
+
+        positions = {field: np.empty(len(timestamps)) for field in POSITION_FIELDS}
+        signatures = []
+        for offset in range(0, len(timestamps), chunk_size):
+            chunk = timestamps[offset:offset + chunk_size]
+            chunk_positions = validator._body_positions([float(timestamp) for timestamp in chunk])
+            for field in POSITION_FIELDS:
+                positions[field][offset:offset + len(chunk)] = chunk_positions[field]
+            signatures.extend(validator.signature_generator.generate_signature(
+                latitude=validator.latitude,
+                longitude=validator.longitude,
+                elevation=validator.elevation,
+                timestamp=float(timestamp)
+            ) for timestamp in chunk)
+
+        signature_names, signature_codes = np.unique(np.array(signatures, dtype=str), return_inverse=True)
+        return cls(validator.latitude, validator.longitude, validator.elevation,
+                   timestamps, positions, signature_codes, signature_names, step)
+
+    def save(self, path: str) -> None:
+        """
+        Write the table to a .npz file.
+
+        Args:
+            path: File to write
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(
+            path,
+            version=np.array(self.FORMAT_VERSION),
+            location=np.array([self.latitude, self.longitude, self.elevation]),
+            step=np.array(self.step),
+            timestamps=self.timestamps,
+            signature_codes=self.signature_codes,
+            signature_names=np.array(self.signature_names, dtype=str),
+            **self.positions
+        )
+
+    @classmethod
+    def load(cls, path: str, tolerance: Optional[float] = None) -> "SkyTable":
+        """
+        Read a table written by save.
+
+        Args:
+            path: .npz file
+            tolerance: Lookup tolerance in seconds (default: half a step)
+
+        Returns:
+            SkyTable: The table
+
+        Raises:
+            ValueError: If the file has an unsupported format version
+        """
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != cls.FORMAT_VERSION:
+                raise ValueError(f"Unsupported sky table version: {int(data['version'])}")
+            latitude, longitude, elevation = data["location"]
+            return cls(latitude, longitude, elevation,
+                       timestamps=data["timestamps"],
+                       positions={field: data[field] for field in POSITION_FIELDS},
+                       signature_codes=data["signature_codes"],
+                       signature_names=data["signature_names"].tolist(),
+                       step=float(data["step"]),
+                       tolerance=tolerance)
+
+    def matches(self, latitude: float, longitude: float, elevation: float = 0.0) -> bool:
+        """Check whether the table was computed for an observer location."""
+        return (self.latitude, self.longitude, self.elevation) == (float(latitude), float(longitude), float(elevation))
+
+    def nearest(self, timestamps: Union[float, Sequence[float], np.ndarray]) -> np.ndarray:
+        """
+        Find the nearest sample of each timestamp by binary search.
+
+        Args:
+            timestamps: Unix timestamp(s)
+
+        Returns:
+            np.ndarray: Sample indices shaped like the input, -1 where no sample
+            lies within the tolerance
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if len(self.timestamps) == 0:
+            return np.full(timestamps.shape, -1, dtype=np.int64)
+        right = np.minimum(np.searchsorted(self.timestamps, timestamps), len(self.timestamps) - 1)
+        left = np.maximum(right - 1, 0)
+        # Compare the samples on either side of the insertion point
+        nearest = np.where(np.abs(self.timestamps[right] - timestamps) < np.abs(timestamps - self.timestamps[left]),
+                           right, left)
+        within = np.abs(self.timestamps[nearest] - timestamps) <= self.tolerance
+        return np.where(within, nearest, -1)
+
+    def cosmo_signature(self, index: int) -> str:
+        """Get the cosmo signature string of a sample."""
+        return self.signature_names[self.signature_codes[index]]
@@ -0,0 +1,244 @@
+# Handles local star positions
+
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from skyfield.api import wgs84
+from .ephemeris import get_timescale
+
+# The brightest stars: (name, right ascension (deg, J2000), declination (deg, J2000),
+# visual magnitude, distance (light years))
+BRIGHT_STARS = (
+    ("Sirius", 101.2872, -16.7161, -1.46, 8.6),
+    ("Canopus", 95.9880, -52.6957, -0.74, 310.0),
+    ("Rigil Kentaurus", 219.9021, -60.8340, -0.27, 4.4),
+    ("Arcturus", 213.9153, 19.1824, -0.05, 36.7),
+    ("Vega", 279.2347, 38.7837, 0.03, 25.0),
+    ("Capella", 79.1723, 45.9980, 0.08, 42.2),
+    ("Rigel", 78.6345, -8.2016, 0.12, 860.0),
+    ("Procyon", 114.8255, 5.2250, 0.34, 11.4),
+    ("Achernar", 24.4285, -57.2368, 0.46, 139.0),
+    ("Betelgeuse", 88.7929, 7.4071, 0.50, 642.0),
+    ("Hadar", 210.9559, -60.3730, 0.61, 390.0),
+    ("Altair", 297.6958, 8.8683, 0.76, 16.7),
+    ("Acrux", 186.6496, -63.0991, 0.76, 320.0),
+    ("Aldebaran", 68.9802, 16.5093, 0.86, 65.0),
+    ("Antares", 247.3519, -26.4320, 0.96, 550.0),
+    ("Spica", 201.2983, -11.1613, 0.97, 250.0),
+    ("Pollux", 116.3290, 28.0262, 1.14, 34.0),
+    ("Fomalhaut", 344.4128, -29.6222, 1.16, 25.0),
+    ("Deneb", 310.3580, 45.2803, 1.25, 2600.0),
+    ("Mimosa", 191.9303, -59.6888, 1.25, 280.0),
+    ("Regulus", 152.0930, 11.9672, 1.40, 79.0),
+    ("Adhara", 104.6565, -28.9721, 1.50, 430.0),
+    ("Castor", 113.6495, 31.8883, 1.58, 51.0),
+    ("Shaula", 263.4022, -37.1038, 1.62, 570.0),
+    ("Gacrux", 187.7915, -57.1132, 1.63, 88.0),
+    ("Bellatrix", 81.2828, 6.3497, 1.64, 250.0),
+    ("Elnath", 81.5730, 28.6075, 1.65, 130.0),
+    ("Miaplacidus", 138.2999, -69.7172, 1.67, 113.0),
+    ("Alnilam", 84.0534, -1.2019, 1.69, 2000.0),
+    ("Alnair", 332.0583, -46.9610, 1.74, 101.0),
+    ("Alnitak", 85.1897, -1.9426, 1.77, 1260.0),
+    ("Alioth", 193.5073, 55.9598, 1.77, 81.0),
+    ("Dubhe", 165.9320, 61.7510, 1.79, 123.0),
+    ("Mirfak", 51.0807, 49.8612, 1.79, 510.0),
+    ("Wezen", 107.0979, -26.3932, 1.83, 1600.0),
+    ("Kaus Australis", 276.0430, -34.3846, 1.85, 143.0),
+    ("Sargas", 264.3297, -42.9978, 1.86, 300.0),
+    ("Avior", 125.6285, -59.5095, 1.86, 630.0),
+    ("Alkaid", 206.8852, 49.3133, 1.86, 104.0),
+    ("Menkalinan", 89.8822, 44.9474, 1.90, 81.0),
+    ("Atria", 252.1662, -69.0277, 1.91, 420.0),
+    ("Alhena", 99.4280, 16.3993, 1.92, 109.0),
+    ("Peacock", 306.4119, -56.7351, 1.94, 180.0),
+    ("Polaris", 37.9546, 89.2641, 1.98, 433.0),
+    ("Mirzam", 95.6749, -17.9559, 1.98, 500.0),
+    ("Alphard", 141.8968, -8.6586, 1.98, 180.0),
+    ("Hamal", 31.7934, 23.4624, 2.00, 66.0),
+    ("Diphda", 10.8974, -17.9866, 2.02, 96.0),
+    ("Nunki", 283.8164, -26.2967, 2.05, 228.0),
+    ("Mirach", 17.4330, 35.6206, 2.05, 197.0),
+    ("Menkent", 211.6706, -36.3700, 2.06, 59.0),
+    ("Alpheratz", 2.0969, 29.0904, 2.06, 97.0),
+    ("Rasalhague", 263.7336, 12.5600, 2.07, 49.0),
+    ("Kochab", 222.6764, 74.1555, 2.08, 131.0),
+    ("Saiph", 86.9391, -9.6696, 2.09, 650.0),
+    ("Algol", 47.0422, 40.9556, 2.12, 90.0),
+    ("Denebola", 177.2649, 14.5721, 2.13, 36.0),
+    ("Schedar", 10.1268, 56.5373, 2.24, 228.0)
+)
+
+class StarCatalog:
+    """
+    A star catalog held in NumPy arrays, with vectorized horizon coordinates.
+
+    Apparent altitude and azimuth come from rotating the catalog directions into
+    the observer's horizon frame with skyfield's precession, nutation and Earth
+    rotation model. No ephemeris is needed; aberration, parallax, proper motion
+    and refraction are ignored, which keeps positions within 0.02 degrees
+    in altitude for bright stars.
+    """
+
+    def __init__(self,
+                 names: Sequence[str],
+                 ra_degrees: Sequence[float],
+                 dec_degrees: Sequence[float],
+                 magnitudes: Sequence[float],
+                 distances: Sequence[float]):
+        """
+        Initialize the catalog.
+
+        Args:
+            names: Star names
+            ra_degrees: Right ascensions in degrees (ICRS)
+            dec_degrees: Declinations in degrees (ICRS)
+            magnitudes: Visual magnitudes
+            distances: Distances in light years
+        """
+        self.names = list(names)
+        self.ra = np.asarray(ra_degrees, dtype=np.float64)
+        self.dec = np.asarray(dec_degrees, dtype=np.float64)
+        self.magnitudes = np.asarray(magnitudes, dtype=np.float64)
+        self.distances = np.asarray(distances, dtype=np.float64)
+
+        # Unit vectors of the catalog directions, 3 x N
+        ra, dec = np.radians(self.ra), np.radians(self.dec)
+        self.vectors = np.array([np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_hipparcos(cls, path: Optional[str] = None, magnitude_limit: float = 3.5) -> "StarCatalog":
+        """
+        Build a catalog from the Hipparcos main catalog.
+
+        Args:
+            path: Local copy of hip_main.dat (default: skyfield's download location)
+            magnitude_limit: Faintest magnitude kept
+
+        Returns:
+            StarCatalog: Stars brighter than the limit, named by HIP number
+        """
+        from skyfield.api import load
+        from skyfield.data import hipparcos
+
+        with load.open(path or hipparcos.URL) as f:
+            stars = hipparcos.load_dataframe(f)
+        stars = stars[(stars["magnitude"] <= magnitude_limit) & stars["ra_degrees"].notnull()]
+        # Parallax in milliarcseconds to light years
+        parallax = stars["parallax_mas"].where(stars["parallax_mas"] > 0)
+        return cls(
+            names=[f"HIP {hip}" for hip in stars.index],
+            ra_degrees=stars["ra_degrees"].to_numpy(),
+            dec_degrees=stars["dec_degrees"].to_numpy(),
+            magnitudes=stars["magnitude"].to_numpy(),
+            distances=(3261.56 / parallax).fillna(0.0).to_numpy()
+        )
+
+    def horizon_coordinates(self,
+                            latitude: float,
+                            longitude: float,
+                            elevation: float = 0.0,
+                            timestamp: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Compute the altitude and azimuth of every star for an observer.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            elevation: Elevation in meters (default: 0.0)
+            timestamp: Unix timestamp (default: current time)
+
+        Returns:
+            Dict[str, np.ndarray]: "altitude" and "azimuth" arrays in degrees
+        """
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc).timestamp()
+        t = get_timescale().from_datetime(datetime.fromtimestamp(timestamp, tz=timezone.utc))
+        # Rows of the rotation point north, east and up
+        north, east, up = wgs84.latlon(latitude, longitude, elevation_m=elevation).rotation_at(t) @ self.vectors
+        return {
+            "altitude": np.degrees(np.arcsin(np.clip(up, -1.0, 1.0))),
+            "azimuth": np.degrees(np.arctan2(east, north)) % 360.0
+        }
+
+    def visible(self,
+                latitude: float,
+                longitude: float,
+                elevation: float = 0.0,
+                timestamp: Optional[float] = None,
+                min_altitude: float = 0.0) -> Dict[str, np.ndarray]:
+        """
+        Select the stars above the horizon, brightest first, as arrays.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            elevation: Elevation in meters (default: 0.0)
+            timestamp: Unix timestamp (default: current time)
+            min_altitude: Lowest altitude counted as visible, in degrees
+
+        Returns:
+            Dict[str, np.ndarray]: "index" (catalog positions), "magnitude", "ra",
+            "dec", "distance", "altitude" and "azimuth" arrays
+        """
+        coordinates = self.horizon_coordinates(latitude, longitude, elevation, timestamp)
+        visible = np.flatnonzero(coordinates["altitude"] > min_altitude)
+        # Stable sort so equally bright stars keep catalog order
+        visible = visible[np.argsort(self.magnitudes[visible], kind="stable")]
+        return {
+            "index": visible,
+            "magnitude": self.magnitudes[visible],
+            "ra": self.ra[visible],
+            "dec": self.dec[visible],
+            "distance": self.distances[visible],
+            "altitude": coordinates["altitude"][visible],
+            "azimuth": coordinates["azimuth"][visible]
+        }
+
+    def visible_stars(self,
+                      latitude: float,
+                      longitude: float,
+                      elevation: float = 0.0,
+                      timestamp: Optional[float] = None,
+                      min_altitude: float = 0.0) -> List[Dict]:
+        """
+        List the stars above the horizon, brightest first.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            elevation: Elevation in meters (default: 0.0)
+            timestamp: Unix timestamp (default: current time)
+            min_altitude: Lowest altitude counted as visible, in degrees
+
+        Returns:
+            List[Dict]: Star positions with name, magnitude, ra, dec, distance,
+            altitude and azimuth
+        """
+        visible = self.visible(latitude, longitude, elevation, timestamp, min_altitude)
+        return [{
+            "name": self.names[index],
+            "magnitude": float(visible["magnitude"][i]),
+            "ra": float(visible["ra"][i]),
+            "dec": float(visible["dec"][i]),
+            "distance": float(visible["distance"][i]),
+            "altitude": float(visible["altitude"][i]),
+            "azimuth": float(visible["azimuth"][i])
+        } for i, index in enumerate(visible["index"])]
+
+_default_catalog: Optional[StarCatalog] = None
+_lock = threading.Lock()
+
+def default_catalog() -> StarCatalog:
+    """Get the process-wide catalog of the brightest stars."""
+    global _default_catalog
+    if _default_catalog is None:
+        with _lock:
+            if _default_catalog is None:
+                _default_catalog = StarCatalog(*zip(*BRIGHT_STARS))
+    return _default_catalog
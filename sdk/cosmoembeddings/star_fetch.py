@@ -0,0 +1,331 @@
+# Handles fetching star positions from an astronomical API
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Placeholder endpoint; the response format below follows it
+DEFAULT_STARS_URL = "https://api.astronomyapi.com/v1/objects/stars"
+
+class CircuitBreaker:
+    """
+    Stops calling a failing upstream for a while.
+
+    After failure_threshold consecutive failures the breaker opens and
+    refuses calls for reset_timeout seconds. It then lets one trial call
+    through (half-open): a success closes it, a failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before a trial call
+            clock: Monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Check whether a call may go ahead."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                # Let a single trial call through
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        """Record a failed call."""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+
+class StarDataFetcher:
+    """
+    Fetches star positions over a pooled HTTP session.
+
+    Requests have strict connect and read timeouts and a small retry budget,
+    and go through a circuit breaker so a failing upstream costs nothing once
+    the breaker opens. Responses are cached by location and time rounded to
+    configurable resolutions; the upstream is asked for the rounded moment, so
+    every lookup within a cell sees the same stars. Concurrent misses on one
+    cell share a single request, and batches of timestamps can be prefetched
+    concurrently. A failed fetch returns an empty list, leaving the
+    caller to fall back to local data.
+    """
+
+    def __init__(self,
+                 api_key: str,
+                 url: str = DEFAULT_STARS_URL,
+                 timeout: Tuple[float, float] = (3.05, 10.0),
+                 retries: int = 1,
+                 backoff: float = 0.2,
+                 breaker: Optional[CircuitBreaker] = None,
+                 location_decimals: int = 2,
+                 time_resolution: float = 60.0,
+                 cache_size: int = 4096,
+                 pool_size: int = 8):
+        """
+        Initialize the fetcher.
+
+        Args:
+            api_key: API key sent as a bearer token
+            url: Star positions endpoint
+            timeout: (connect, read) timeout of each request in seconds
+            retries: Extra attempts after a connection error, timeout or server error
+            backoff: Seconds before the first retry, doubling for each further one
+            breaker: Circuit breaker guarding the upstream (default: a new one)
+            location_decimals: Decimal places latitude and longitude are rounded to
+            time_resolution: Seconds timestamps are rounded down to
+            cache_size: Most responses cached, least recently used dropped first
+            pool_size: Connections kept per host and prefetch threads
+        """
+        self.api_key = api_key
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.location_decimals = location_decimals
+        self.time_resolution = time_resolution
+        self.cache_size = cache_size
+        self.pool_size = pool_size
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+        self._cache: "OrderedDict[Tuple[float, float, float], List[Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Requests in flight per cache cell, for lookups arriving meanwhile
+        self._in_flight: Dict[Tuple[float, float, float], Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.requests = 0
+        self.failures = 0
+        self.rejected = 0
+
+    def cache_key(self, latitude: float, longitude: float, timestamp: float) -> Tuple[float, float, float]:
+        """
+        Round a location and time to their cache cell.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            timestamp: Unix timestamp
+
+        Returns:
+            Tuple[float, float, float]: Rounded latitude, longitude and timestamp
+        """
+        return (round(latitude, self.location_decimals),
+                round(longitude, self.location_decimals),
+                (timestamp // self.time_resolution) * self.time_resolution)
+
+    def fetch(self, latitude: float, longitude: float, elevation: float, timestamp: float) -> List[Dict]:
+        """
+        Get the star positions for an observer, from the cache or the upstream.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            elevation: Elevation in meters
+            timestamp: Unix timestamp
+
+        Returns:
+            List[Dict]: Star positions with name, magnitude, ra, dec and distance,
+            or an empty list if they could not be fetched
+        """
+        key = self.cache_key(latitude, longitude, timestamp)
+        with self._lock:
+            stars = self._cache.get(key)
+            if stars is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return [dict(star) for star in stars]
+            pending = self._in_flight.get(key)
+            if pending is None:
+                pending = self._in_flight[key] = Future()
+                self.misses += 1
+                owner = True
+            else:
+                self.coalesced += 1
+                owner = False
+
+        if not owner:
+            # Another thread is already asking the upstream for this cell
+            return [dict(star) for star in pending.result()]
+
+        stars: List[Dict] = []
+        try:
+            stars = self._request(key, elevation)
+            if stars:
+                with self._lock:
+                    self._cache[key] = stars
+                    self._cache.move_to_end(key)
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            pending.set_result(stars)
+        return [dict(star) for star in stars]
+
+    def prefetch(self,
+                 latitude: float,
+                 longitude: float,
+                 elevation: float,
+                 timestamps: Sequence[float]) -> List[List[Dict]]:
+        """
+        Fetch the star positions of many timestamps concurrently.
+
+        Each cache cell is fetched once, on a pool of pool_size threads.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            elevation: Elevation in meters
+            timestamps: Unix timestamps
+
+        Returns:
+            List[List[Dict]]: Star positions per timestamp, in input order
+        """
+        cells: Dict[float, float] = {}
+        for timestamp in timestamps:
+            cells.setdefault(self.cache_key(latitude, longitude, timestamp)[2], timestamp)
+
+        def fetch_cell(timestamp: float) -> List[Dict]:
+            return self.fetch(latitude, longitude, elevation, timestamp)
+
+        if len(cells) > 1:
+            if self._executor is None:
+                with self._lock:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(max_workers=self.pool_size,
+                                                            thread_name_prefix="star-fetch")
+            fetched = dict(zip(cells, self._executor.map(fetch_cell, cells.values())))
+        else:
+            fetched = {cell: fetch_cell(timestamp) for cell, timestamp in cells.items()}
+        # Copies, so that timestamps sharing a cell never share star dicts
+        return [[dict(star) for star in fetched[self.cache_key(latitude, longitude, timestamp)[2]]]
+                for timestamp in timestamps]
+
+    def stats(self) -> Dict:
+        """Get cache, request and breaker counters."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "requests": self.requests,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "breaker": self.breaker.state,
+                "entries": len(self._cache)
+            }
+
+    def close(self) -> None:
+        """Close the session and stop the prefetch threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.session.close()
+
+    def _request(self, key: Tuple[float, float, float], elevation: float) -> List[Dict]:
+        """Ask the upstream for the stars of a cache cell, within the retry budget and the breaker."""
+        latitude, longitude, timestamp = key
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "elevation": elevation,
+            "date": datetime.fromtimestamp(timestamp).strftime("%Y-%m-%dT%H:%M:%S"),
+            "format": "json"
+        }
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                with self._lock:
+                    self.rejected += 1
+                return []
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            with self._lock:
+                self.requests += 1
+            try:
+                response = self.session.get(self.url, params=params, timeout=self.timeout)
+                if response.status_code >= 500:
+                    raise requests.exceptions.HTTPError(f"{response.status_code} server error", response=response)
+                response.raise_for_status()
+                stars = self._parse(response.json())
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.HTTPError) as e:
+                self._record_failure()
+                retryable = e.response is None or e.response.status_code >= 500
+                if retryable and attempt < self.retries:
+                    continue
+                print(f"Error fetching star positions: {e}")
+                return []
+            except Exception as e:
+                # Malformed requests or responses do not improve on retry, and
+                # every error must be recorded to settle a half-open breaker
+                self._record_failure()
+                print(f"Error fetching star positions: {e}")
+                return []
+            self.breaker.record_success()
+            return stars
+        return []
+
+    def _record_failure(self) -> None:
+        """Count a failed request against the breaker."""
+        self.breaker.record_failure()
+        with self._lock:
+            self.failures += 1
+
+    @staticmethod
+    def _parse(data: Dict) -> List[Dict]:
+        """Extract star positions from an API response."""
+        # The actual response format will depend on the API used
+        if not isinstance(data, dict) or not isinstance(data.get("stars", []), list):
+            raise ValueError("Unexpected star positions response")
+        return [{
+            "name": star.get("name", ""),
+            "magnitude": star.get("magnitude", 0.0),
+            "ra": star.get("ra", 0.0),  # Right ascension
+            "dec": star.get("dec", 0.0),  # Declination
+            "distance": star.get("distance", 0.0)  # Distance in light years
+        } for star in data.get("stars", []) if isinstance(star, dict)]
@@ -0,0 +1,423 @@
+# Handles staged validation of incoming blocks
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Set, Tuple
+
+from .signer import Signer
+
+if TYPE_CHECKING:
+    from .validator import CosmoValidator
+    from .verdict_cache import VerdictCache
+
+@dataclass
+class StageResult:
+    """Outcome of one validation stage."""
+    stage: str
+    passed: bool
+    reason: str
+    seconds: float
+
+@dataclass
+class ValidationReport:
+    """Outcome of a validation pipeline run, with the stages that ran in order."""
+    is_valid: bool
+    reason: str
+    stages: List[StageResult] = field(default_factory=list)
+
+    @property
+    def failed_stage(self) -> Optional[str]:
+        """Name of the stage that rejected the block, if any."""
+        if self.is_valid or not self.stages:
+            return None
+        return self.stages[-1].stage
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """Seconds spent in each stage that ran."""
+        return {result.stage: result.seconds for result in self.stages}
+
+class ValidationStage:
+    """
+    A validation stage.
+
+    Subclasses implement check, and may implement accept to remember blocks
+    the whole pipeline accepted and release to undo what check reserved for a
+    block a later stage rejected.
+    """
+
+    name = "stage"
+
+    def check(self, block: Dict, size: Optional[int] = None) -> Tuple[bool, str]:
+        """
+        Check a block.
+
+        Args:
+            block: The block
+            size: Size of the block's serialized form in bytes, if known
+
+        Returns:
+            Tuple[bool, str]: (passed, reason)
+        """
+        raise NotImplementedError
+
+    def accept(self, block: Dict) -> None:
+        """Record a block that passed every stage."""
+
+    def release(self, block: Dict) -> None:
+        """Forget a block that passed this stage but not a later one."""
+
+class SchemaStage(ValidationStage):
+    """Checks that a block is an object with the required fields, of the right types."""
+
+    name = "schema"
+
+    # Required fields and the types they may have
+    REQUIRED_FIELDS = {
+        "id": (str,),
+        "timestamp": (int, float),
+        "embeddings": (list, dict),
+        "signature": (str,),
+        "public_key": (str,)
+    }
+
+    # Fields the node stamps when a block comes without them (see StampStage)
+    OPTIONAL_FIELDS = {
+        "cosmo_signature": (dict,),
+        "cosmo_hash": (str,)
+    }
+
+    def __init__(self,
+                 required_fields: Optional[Dict[str, tuple]] = None,
+                 optional_fields: Optional[Dict[str, tuple]] = None):
+        """
+        Initialize the stage.
+
+        Args:
+            required_fields: Field names mapped to their allowed types
+                (default: REQUIRED_FIELDS)
+            optional_fields: Field names that may be missing, mapped to their
+                allowed types (default: OPTIONAL_FIELDS)
+        """
+        self.required_fields = self.REQUIRED_FIELDS if required_fields is None else required_fields
+        self.optional_fields = self.OPTIONAL_FIELDS if optional_fields is None else optional_fields
+
+    def check(self, block: Dict, size: Optional[int] = None) -> Tuple[bool, str]:
+        if not isinstance(block, dict):
+            return False, "Block is not a JSON object"
+        for name, types in list(self.required_fields.items()) + list(self.optional_fields.items()):
+            if name not in block:
+                if name in self.optional_fields:
+                    continue
+                return False, f"Block missing {name}"
+            value = block[name]
+            # bool is an int subclass but never a valid field value
+            if isinstance(value, bool) or not isinstance(value, types):
+                return False, f"Block field {name} has the wrong type"
+        if not block["id"]:
+            return False, "Block ID missing"
+        return True, "Block schema valid"
+
+class SizeStage(ValidationStage):
+    """Checks a block's serialized size and embedding matrix dimensions."""
+
+    name = "size"
+
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024, max_embeddings: int = 4096, max_dimensions: int = 4096):
+        """
+        Initialize the stage.
+
+        Args:
+            max_bytes: Largest serialized block accepted
+            max_embeddings: Most embedding rows accepted
+            max_dimensions: Most dimensions per embedding accepted
+        """
+        self.max_bytes = max_bytes
+        self.max_embeddings = max_embeddings
+        self.max_dimensions = max_dimensions
+
+    def check(self, block: Dict, size: Optional[int] = None) -> Tuple[bool, str]:
+        if size is None or size < 0:
+            size = len(json.dumps(block).encode("utf-8"))
+        if size > self.max_bytes:
+            return False, f"Block too large ({size} bytes)"
+
+        embeddings = block.get("embeddings")
+        if isinstance(embeddings, dict):
+            # Encoded matrices declare their shape
+            shape = embeddings.get("shape")
+            if not isinstance(shape, list) or len(shape) != 2:
+                return False, "Block embedding shape invalid"
+            rows, dimensions = shape
+        elif isinstance(embeddings, list):
+            rows = len(embeddings)
+            dimensions = max((len(row) for row in embeddings if isinstance(row, list)), default=0)
+        else:
+            rows, dimensions = 0, 0
+        if not isinstance(rows, int) or not isinstance(dimensions, int):
+            return False, "Block embedding shape invalid"
+        if rows > self.max_embeddings:
+            return False, f"Block has too many embeddings ({rows})"
+        if dimensions > self.max_dimensions:
+            return False, f"Block embeddings have too many dimensions ({dimensions})"
+        return True, "Block size valid"
+
+class TimestampStage(ValidationStage):
+    """
+    Checks that a block's timestamp is recent and that its ID was not accepted before.
+
+    A block passing the check is reserved by its digest, over every field
+    and its signature, so a concurrent copy of a block still being validated
+    is rejected too, while a different block merely claiming the same ID is
+    not; the reservation is released if a later stage rejects the block.
+    Accepted IDs are remembered until their block's timestamp leaves the
+    window, after which a replayed block fails the window check instead.
+    """
+
+    name = "timestamp"
+
+    def __init__(self, max_age: float = 300, max_tracked: int = 100000):
+        """
+        Initialize the stage.
+
+        Args:
+            max_age: Largest difference in seconds between a block's timestamp and now
+            max_tracked: Most accepted block IDs remembered for replay detection
+        """
+        self.max_age = max_age
+        self.max_tracked = max_tracked
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._pending: Set[bytes] = set()
+        self._reserved: Dict[int, bytes] = {}
+        self._lock = threading.Lock()
+
+    def check(self, block: Dict, size: Optional[int] = None) -> Tuple[bool, str]:
+        now = time.time()
+        timestamp = block["timestamp"]
+        if not now - self.max_age <= timestamp <= now + self.max_age:
+            return False, "Block timestamp outside the accepted window"
+        with self._lock:
+            self._expire(now)
+            if block["id"] in self._seen:
+                return False, "Block already accepted (replay)"
+        key = self._reservation_key(block)
+        with self._lock:
+            if key in self._pending:
+                return False, "Block already being validated (replay)"
+            self._pending.add(key)
+            # Later stages may stamp the block, so the key is kept rather than recomputed
+            self._reserved[id(block)] = key
+        return True, "Block timestamp valid"
+
+    def accept(self, block: Dict) -> None:
+        with self._lock:
+            self._pending.discard(self._reserved.pop(id(block), None))
+            # The block fails the window check on its own after this time
+            self._seen[block["id"]] = block["timestamp"] + self.max_age
+            self._seen.move_to_end(block["id"])
+            while len(self._seen) > self.max_tracked:
+                self._seen.popitem(last=False)
+
+    def release(self, block: Dict) -> None:
+        with self._lock:
+            self._pending.discard(self._reserved.pop(id(block), None))
+
+    @staticmethod
+    def _reservation_key(block: Dict) -> bytes:
+        """Digest of a block as received, covering its signature."""
+        return Signer.block_digest(block) + str(block["signature"]).encode("utf-8")
+
+    def _expire(self, now: float) -> None:
+        """Forget IDs whose blocks would now fail the window check."""
+        while self._seen:
+            block_id, expires = next(iter(self._seen.items()))
+            if expires > now:
+                break
+            del self._seen[block_id]
+
+class StampStage(ValidationStage):
+    """
+    Stamps the node's cosmo signature on blocks that come without one.
+
+    Blocks carrying a cosmo signature and hash are left as they are. Others
+    get the signature of the sky at their timestamp, which their Ed25519
+    signature must then cover.
+    """
+
+    name = "stamp"
+
+    def __init__(self, validator: "CosmoValidator"):
+        """
+        Initialize the stage.
+
+        Args:
+            validator: CosmoValidator of the node's location
+        """
+        self.validator = validator
+
+    def check(self, block: Dict, size: Optional[int] = None) -> Tuple[bool, str]:
+        if "cosmo_signature" in block and "cosmo_hash" in block:
+            return True, "Block already stamped"
+        return self.validator.validate_block(block)
+
+class HashStage(ValidationStage):
+    """Checks that a block's cosmo hash matches its cosmo signature."""
+
+    name = "hash"
+
+    def check(self, block: Dict, size: Optional[int] = None) -> Tuple[bool, str]:
+        signature_str = json.dumps(block["cosmo_signature"], sort_keys=True)
+        if hashlib.sha256(signature_str.encode()).hexdigest() != block["cosmo_hash"]:
+            return False, "Cosmo signature hash mismatch"
+        return True, "Cosmo hash valid"
+
+class SignatureStage(ValidationStage):
+    """Checks a block's Ed25519 signature."""
+
+    name = "signature"
+
+    def __init__(self, signer: "Signer", cache: Optional["VerdictCache"] = None):
+        """
+        Initialize the stage.
+
+        Args:
+            signer: Signer verifying the signatures
+            cache: VerdictCache of signature verdicts (optional)
+        """
+        self.signer = signer
+        self.cache = cache
+
+    def check(self, block: Dict, size: Optional[int] = None) -> Tuple[bool, str]:
+        if not self.signer.verify_block(block, cache=self.cache):
+            return False, "Block signature verification failed"
+        return True, "Block signature valid"
+
+class CosmoStage(ValidationStage):
+    """Checks a block's cosmo signature against the sky."""
+
+    name = "cosmo"
+
+    def __init__(self, validator: "CosmoValidator"):
+        """
+        Initialize the stage.
+
+        Args:
+            validator: CosmoValidator of the node's location
+        """
+        self.validator = validator
+
+    def check(self, block: Dict, size: Optional[int] = None) -> Tuple[bool, str]:
+        is_valid, reason = self.validator.verify_cosmo_signature(block)
+        if not is_valid:
+            return False, f"Cosmo signature verification failed: {reason}"
+        return True, reason
+
+class ValidationPipeline:
+    """
+    Runs validation stages in order and stops at the first rejection.
+
+    Stages should be ordered cheapest first, so malformed, oversized, stale
+    and replayed blocks are rejected before any signature or astronomy work.
+    Each run reports the time spent in every stage, and the pipeline keeps
+    per-stage totals. Pipelines are safe to share between threads.
+    """
+
+    def __init__(self, stages: Sequence[ValidationStage]):
+        """
+        Initialize the pipeline.
+
+        Args:
+            stages: Stages, in the order they run
+        """
+        self.stages = list(stages)
+        self._totals = {stage.name: {"calls": 0, "rejections": 0, "seconds": 0.0} for stage in self.stages}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls,
+                signer: "Signer",
+                validator: "CosmoValidator",
+                verdict_cache: Optional["VerdictCache"] = None,
+                max_bytes: int = 4 * 1024 * 1024) -> "ValidationPipeline":
+        """
+        Build the standard pipeline: schema, size, timestamp, stamp, hash, signature, cosmo.
+
+        Args:
+            signer: Signer verifying the signatures
+            validator: CosmoValidator of the node's location
+            verdict_cache: VerdictCache of signature verdicts (optional)
+            max_bytes: Largest serialized block accepted
+
+        Returns:
+            ValidationPipeline: The pipeline
+        """
+        return cls([
+            SchemaStage(),
+            SizeStage(max_bytes=max_bytes),
+            TimestampStage(max_age=validator.MAX_SIGNATURE_AGE),
+            StampStage(validator),
+            HashStage(),
+            SignatureStage(signer, cache=verdict_cache),
+            CosmoStage(validator)
+        ])
+
+    def validate(self, block: Dict, size: Optional[int] = None) -> ValidationReport:
+        """
+        Validate a block.
+
+        Args:
+            block: The block
+            size: Size of the block's serialized form in bytes, if known
+                (saves re-serializing it to check its size)
+
+        Returns:
+            ValidationReport: The verdict and the stages that ran
+        """
+        results = []
+        passed_stages = []
+        try:
+            for stage in self.stages:
+                start = time.perf_counter()
+                try:
+                    passed, reason = stage.check(block, size)
+                except (KeyError, TypeError, ValueError) as e:
+                    passed, reason = False, f"Block rejected by {stage.name} check: {e}"
+                results.append(StageResult(stage.name, passed, reason, time.perf_counter() - start))
+                if not passed:
+                    break
+                passed_stages.append(stage)
+        except BaseException:
+            self._release(block, passed_stages)
+            raise
+
+        self._record(results)
+        if results and not results[-1].passed:
+            self._release(block, passed_stages)
+            return ValidationReport(False, results[-1].reason, results)
+        for stage in self.stages:
+            stage.accept(block)
+        return ValidationReport(True, "Block valid", results)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Get the calls, rejections and total seconds of each stage."""
+        with self._lock:
+            return {name: dict(totals) for name, totals in self._totals.items()}
+
+    @staticmethod
+    def _release(block: Dict, stages: Sequence[ValidationStage]) -> None:
+        """Undo the reservations of the stages a rejected block passed."""
+        for stage in stages:
+            stage.release(block)
+
+    def _record(self, results: List[StageResult]) -> None:
+        """Add a run's stage results to the totals."""
+        with self._lock:
+            for result in results:
+                totals = self._totals[result.stage]
+                totals["calls"] += 1
+                totals["rejections"] += 0 if result.passed else 1
+                totals["seconds"] += result.seconds
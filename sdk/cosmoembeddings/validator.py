@@ -1,18 +1,40 @@
 # Handles block validation
 
 import requests
-from typing import Dict, Optional, Tuple
-from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, timezone
 import json
 import hashlib
-from skyfield.api import load, wgs84
-from skyfield.data import hipparcos
+import numpy as np
+from skyfield.api import wgs84
 from .cosmo_signature import CosmoSignatureGenerator
+from .ephemeris import Ephemeris, get_ephemeris
+from .fast_sky import InterpolatedSky
+from .sky_refresher import SkyStateRefresher
+from .sky_table import SkyTable
+from .verdict_cache import VerdictCache
 
 class CosmoValidator:
     """Class for validating blocks using cosmo signatures."""
     
-    def __init__(self, latitude: float, longitude: float, elevation: float = 0.0, api_key: Optional[str] = None):
+    # Maximum age of a cosmo signature in seconds
+    MAX_SIGNATURE_AGE = 300
+    
+    # Seconds a negative cosmo verdict is cached; a rejection may come from a
+    # degraded star data source, so it is retried after this long
+    NEGATIVE_VERDICT_TTL = 30
+    
+    def __init__(self,
+                 latitude: float,
+                 longitude: float,
+                 elevation: float = 0.0,
+                 api_key: Optional[str] = None,
+                 verdict_cache: Optional[VerdictCache] = None,
+                 ephemeris_path: Optional[str] = None,
+                 sky_table: Optional[SkyTable] = None,
+                 refresh_interval: Optional[float] = None,
+                 refresh_tolerance: Optional[float] = None,
+                 fast_mode: bool = False):
         """
         Initialize the CosmoValidator with location data.
         
@@ -21,12 +43,94 @@ class CosmoValidator:
             longitude: Longitude in degrees
             elevation: Elevation in meters (default: 0.0)
             api_key: API key for astronomical data services (optional)
+            verdict_cache: VerdictCache for cosmo verification verdicts (optional)
+            ephemeris_path: Ephemeris file or directory (default: $COSMIC_EPHEMERIS_PATH,
+                then de421.bsp)
+            sky_table: Precomputed signatures of this location, served instead of
+                live computation within their time range (optional)
+            refresh_interval: Start a background refresher recomputing the current
+                signature this often, in seconds (default: no refresher)
+            refresh_tolerance: Largest distance in seconds between a block's timestamp
+                and the refreshed snapshot it is stamped from (default: the interval)
+            fast_mode: Interpolate sun and moon positions from Chebyshev series fitted
+                once per hour of sky, within fast_sky.FAST_SKY_ERROR_DEGREES of the
+                exact positions
         """
         self.latitude = latitude
         self.longitude = longitude
         self.elevation = elevation
         self.location = wgs84.latlon(latitude, longitude, elevation_m=elevation)
         self.signature_generator = CosmoSignatureGenerator(api_key=api_key)
+        self.verdict_cache = verdict_cache
+        self.ephemeris_path = ephemeris_path
+        if sky_table is not None and not sky_table.matches(latitude, longitude, elevation):
+            raise ValueError("Sky table was computed for a different location")
+        self.sky_table = sky_table
+        self.fast_sky = InterpolatedSky(self._exact_body_positions) if fast_mode else None
+        self.refresher: Optional[SkyStateRefresher] = None
+        self.refresh_tolerance = refresh_tolerance
+        if refresh_interval is not None:
+            self.start_refresher(refresh_interval, refresh_tolerance)
+    
+    @property
+    def ephemeris(self) -> Ephemeris:
+        """The process-wide ephemeris, shared with every validator using the same path."""
+        return get_ephemeris(self.ephemeris_path)
+    
+    def preload(self) -> None:
+        """Load the ephemeris now so that validating the first block does not."""
+        get_ephemeris(self.ephemeris_path)
+        
+    def start_refresher(self,
+                        interval: float = 10.0,
+                        tolerance: Optional[float] = None,
+                        wait: bool = False) -> SkyStateRefresher:
+        """
+        Keep the current celestial signature warm in a background thread.
+        
+        Blocks whose timestamps fall within the tolerance of the latest snapshot
+        are then stamped from it without any astronomy on the caller's thread.
+        Their cosmo signatures carry the snapshot's timestamp, the moment the
+        positions were computed for, so verification recomputes the same sky.
+        
+        Args:
+            interval: Seconds between recomputations
+            tolerance: Largest distance in seconds between a block's timestamp and
+                the snapshot (default: the interval)
+            wait: Wait for the first snapshot before returning
+            
+        Returns:
+            SkyStateRefresher: The running refresher
+        """
+        self.stop_refresher()
+        self.refresh_tolerance = interval if tolerance is None else tolerance
+        self.refresher = SkyStateRefresher(self.get_celestial_signature, interval)
+        self.refresher.start()
+        if wait:
+            self.refresher.wait_ready()
+        return self.refresher
+    
+    def stop_refresher(self) -> None:
+        """Stop the background refresher, if one is running."""
+        if self.refresher is not None:
+            self.refresher.stop()
+            self.refresher = None
+    
+    def _snapshot_signature(self, timestamp: float) -> Optional[Dict]:
+        """Get a block's celestial signature from the refresher's snapshot, if it is close enough."""
+        if self.refresher is None:
+            return None
+        snapshot = self.refresher.current(timestamp, self.refresh_tolerance)
+        if snapshot is None:
+            return None
+        # Fresh dicts, so that blocks never share the snapshot's; the timestamp stays
+        # the snapshot's, since the positions hold for that moment only
+        signature = snapshot.signature
+        return {
+            **signature,
+            "location": dict(signature["location"]),
+            "celestial_bodies": {body: dict(values) for body, values in signature["celestial_bodies"].items()}
+        }
         
     def get_celestial_signature(self, timestamp: Optional[float] = None) -> Dict:
         """
@@ -40,37 +144,92 @@ class CosmoValidator:
         """
         if timestamp is None:
             timestamp = datetime.utcnow().timestamp()
+        return self.get_celestial_signatures([timestamp])[0]
+    
+    def _body_positions(self, timestamps: Sequence[float]) -> Dict[str, np.ndarray]:
+        """Compute sun and moon positions, interpolated in fast mode and exact otherwise."""
+        if self.fast_sky is not None:
+            return self.fast_sky.positions(timestamps)
+        return self._exact_body_positions(timestamps)
+    
+    def _exact_body_positions(self, timestamps: Sequence[float]) -> Dict[str, np.ndarray]:
+        """
+        Compute sun and moon positions for many timestamps in one vectorized pass.
+        
+        Args:
+            timestamps: Unix timestamps
             
-        # Load ephemeris data
-        planets = load('de421.bsp')
-        
-        # Create time object
-        ts = load.timescale()
-        t = ts.from_datetime(datetime.fromtimestamp(timestamp))
-        
-        # Get positions of major celestial bodies
-        sun = planets['sun'].at(t)
-        moon = planets['moon'].at(t)
-        earth = planets['earth'].at(t)
-        
-        # Calculate positions relative to observer
-        sun_pos = sun.observe(self.location)
-        moon_pos = moon.observe(self.location)
-        
-        # Get apparent positions
-        sun_apparent = sun_pos.apparent()
-        moon_apparent = moon_pos.apparent()
-        
-        # Get cosmo signature from stars
-        cosmo_signature = self.signature_generator.generate_signature(
-            latitude=self.latitude,
-            longitude=self.longitude,
-            elevation=self.elevation,
-            timestamp=timestamp
+        Returns:
+            Dict[str, np.ndarray]: Arrays of altitudes, azimuths (degrees),
+            distances (au) and the moon phase angle, one value per timestamp
+        """
+        ephemeris = self.ephemeris
+        # One array Time: skyfield evaluates every position below for all times at once
+        t = ephemeris.timescale.from_datetimes(
+            [datetime.fromtimestamp(timestamp, tz=timezone.utc) for timestamp in timestamps]
         )
         
-        # Create signature
-        signature = {
+        # Observe the sun and moon from the observer's location
+        observer = (ephemeris.earth + self.location).at(t)
+        sun_apparent = observer.observe(ephemeris.sun).apparent()
+        moon_apparent = observer.observe(ephemeris.moon).apparent()
+        sun_altitude, sun_azimuth, sun_distance = sun_apparent.altaz()
+        moon_altitude, moon_azimuth, moon_distance = moon_apparent.altaz()
+        return {
+            "sun_altitude": sun_altitude.degrees,
+            "sun_azimuth": sun_azimuth.degrees,
+            "sun_distance": sun_distance.au,
+            "moon_altitude": moon_altitude.degrees,
+            "moon_azimuth": moon_azimuth.degrees,
+            "moon_distance": moon_distance.au,
+            "moon_phase": moon_apparent.phase_angle(ephemeris.sun).degrees
+        }
+    
+    def get_celestial_signatures(self, timestamps: Sequence[float]) -> List[Dict]:
+        """
+        Get the celestial signatures of many timestamps at once.
+        
+        Args:
+            timestamps: Unix timestamps
+            
+        Returns:
+            List[Dict]: Celestial signature data per timestamp, as get_celestial_signature returns it
+        """
+        if len(timestamps) == 0:
+            return []
+        signatures: List[Optional[Dict]] = [None] * len(timestamps)
+        
+        # Serve what the precomputed table covers
+        if self.sky_table is not None:
+            table = self.sky_table
+            for i, index in enumerate(table.nearest(timestamps)):
+                if index >= 0:
+                    signatures[i] = self._signature_data(timestamps[i], table.positions, index,
+                                                         table.cosmo_signature(index))
+        
+        # Compute the rest live
+        missing = [i for i, signature in enumerate(signatures) if signature is None]
+        if missing:
+            positions = self._body_positions([timestamps[i] for i in missing])
+            # Fetch API star data for the whole batch concurrently, if stars come from an API
+            self.signature_generator.prefetch(self.latitude, self.longitude, self.elevation,
+                                              [timestamps[i] for i in missing])
+            for row, i in enumerate(missing):
+                # Get cosmo signature from stars
+                cosmo_signature = self.signature_generator.generate_signature(
+                    latitude=self.latitude,
+                    longitude=self.longitude,
+                    elevation=self.elevation,
+                    timestamp=timestamps[i]
+                )
+                signatures[i] = self._signature_data(timestamps[i], positions, row, cosmo_signature)
+        
+        return signatures
+    
+    def _signature_data(self, timestamp: float, positions: Dict[str, np.ndarray], row: int,
+                        cosmo_signature: str) -> Dict:
+        """Build celestial signature data from one row of body positions."""
+        return {
             "timestamp": timestamp,
             "location": {
                 "latitude": self.latitude,
@@ -79,21 +238,19 @@ class CosmoValidator:
             },
             "celestial_bodies": {
                 "sun": {
-                    "altitude": float(sun_apparent.altitude.degrees),
-                    "azimuth": float(sun_apparent.azimuth.degrees),
-                    "distance_au": float(sun_pos.distance().au)
+                    "altitude": float(positions["sun_altitude"][row]),
+                    "azimuth": float(positions["sun_azimuth"][row]),
+                    "distance_au": float(positions["sun_distance"][row])
                 },
                 "moon": {
-                    "altitude": float(moon_apparent.altitude.degrees),
-                    "azimuth": float(moon_apparent.azimuth.degrees),
-                    "distance_au": float(moon_pos.distance().au),
-                    "phase": float(moon_pos.phase_angle().degrees)
+                    "altitude": float(positions["moon_altitude"][row]),
+                    "azimuth": float(positions["moon_azimuth"][row]),
+                    "distance_au": float(positions["moon_distance"][row]),
+                    "phase": float(positions["moon_phase"][row])
                 }
             },
             "cosmo_signature": cosmo_signature
         }
-        
-        return signature
     
     def validate_block(self, block: Dict) -> Tuple[bool, str]:
         """
@@ -109,31 +266,94 @@ class CosmoValidator:
         if "timestamp" not in block:
             return False, "Block missing timestamp"
             
-        # Get cosmo signature for block's timestamp
-        signature = self.get_celestial_signature(block["timestamp"])
+        # Get cosmo signature for block's timestamp, from the refreshed snapshot when close enough
+        signature = self._snapshot_signature(block["timestamp"])
+        if signature is None:
+            signature = self.get_celestial_signature(block["timestamp"])
+        self._stamp(block, signature)
+        return True, "Block validated with cosmo signature"
+    
+    def validate_blocks(self, blocks: Sequence[Dict]) -> List[Tuple[bool, str]]:
+        """
+        Validate many blocks, computing their celestial signatures in one pass.
         
-        # Add cosmo signature to block
+        Args:
+            blocks: Blocks to validate
+            
+        Returns:
+            List[Tuple[bool, str]]: (is_valid, reason) per block, in input order
+        """
+        results = [(False, "Block missing timestamp")] * len(blocks)
+        stamped = []
+        for i, block in enumerate(blocks):
+            if "timestamp" not in block:
+                continue
+            signature = self._snapshot_signature(block["timestamp"])
+            if signature is None:
+                stamped.append(i)
+            else:
+                self._stamp(block, signature)
+                results[i] = (True, "Block validated with cosmo signature")
+        signatures = self.get_celestial_signatures([blocks[i]["timestamp"] for i in stamped])
+        for i, signature in zip(stamped, signatures):
+            self._stamp(blocks[i], signature)
+            results[i] = (True, "Block validated with cosmo signature")
+        return results
+    
+    @staticmethod
+    def _stamp(block: Dict, signature: Dict) -> None:
+        """Add a cosmo signature and its hash to a block."""
         block["cosmo_signature"] = signature
         
         # Calculate hash of cosmo signature
         signature_str = json.dumps(signature, sort_keys=True)
-        signature_hash = hashlib.sha256(signature_str.encode()).hexdigest()
-        
-        # Add hash to block
-        block["cosmo_hash"] = signature_hash
-        
-        return True, "Block validated with cosmo signature"
+        block["cosmo_hash"] = hashlib.sha256(signature_str.encode()).hexdigest()
     
     def verify_cosmo_signature(self, block: Dict) -> Tuple[bool, str]:
         """
         Verify the cosmo signature of a block.
         
+        Verdicts are looked up in and stored to the validator's verdict cache,
+        if it has one. A positive verdict expires when the signature grows too
+        old to be accepted, a negative one after NEGATIVE_VERDICT_TTL seconds.
+        
         Args:
             block: Block to verify
             
         Returns:
             Tuple[bool, str]: (is_valid, reason)
         """
+        if self.verdict_cache is None:
+            return self._verify_cosmo_signature(block)
+        
+        # The verdict depends on the observer location as well as the block
+        try:
+            key = self.verdict_cache.make_key(block, f"cosmo:{self.latitude}:{self.longitude}:{self.elevation}")
+        except (ValueError, KeyError, TypeError):
+            # Blocks too malformed to hash are verified without the cache
+            return self._verify_cosmo_signature(block)
+        verdict = self.verdict_cache.get(key)
+        if verdict is not None:
+            return verdict
+        
+        is_valid, reason = self._verify_cosmo_signature(block)
+        stored_signature = block.get("cosmo_signature")
+        timestamp = stored_signature.get("timestamp") if isinstance(stored_signature, dict) else None
+        now = datetime.utcnow().timestamp()
+        if not isinstance(timestamp, (int, float)):
+            ttl = None
+        elif is_valid:
+            ttl = timestamp + self.MAX_SIGNATURE_AGE - now
+        elif timestamp > now:
+            # A signature from the future may come into the accepted window
+            return is_valid, reason
+        else:
+            ttl = self.NEGATIVE_VERDICT_TTL
+        self.verdict_cache.put(key, is_valid, reason, ttl)
+        return is_valid, reason
+    
+    def _verify_cosmo_signature(self, block: Dict) -> Tuple[bool, str]:
+        """Verify the cosmo signature of a block without the verdict cache."""
         if "cosmo_signature" not in block or "cosmo_hash" not in block:
             return False, "Block missing cosmo signature or hash"
             
@@ -152,12 +372,17 @@ class CosmoValidator:
         # Verify timestamp is within reasonable range (e.g., 5 minutes)
         current_time = datetime.utcnow().timestamp()
         time_diff = abs(current_time - stored_signature["timestamp"])
-        if time_diff > 300:  # 5 minutes in seconds
+        if time_diff > self.MAX_SIGNATURE_AGE:
             return False, "Cosmo signature timestamp too old"
             
         # Verify the cosmo signature string
         if "cosmo_signature" in stored_signature:
             cosmo_signature = stored_signature["cosmo_signature"]
+            if self.sky_table is not None:
+                # A signature equal to the precomputed one needs no live check
+                index = int(self.sky_table.nearest(stored_signature["timestamp"]))
+                if index >= 0 and self.sky_table.cosmo_signature(index) == cosmo_signature:
+                    return True, "Cosmo signature verified"
             is_valid = self.signature_generator.verify_signature(
                 signature=cosmo_signature,
                 latitude=self.latitude,
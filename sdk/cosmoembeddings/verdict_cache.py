@@ -0,0 +1,159 @@
+# Handles caching of block verification verdicts
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from .signer import Signer
+
+class VerdictCache:
+    """
+    Bounded cache of verification verdicts keyed by (block digest, signature, public key).
+
+    The block digest covers every field but the signature fields, so any change
+    to a block misses the cache. Entries may expire, which suits verdicts that
+    depend on the current time such as cosmo signature age checks. The cache
+    can be persisted to a JSON file and reloaded by later runs.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self,
+                 max_entries: int = 100000,
+                 path: Optional[str] = None,
+                 clock: Callable[[], float] = time.time):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of verdicts kept, least recently used dropped first
+            path: JSON file the cache is loaded from and saved to (optional)
+            clock: Source of the current Unix time, against which entries expire
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.clock = clock
+
+        self._entries: "OrderedDict[str, Tuple[bool, str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+
+        if path and os.path.exists(path):
+            self._load()
+
+    @staticmethod
+    def make_key(block: Dict, kind: str = "signature") -> str:
+        """
+        Build the cache key of a verdict on a block.
+
+        Args:
+            block: The verified block
+            kind: What was verified, including anything else the verdict depends on
+
+        Returns:
+            str: Cache key
+        """
+        digest = hashlib.sha256()
+        for part in (kind.encode("utf-8"), Signer.block_digest(block),
+                     str(block.get("signature", "")).encode("utf-8"),
+                     str(block.get("public_key", "")).encode("utf-8")):
+            # Length-prefix every part so they cannot run into each other
+            digest.update(len(part).to_bytes(8, "little") + part)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[bool, str]]:
+        """
+        Look up a verdict.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Optional[Tuple[bool, str]]: (is_valid, reason), or None if unknown or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= self.clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, key: str, is_valid: bool, reason: str = "", ttl: Optional[float] = None) -> None:
+        """
+        Store a verdict.
+
+        Args:
+            key: Cache key from make_key
+            is_valid: The verdict
+            reason: Reason reported with the verdict
+            ttl: Seconds the verdict stays valid (default: forever)
+        """
+        if ttl is not None and ttl <= 0:
+            return
+        expires = self.clock() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (bool(is_valid), reason, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        """Get hit/miss counters and the number of cached verdicts."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries)
+            }
+
+    def clear(self) -> None:
+        """Drop every cached verdict."""
+        with self._lock:
+            self._entries.clear()
+
+    def save(self) -> None:
+        """Write the unexpired verdicts to the cache file."""
+        if not self.path:
+            return
+        now = self.clock()
+        with self._lock:
+            entries = [[key, valid, reason, expires] for key, (valid, reason, expires) in self._entries.items()
+                       if expires is None or expires > now]
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # Write a temporary file and swap it in so readers never see a partial cache
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.FORMAT_VERSION, "entries": entries}, f)
+        os.replace(temporary_path, self.path)
+
+    def close(self) -> None:
+        """Save the cache if it is persistent."""
+        self.save()
+
+    def _load(self) -> None:
+        """Read the cache file, skipping expired verdicts."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            # A missing or corrupt cache only costs re-verification
+            return
+        if data.get("version") != self.FORMAT_VERSION:
+            return
+        now = self.clock()
+        for key, valid, reason, expires in data.get("entries", [])[-self.max_entries:]:
+            if expires is None or expires > now:
+                self._entries[key] = (bool(valid), reason, expires)
@@ -0,0 +1,125 @@
+import json
+import os
+import tempfile
+import numpy as np
+import pytest
+from cosmoembeddings.block_archive import BlockArchive
+from cosmoembeddings.embedding_codec import encode_embeddings
+from cosmoembeddings.signer import Signer
+
+def make_block(block_id, rows, dimensions=8, model="test-model"):
+    rng = np.random.default_rng(len(block_id) + rows)
+    return {
+        "id": block_id,
+        "model": {"name": model, "dimensions": dimensions},
+        "embeddings": rng.normal(size=(rows, dimensions)).astype(np.float32).tolist(),
+        "content": [f"text {i}" for i in range(rows)]
+    }
+
+def test_append_and_get_roundtrip():
+    with tempfile.TemporaryDirectory() as directory:
+        with BlockArchive(directory) as archive:
+            first = make_block("block-1", 2)
+            second = make_block("block-2", 3)
+            archive.append(first)
+            archive.append(second)
+
+            assert len(archive) == 2
+            assert "block-2" in archive
+            assert archive.get("block-2") == json.loads(json.dumps(second))
+
+            view = archive.get("block-1", as_array=True)["embeddings"]
+            assert isinstance(view, np.memmap)
+            assert np.array_equal(view, np.asarray(first["embeddings"], dtype=np.float32))
+
+def test_contiguous_matrix_and_reopen():
+    with tempfile.TemporaryDirectory() as directory:
+        archive = BlockArchive(directory)
+        blocks = [make_block(f"block-{i}", i + 1) for i in range(4)]
+        for block in blocks:
+            archive.append(block)
+        archive.close()
+
+        reopened = BlockArchive(directory)
+        matrix = reopened.matrix("test-model", 8)
+        assert matrix.shape == (10, 8)
+        name, row, rows = reopened.locate("block-2")
+        assert (row, rows) == (3, 3)
+        assert np.array_equal(matrix[row:row + rows], np.asarray(blocks[2]["embeddings"], dtype=np.float32))
+        assert [block["id"] for block in reopened.iter_blocks()] == reopened.ids()
+        reopened.close()
+
+def test_non_float32_embeddings_stay_inline():
+    with tempfile.TemporaryDirectory() as directory:
+        with BlockArchive(directory) as archive:
+            encoded = {"id": "encoded", "embeddings": encode_embeddings(np.ones((1, 4)), "int8")}
+            precise = {"id": "precise", "embeddings": [[0.1, 0.2]]}
+            archive.append(encoded)
+            archive.append(precise)
+
+            assert archive.locate("encoded") is None
+            assert archive.get("encoded") == encoded
+            assert archive.get("precise") == precise
+
+def test_signed_block_without_id_still_verifies():
+    with tempfile.TemporaryDirectory() as directory:
+        block = make_block("unused", 2)
+        del block["id"]
+        signed = Signer().sign_block(block)
+        original = dict(signed)
+
+        with BlockArchive(directory) as archive:
+            block_id = archive.append(signed)
+        assert signed == original
+        assert Signer.verify_block(signed)
+
+        with BlockArchive(directory) as reopened:
+            assert reopened.ids() == [block_id]
+            reloaded = reopened.get(block_id)
+            assert "id" not in reloaded
+            assert Signer.verify_block(reloaded)
+
+def test_reader_sees_blocks_after_refresh():
+    with tempfile.TemporaryDirectory() as directory:
+        with BlockArchive(directory) as writer, BlockArchive(directory, readonly=True) as reader:
+            writer.append(make_block("block-1", 2))
+            assert len(reader) == 0
+            assert reader.refresh() == 1
+            assert reader.ids() == ["block-1"]
+
+            # A miss refreshes before giving up
+            second = make_block("block-2", 3)
+            writer.append(second)
+            assert reader.get("block-2") == json.loads(json.dumps(second))
+            with pytest.raises(ValueError):
+                reader.append(make_block("block-3", 1))
+
+def test_zero_dimension_embeddings_are_rejected():
+    with tempfile.TemporaryDirectory() as directory:
+        with BlockArchive(directory) as archive:
+            with pytest.raises(ValueError):
+                archive.append({"id": "empty", "embeddings": [[]]})
+            assert len(archive) == 0
+
+def test_reopen_drops_torn_writes():
+    with tempfile.TemporaryDirectory() as directory:
+        with BlockArchive(directory) as archive:
+            archive.append(make_block("block-1", 2))
+            name = archive.matrix_name("test-model", 8)
+        # An append interrupted after part of its rows, its record and part of its index line
+        with open(os.path.join(directory, name), "ab") as matrix:
+            matrix.write(b"\0" * 12)
+        with open(os.path.join(directory, BlockArchive.RECORDS_FILE), "ab") as records:
+            records.write(b"\x10\0\0\0{}")
+        with open(os.path.join(directory, BlockArchive.INDEX_FILE), "a") as index:
+            index.write('{"id": "torn"')
+
+        with BlockArchive(directory) as archive:
+            second = make_block("block-2", 3)
+            archive.append(second)
+            assert archive.locate("block-2") == (name, 2, 3)
+            assert np.array_equal(archive.get("block-2", as_array=True)["embeddings"],
+                                  np.asarray(second["embeddings"], dtype=np.float32))
+
+        with BlockArchive(directory) as archive:
+            assert archive.ids() == ["block-1", "block-2"]
@@ -68,4 +68,91 @@ def test_save_and_load_block():
         assert loaded_block["metadata"] == block["metadata"]
         assert len(loaded_block["embeddings"]) == len(block["embeddings"])
     finally:
-        os.unlink(filepath) 
\ No newline at end of file
+        os.unlink(filepath) 
+
+def test_create_embeddings_batch():
+    builder = BlockBuilder()
+    texts = ["Hello, world!", "Another text", "A third one"]
+    embeddings = builder.create_embeddings(texts, batch_size=2)
+    
+    assert embeddings.shape[0] == len(texts)
+    assert np.allclose(embeddings[1], builder.create_embedding(texts[1]), atol=1e-5)
+
+def test_create_blocks():
+    builder = BlockBuilder()
+    documents = [
+        "Hello, world!",
+        ["Another text", "A third one"],
+        ("With metadata", {"source": "test"})
+    ]
+    blocks = builder.create_blocks(documents, batch_size=2)
+    
+    assert len(blocks) == 3
+    assert [len(block["embeddings"]) for block in blocks] == [1, 2, 1]
+    assert blocks[1]["content"] == ["Another text", "A third one"]
+    assert blocks[2]["metadata"] == {"source": "test"}
+    assert np.allclose(blocks[1]["embeddings"][1], builder.create_embedding("A third one"), atol=1e-5)
+
+def test_length_bucketing_keeps_order():
+    builder = BlockBuilder(batch_size=2, track_padding=True)
+    texts = ["one two three four five six", "short", "a medium length text", "two words"]
+    block = builder.create_block(texts)
+    
+    for text, embedding in zip(texts, block["embeddings"]):
+        assert np.allclose(embedding, builder.create_embedding(text), atol=1e-5)
+    stats = builder.encoding_stats
+    # A single encode call batches by length on its own, so bucketing saves nothing here
+    assert stats["padded_tokens"] == stats["unbucketed_padded_tokens"]
+    assert 0.0 <= builder.padding_ratio() < 1.0
+
+class ShardingEncoder:
+    """Stand-in encoder with fixed shards of two texts."""
+    
+    def shard_size_for(self, count, batch_size=32):
+        return 2
+    
+    def encode(self, texts, batch_size=32):
+        return np.array([[len(text)] for text in texts], dtype=np.float32)
+
+def test_length_bucketing_groups_encoder_shards():
+    texts = ["a b c d e f g h", "a", "a b c d e f g", "b"]
+    builder = BlockBuilder(batch_size=2, encoder=ShardingEncoder(), track_padding=True)
+    embeddings = builder.create_embeddings(texts)
+    
+    assert embeddings[:, 0].tolist() == [len(text) for text in texts]
+    stats = builder.encoding_stats
+    assert stats["tokens"] == 17
+    assert stats["padded_tokens"] == 8 * 2 + 1 * 2
+    assert stats["unbucketed_padded_tokens"] == 8 * 2 + 7 * 2
+
+def test_lengths_come_from_the_model_tokenizer():
+    class CharacterTokenizer:
+        def __call__(self, texts, add_special_tokens=True, truncation=False, max_length=None, verbose=True):
+            ids = [[0] + [ord(c) for c in text] + [0] for text in texts]
+            return {"input_ids": [row[:max_length] if truncation else row for row in ids]}
+    
+    class TokenizedModel:
+        tokenizer = CharacterTokenizer()
+        max_seq_length = 6
+        
+        def encode(self, texts, batch_size=32):
+            return np.ones((len(texts), 2), dtype=np.float32)
+    
+    builder = BlockBuilder(batch_size=4, track_padding=True)
+    builder.model = TokenizedModel()
+    builder.create_embeddings(["ab", "two words"])
+    assert builder.encoding_stats["tokens"] == 4 + 6
+
+def test_padding_is_not_measured_by_default():
+    class UncountableModel:
+        @property
+        def tokenizer(self):
+            raise AssertionError("texts were tokenized for statistics")
+        
+        def encode(self, texts, batch_size=32):
+            return np.ones((len(texts), 2), dtype=np.float32)
+    
+    builder = BlockBuilder(batch_size=2)
+    builder.model = UncountableModel()
+    assert builder.create_embeddings(["a b", "c"]).shape == (2, 2)
+    assert builder.encoding_stats["texts"] == 0
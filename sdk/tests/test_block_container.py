@@ -0,0 +1,32 @@
+import json
+import pytest
+import numpy as np
+from cosmoembeddings.block_container import pack_block, unpack_block, is_container
+from cosmoembeddings.embedding_codec import encode_embeddings
+
+@pytest.fixture
+def matrix():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(3, 384)).astype(np.float32)
+
+def test_container_roundtrip_matches_json(matrix):
+    block = {"version": "1.0", "timestamp": 1234567890, "metadata": {"source": "test"},
+             "embeddings": [row.tolist() for row in matrix]}
+    data = pack_block(block)
+    assert is_container(data)
+    assert unpack_block(data) == json.loads(json.dumps(block))
+
+    view = unpack_block(data, as_array=True)["embeddings"]
+    assert view.dtype == np.float32
+    assert np.array_equal(view, matrix)
+
+def test_container_keeps_float64_and_encoded_embeddings(matrix):
+    block = {"embeddings": [[0.1, 0.2, 0.3]]}
+    assert unpack_block(pack_block(block)) == block
+
+    encoded = {"embeddings": encode_embeddings(matrix, "int8"), "signature": "abc"}
+    assert unpack_block(pack_block(encoded)) == encoded
+
+def test_container_inline_fallback():
+    block = {"embeddings": [[1, 2], [3]], "content": ["a", "b"]}
+    assert unpack_block(pack_block(block)) == block
@@ -0,0 +1,44 @@
+import os
+from datetime import datetime, timezone
+import pytest
+import skyfield
+from cosmoembeddings.validator import CosmoValidator
+
+# A small ephemeris shipped with skyfield's tests, covering late July 1969
+TEST_EPHEMERIS = os.path.join(os.path.dirname(skyfield.__file__), "tests", "data", "de441-1969.bsp")
+START = datetime(1969, 7, 27, 0, 0, tzinfo=timezone.utc).timestamp()
+
+pytestmark = pytest.mark.skipif(not os.path.exists(TEST_EPHEMERIS), reason="skyfield test data not installed")
+
+def make_validator():
+    validator = CosmoValidator(40.7128, -74.0060, ephemeris_path=TEST_EPHEMERIS)
+    validator.signature_generator.generate_signature = lambda timestamp, **kwargs: f"Orion-{timestamp % 360:.1f}"
+    return validator
+
+def test_batch_matches_single_signatures():
+    validator = make_validator()
+    timestamps = [START + hours * 3600.0 for hours in range(0, 48, 5)]
+    signatures = validator.get_celestial_signatures(timestamps)
+
+    assert len(signatures) == len(timestamps)
+    for timestamp, signature in zip(timestamps, signatures):
+        single = validator.get_celestial_signature(timestamp)
+        assert signature.keys() == single.keys()
+        assert signature["cosmo_signature"] == single["cosmo_signature"]
+        for body in ("sun", "moon"):
+            for field, value in single["celestial_bodies"][body].items():
+                assert signature["celestial_bodies"][body][field] == pytest.approx(value, abs=1e-9)
+    assert validator.get_celestial_signatures([]) == []
+
+def test_validate_blocks_stamps_in_order():
+    validator = make_validator()
+    blocks = [{"timestamp": START + 60.0}, {"content": "no timestamp"}, {"timestamp": START + 7200.0}]
+    results = validator.validate_blocks(blocks)
+
+    assert [is_valid for is_valid, _ in results] == [True, False, True]
+    assert "cosmo_signature" not in blocks[1]
+    assert blocks[2]["cosmo_signature"]["timestamp"] == START + 7200.0
+    single = {"timestamp": START + 7200.0}
+    validator.validate_block(single)
+    assert single["cosmo_signature"]["celestial_bodies"]["sun"]["azimuth"] == \
+        pytest.approx(blocks[2]["cosmo_signature"]["celestial_bodies"]["sun"]["azimuth"], abs=1e-9)
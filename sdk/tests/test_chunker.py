@@ -0,0 +1,32 @@
+import pytest
+from cosmoembeddings.chunker import TokenWindowChunker
+from cosmoembeddings.block_builder import BlockBuilder
+
+def test_windows_cover_document_with_overlap():
+    text = " ".join(f"word{i}" for i in range(25))
+    chunker = TokenWindowChunker(window_size=10, overlap=3)
+    windows = chunker.chunk(text)
+
+    assert [window["tokens"] for window in windows] == [10, 10, 10, 4]
+    assert windows[0]["start"] == 0
+    assert windows[-1]["end"] == len(text)
+    for window in windows:
+        assert text[window["start"]:window["end"]] == window["text"]
+    # Consecutive windows share three words
+    assert windows[1]["text"].split()[:3] == windows[0]["text"].split()[-3:]
+
+def test_invalid_overlap():
+    with pytest.raises(ValueError):
+        TokenWindowChunker(window_size=4, overlap=4)
+
+def test_create_document_block():
+    builder = BlockBuilder()
+    text = " ".join(["The quick brown fox jumps over the lazy dog."] * 100)
+    chunker = TokenWindowChunker(window_size=64, overlap=8)
+    block = builder.create_document_block(text, {"source": "test"}, chunker=chunker, pooled=True)
+
+    chunks = block["metadata"]["chunks"]
+    assert len(chunks) == len(block["embeddings"]) == len(block["content"]) > 1
+    assert chunks[-1]["end"] == len(text)
+    assert block["metadata"]["source"] == "test"
+    assert len(block["document_embedding"]) == block["model"]["dimensions"]
@@ -0,0 +1,31 @@
+import numpy as np
+from cosmoembeddings.constellations import SIMPLE_RULES, ConstellationTable, default_table
+
+def linear_scan(ra, dec):
+    for min_ra, max_ra, min_dec, max_dec, name in SIMPLE_RULES:
+        if min_ra <= ra < max_ra and min_dec <= dec < max_dec:
+            return name
+    return "Orion"
+
+def test_table_matches_rule_scan():
+    rng = np.random.default_rng(0)
+    ra = np.concatenate([rng.uniform(-10, 370, 2000), [0.0, 29.999, 30.0, 359.999, 360.0, 15.0, 15.0]])
+    dec = np.concatenate([rng.uniform(-95, 95, 2000), [-90.0, 0.0, 89.999, 10.0, 10.0, 90.0, np.nan]])
+
+    names = default_table().lookup(ra, dec)
+    assert names.shape == ra.shape
+    assert list(names) == [linear_scan(r, d) for r, d in zip(ra, dec)]
+    assert default_table().lookup_one(279.2347, 38.7837) == "Sagittarius"
+
+def test_custom_rules_and_grid_step():
+    table = ConstellationTable.from_rules([(0, 180, 0, 90, "North-East"), (0, 360, -90, 90, "Rest")],
+                                          step=10.0, default="Nowhere")
+    assert table.codes.shape == (18, 36)
+    assert list(table.lookup([10.0, 200.0, 10.0, -1.0], [10.0, 10.0, -10.0, 0.0])) == \
+        ["North-East", "Rest", "Rest", "Nowhere"]
+
+def test_iau_boundaries():
+    table = ConstellationTable.from_skyfield(step=0.5)
+    # Vega, Betelgeuse, Sirius, Polaris
+    names = table.lookup([279.2347, 88.7929, 101.2872, 37.9546], [38.7837, 7.4071, -16.7161, 89.2641])
+    assert list(names) == ["Lyra", "Orion", "Canis Major", "Ursa Minor"]
@@ -0,0 +1,77 @@
+import pytest
+import numpy as np
+import os
+import tempfile
+from cosmoembeddings.embedding_cache import EmbeddingCache
+
+def test_cache_key_normalization():
+    key1 = EmbeddingCache.make_key("model", "Hello,   world!")
+    key2 = EmbeddingCache.make_key("model", " Hello, world!\n")
+    key3 = EmbeddingCache.make_key("other-model", "Hello, world!")
+    assert key1 == key2
+    assert key1 != key3
+
+def test_memory_tier_hits_and_misses():
+    cache = EmbeddingCache(max_entries=2)
+    assert cache.get("model", "a") is None
+
+    cache.put("model", "a", np.array([1.0, 2.0]))
+    cache.put("model", "b", np.array([3.0, 4.0]))
+    assert np.allclose(cache.get("model", "a"), [1.0, 2.0])
+
+    # "b" is now the least recently used entry and gets evicted
+    cache.put("model", "c", np.array([5.0, 6.0]))
+    assert cache.get("model", "b") is None
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["memory_entries"] == 2
+
+def test_disk_tier_persists():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = EmbeddingCache(directory=directory)
+        cache.put("model", "persisted text", np.arange(4, dtype=np.float32))
+        cache.close()
+
+        reopened = EmbeddingCache(directory=directory)
+        embedding = reopened.get("model", "persisted text")
+        assert embedding.dtype == np.float32
+        assert np.array_equal(embedding, np.arange(4, dtype=np.float32))
+        assert reopened.stats()["disk_hits"] == 1
+        reopened.close()
+
+def test_disk_tier_size_bound():
+    with tempfile.TemporaryDirectory() as directory:
+        # Room for 10 vectors of 4 floats before compaction kicks in
+        cache = EmbeddingCache(max_entries=1, directory=directory, max_disk_bytes=160)
+        for i in range(30):
+            cache.put("model", f"text {i}", np.full(4, i, dtype=np.float32))
+
+        assert cache.stats()["disk_bytes"] <= 160
+        # The newest entries survive, the oldest are evicted
+        assert np.array_equal(cache.get("model", "text 29"), np.full(4, 29, dtype=np.float32))
+        assert cache.get("model", "text 0") is None
+        cache.close()
+
+def test_disk_tier_drops_torn_appends():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = EmbeddingCache(directory=directory)
+        cache.put("model", "kept", np.arange(4, dtype=np.float32))
+        cache.close()
+        # An append interrupted after part of its data and part of its index line
+        with open(os.path.join(directory, EmbeddingCache.DATA_FILE), "ab") as data:
+            data.write(b"\0" * 10)
+        with open(os.path.join(directory, EmbeddingCache.INDEX_FILE), "a") as index:
+            index.write('{"key": "torn"')
+
+        cache = EmbeddingCache(max_entries=1, directory=directory)
+        assert cache.stats()["disk_bytes"] == 16
+        cache.put("model", "added", np.full(4, 7, dtype=np.float32))
+        cache.close()
+
+        reopened = EmbeddingCache(max_entries=1, directory=directory)
+        assert np.array_equal(reopened.get("model", "added"), np.full(4, 7, dtype=np.float32))
+        assert np.array_equal(reopened.get("model", "kept"), np.arange(4, dtype=np.float32))
+        assert reopened.stats()["disk_entries"] == 2
+        reopened.close()
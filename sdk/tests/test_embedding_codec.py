@@ -0,0 +1,54 @@
+import json
+import pytest
+import numpy as np
+from cosmoembeddings.embedding_codec import encode_embeddings, decode_embeddings, is_encoded
+from cosmoembeddings.signer import Signer
+
+@pytest.fixture
+def matrix():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(3, 384)).astype(np.float32)
+
+def test_float32_roundtrip_is_exact(matrix):
+    encoded = encode_embeddings(matrix, "float32")
+    assert is_encoded(encoded)
+    assert encoded["shape"] == [3, 384]
+    assert np.array_equal(decode_embeddings(encoded), matrix)
+
+def test_float16_roundtrip(matrix):
+    decoded = decode_embeddings(encode_embeddings(matrix, "float16"))
+    assert np.allclose(decoded, matrix, atol=1e-2)
+
+def test_int8_roundtrip_within_quantization_step(matrix):
+    encoded = encode_embeddings(matrix, "int8")
+    decoded = decode_embeddings(encoded)
+    step = np.asarray(encoded["scale"])[:, None]
+    assert np.all(np.abs(decoded - matrix) <= step / 2 + 1e-6)
+
+def test_encoded_block_is_smaller(matrix):
+    as_lists = json.dumps([row.tolist() for row in matrix])
+    for dtype, limit in (("float32", 0.5), ("float16", 0.25), ("int8", 0.15)):
+        assert len(json.dumps(encode_embeddings(matrix, dtype))) < limit * len(as_lists)
+
+def test_decode_plain_lists():
+    assert decode_embeddings([[1.0, 2.0]]).tolist() == [[1.0, 2.0]]
+
+def test_unsupported_dtype(matrix):
+    with pytest.raises(ValueError):
+        encode_embeddings(matrix, "int4")
+
+def test_signer_handles_encoded_embeddings(matrix):
+    signer = Signer()
+    block = {"version": "1.0", "timestamp": 1234567890, "embeddings": encode_embeddings(matrix, "int8")}
+    signed_block = signer.sign_block(block)
+
+    reloaded = json.loads(json.dumps(signed_block))
+    assert signer.verify_block(reloaded) is True
+
+def test_signer_handles_numpy_embeddings(matrix):
+    signer = Signer()
+    block = {"version": "1.0", "timestamp": 1234567890, "embeddings": matrix}
+    signed_block = signer.sign_block(block)
+
+    reloaded = json.loads(json.dumps({**signed_block, "embeddings": matrix.tolist()}))
+    assert signer.verify_block(reloaded) is True
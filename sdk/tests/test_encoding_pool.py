@@ -0,0 +1,35 @@
+import multiprocessing
+import pytest
+import numpy as np
+from cosmoembeddings.encoding_pool import EncodingPool
+from cosmoembeddings.block_builder import BlockBuilder
+
+class LengthModel:
+    """Stand-in model embedding a text as (length, worker pid)."""
+
+    def encode(self, texts, batch_size=32):
+        import os
+        return np.array([[len(text), os.getpid()] for text in texts], dtype=np.float32)
+
+def load_length_model(model_name):
+    return LengthModel()
+
+pytestmark = pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                                reason="stand-in loader is only importable in forked workers")
+
+def test_encoding_pool_preserves_order():
+    texts = ["x" * n for n in range(1, 41)]
+    with EncodingPool(workers=3, shard_size=4, loader=load_length_model, start_method="fork") as pool:
+        embeddings = pool.encode(texts, batch_size=2)
+
+    assert embeddings.shape == (40, 2)
+    assert embeddings[:, 0].tolist() == list(range(1, 41))
+    # Shards were spread over several worker processes
+    assert len(set(embeddings[:, 1].tolist())) > 1
+
+def test_builder_uses_encoding_pool():
+    with EncodingPool(workers=2, loader=load_length_model, start_method="fork") as pool:
+        builder = BlockBuilder(model_name="stand-in", encoder=pool)
+        block = builder.create_block(["a", "bbb"])
+
+    assert [embedding[0] for embedding in block["embeddings"]] == [1.0, 3.0]
@@ -0,0 +1,36 @@
+import os
+from datetime import datetime, timezone
+import pytest
+import skyfield
+from cosmoembeddings import ephemeris
+from cosmoembeddings.validator import CosmoValidator
+
+# A small ephemeris shipped with skyfield's tests, covering late July 1969
+TEST_EPHEMERIS = os.path.join(os.path.dirname(skyfield.__file__), "tests", "data", "de441-1969.bsp")
+TIMESTAMP = datetime(1969, 7, 27, 20, 0, tzinfo=timezone.utc).timestamp()
+
+pytestmark = pytest.mark.skipif(not os.path.exists(TEST_EPHEMERIS), reason="skyfield test data not installed")
+
+def test_ephemeris_is_loaded_once(monkeypatch):
+    first = ephemeris.preload(TEST_EPHEMERIS)
+    assert ephemeris.get_ephemeris(TEST_EPHEMERIS) is first
+
+    monkeypatch.setenv(ephemeris.EPHEMERIS_PATH_ENV, TEST_EPHEMERIS)
+    assert ephemeris.resolve_ephemeris_path() == TEST_EPHEMERIS
+    assert ephemeris.get_ephemeris() is first
+
+def test_validators_share_the_ephemeris():
+    validators = [CosmoValidator(40.7128, -74.0060, ephemeris_path=TEST_EPHEMERIS) for _ in range(2)]
+    for validator in validators:
+        validator.signature_generator.generate_signature = lambda **kwargs: "Orion-0.0"
+    assert validators[0].ephemeris is validators[1].ephemeris
+
+    signature = validators[0].get_celestial_signature(TIMESTAMP)
+    sun = signature["celestial_bodies"]["sun"]
+    moon = signature["celestial_bodies"]["moon"]
+    # 20:00 UTC is mid-afternoon in New York, with the sun high in the south-west
+    assert 30 < sun["altitude"] < 70 and 180 < sun["azimuth"] < 270
+    assert 1.0 < sun["distance_au"] < 1.02
+    assert 0.0024 < moon["distance_au"] < 0.0028
+    assert 0 <= moon["phase"] <= 180
+    assert validators[1].get_celestial_signature(TIMESTAMP) == signature
@@ -0,0 +1,60 @@
+import os
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+import skyfield
+from cosmoembeddings.fast_sky import FAST_SKY_DISTANCE_ERROR, FAST_SKY_ERROR_DEGREES, InterpolatedSky
+from cosmoembeddings.validator import CosmoValidator
+
+# A small ephemeris shipped with skyfield's tests, covering late July 1969
+TEST_EPHEMERIS = os.path.join(os.path.dirname(skyfield.__file__), "tests", "data", "de441-1969.bsp")
+START = datetime(1969, 7, 26, 1, 0, tzinfo=timezone.utc).timestamp()
+
+pytestmark = pytest.mark.skipif(not os.path.exists(TEST_EPHEMERIS), reason="skyfield test data not installed")
+
+def directions(positions, body):
+    altitude, azimuth = np.radians(positions[f"{body}_altitude"]), np.radians(positions[f"{body}_azimuth"])
+    return np.array([np.cos(altitude) * np.cos(azimuth), np.cos(altitude) * np.sin(azimuth), np.sin(altitude)])
+
+@pytest.mark.parametrize("latitude, longitude", [(40.7128, -74.0060), (0.1, 10.0), (-23.4, 0.0), (78.2, 15.6)])
+def test_error_bound_against_skyfield(latitude, longitude):
+    validator = CosmoValidator(latitude, longitude, ephemeris_path=TEST_EPHEMERIS)
+    timestamps = START + np.random.default_rng(0).uniform(0, 3.5 * 86400, 2000)
+    exact = validator._exact_body_positions(timestamps)
+    fast = InterpolatedSky(validator._exact_body_positions).positions(timestamps)
+
+    for body in ("sun", "moon"):
+        separation = np.degrees(2 * np.arcsin(np.linalg.norm(directions(exact, body) - directions(fast, body), axis=0) / 2))
+        assert separation.max() < FAST_SKY_ERROR_DEGREES
+        assert np.abs(exact[f"{body}_altitude"] - fast[f"{body}_altitude"]).max() < FAST_SKY_ERROR_DEGREES
+        azimuth_error = np.abs((exact[f"{body}_azimuth"] - fast[f"{body}_azimuth"] + 180.0) % 360.0 - 180.0)
+        assert (azimuth_error * np.cos(np.radians(exact[f"{body}_altitude"]))).max() < FAST_SKY_ERROR_DEGREES
+        relative = np.abs(exact[f"{body}_distance"] - fast[f"{body}_distance"]) / exact[f"{body}_distance"]
+        assert relative.max() < FAST_SKY_DISTANCE_ERROR
+    assert np.abs(exact["moon_phase"] - fast["moon_phase"]).max() < FAST_SKY_ERROR_DEGREES
+
+def test_segments_are_fitted_once_and_order_independent():
+    validator = CosmoValidator(40.7128, -74.0060, ephemeris_path=TEST_EPHEMERIS)
+    calls = []
+    def compute(timestamps):
+        calls.append(len(timestamps))
+        return validator._exact_body_positions(timestamps)
+
+    sky = InterpolatedSky(compute, segment_seconds=3600.0, degree=8)
+    timestamps = START + np.arange(0, 7200, 10.0)
+    forward = sky.positions(timestamps)
+    backward = InterpolatedSky(compute, segment_seconds=3600.0, degree=8).positions(timestamps[::-1])
+    sky.positions(timestamps)
+
+    assert calls == [9, 9, 9, 9]
+    for name, values in forward.items():
+        np.testing.assert_array_equal(values, backward[name][::-1])
+
+def test_fast_mode_validator():
+    fast = CosmoValidator(40.7128, -74.0060, ephemeris_path=TEST_EPHEMERIS, fast_mode=True)
+    exact = CosmoValidator(40.7128, -74.0060, ephemeris_path=TEST_EPHEMERIS)
+    timestamp = START + 12345.0
+    fast_bodies = fast.get_celestial_signature(timestamp)["celestial_bodies"]
+    exact_bodies = exact.get_celestial_signature(timestamp)["celestial_bodies"]
+    for body in ("sun", "moon"):
+        assert fast_bodies[body]["altitude"] == pytest.approx(exact_bodies[body]["altitude"], abs=FAST_SKY_ERROR_DEGREES)
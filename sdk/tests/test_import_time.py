@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+
+SDK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["sentence_transformers", "torch", "skyfield"]
+
+def import_in_subprocess(statement):
+    """Run an import in a fresh interpreter and report its time and loaded heavy modules."""
+    script = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], cwd=SDK_DIR, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def test_package_import_is_lazy():
+    result = import_in_subprocess("import cosmoembeddings")
+    assert result["loaded"] == []
+    assert result["elapsed"] < 1.0
+
+def test_signer_and_cli_skip_heavy_modules():
+    result = import_in_subprocess("from cosmoembeddings import Signer\nimport cosmoembeddings.cli")
+    assert result["loaded"] == []
+    assert result["elapsed"] < 1.0
+
+def test_lazy_attributes_resolve():
+    import cosmoembeddings
+    from cosmoembeddings.signer import Signer
+    from cosmoembeddings.node import NodeIdentity
+    assert cosmoembeddings.Signer is Signer
+    assert cosmoembeddings.NodeIdentity is NodeIdentity
+    assert "BlockBuilder" in dir(cosmoembeddings)
@@ -0,0 +1,27 @@
+import hashlib
+import pytest
+from cosmoembeddings.merkle import build_levels, inclusion_proof, leaf_hash, root_from_proof
+
+def test_proofs_rebuild_the_root():
+    for size in range(1, 10):
+        leaves = [leaf_hash(str(i).encode()) for i in range(size)]
+        levels = build_levels(leaves)
+        root = levels[-1][0]
+        for index, leaf in enumerate(leaves):
+            path = inclusion_proof(levels, index)
+            assert root_from_proof(leaf, index, size, path) == root
+
+def test_bad_proofs():
+    leaves = [leaf_hash(str(i).encode()) for i in range(5)]
+    levels = build_levels(leaves)
+    root = levels[-1][0]
+    path = inclusion_proof(levels, 1)
+
+    assert root_from_proof(leaf_hash(b"other"), 1, 5, path) != root
+    assert root_from_proof(leaves[1], 2, 5, path) != root
+    with pytest.raises(ValueError):
+        root_from_proof(leaves[1], 1, 5, path[:-1])
+    with pytest.raises(ValueError):
+        root_from_proof(leaves[1], 1, 5, path + [hashlib.sha256().digest()])
+    with pytest.raises(ValueError):
+        root_from_proof(leaves[1], 5, 5, path)
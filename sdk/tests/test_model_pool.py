@@ -0,0 +1,37 @@
+import threading
+from cosmoembeddings.model_pool import ModelPool
+from cosmoembeddings.block_builder import BlockBuilder
+
+class CountingLoader:
+    def __init__(self):
+        self.loads = []
+
+    def __call__(self, model_name):
+        self.loads.append(model_name)
+        return object()
+
+def test_model_loaded_once_across_threads():
+    loader = CountingLoader()
+    pool = ModelPool(loader=loader)
+    models = []
+
+    threads = [threading.Thread(target=lambda: models.append(pool.get("model-a"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert loader.loads == ["model-a"]
+    assert all(model is models[0] for model in models)
+
+def test_builder_loads_model_lazily():
+    loader = CountingLoader()
+    pool = ModelPool(loader=loader)
+    builder = BlockBuilder(model_name="model-b", pool=pool)
+    other = BlockBuilder(model_name="model-b", pool=pool)
+    assert loader.loads == []
+
+    builder.warmup()
+    assert pool.is_loaded("model-b")
+    assert builder.model is other.model
+    assert loader.loads == ["model-b"]
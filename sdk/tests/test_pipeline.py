@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+from cosmoembeddings.pipeline import chunk_text, iter_chunks, BlockPipeline
+from cosmoembeddings.block_builder import BlockBuilder
+
+def test_chunk_text_respects_size():
+    text = "First paragraph here.\n\nSecond paragraph is a little longer than the first."
+    chunks = list(chunk_text(text, chunk_size=30))
+    assert all(len(chunk) <= 30 for chunk in chunks)
+    assert chunks[0] == "First paragraph here."
+    assert " ".join(chunks).split() == text.split()
+
+def test_iter_chunks_jsonl_and_text():
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "a.jsonl"), "w", encoding="utf-8") as f:
+            f.write(json.dumps({"text": "Record one", "lang": "en"}) + "\n")
+            f.write(json.dumps({"text": "Record two"}) + "\n")
+        with open(os.path.join(directory, "b.txt"), "w", encoding="utf-8") as f:
+            f.write("Plain text file.\n")
+
+        chunks = list(iter_chunks(directory))
+        assert [text for text, _ in chunks] == ["Record one", "Record two", "Plain text file."]
+        assert chunks[0][1]["lang"] == "en"
+        assert chunks[1][1]["record"] == 2
+
+def test_text_file_chunks_carry_file_offsets():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "doc.txt")
+        text = "".join(f"Paragraph number {i} has a few words in it.\n\n" for i in range(12))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+        chunks = list(iter_chunks(path, chunk_size=60))
+        assert len(chunks) > 3
+        # Offsets run across the flushed read buffers
+        for chunk, metadata in chunks:
+            assert text[metadata["start"]:metadata["end"]] == chunk
+        assert [metadata["start"] for _, metadata in chunks] == sorted(metadata["start"] for _, metadata in chunks)
+
+def test_pipeline_yields_blocks():
+    builder = BlockBuilder()
+    pipeline = BlockPipeline(builder, chunk_size=20, chunks_per_block=2, batch_size=3)
+    chunks = [("one", {"source": "a", "chunk": 0}),
+              ("two", {"source": "a", "chunk": 1}),
+              ("three", {"source": "a", "chunk": 2}),
+              ("four", {"source": "b", "chunk": 0})]
+
+    blocks = list(pipeline.process(chunks))
+    assert [block["content"] for block in blocks] == [["one", "two"], ["three"], ["four"]]
+    assert blocks[2]["metadata"]["source"] == "b"
+
+def test_pipeline_signs_batches_once():
+    from cosmoembeddings.signer import Signer
+    pipeline = BlockPipeline(BlockBuilder(), signer=Signer(scheme="merkle-v1"), batch_size=3)
+    blocks = list(pipeline.process((f"text {i}", {"source": str(i)}) for i in range(5)))
+
+    assert [block["merkle_proof"]["size"] for block in blocks] == [3, 3, 3, 2, 2]
+    assert len({block["signature"] for block in blocks}) == 2
+    assert Signer.verify_blocks(blocks) == [True] * 5
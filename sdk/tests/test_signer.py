@@ -79,4 +79,66 @@ def test_verify_block_missing_fields():
     block["signature"] = "invalid"
     assert signer.verify_block(block) is False  # Missing public_key
     block["public_key"] = "invalid"
-    assert signer.verify_block(block) is False  # Invalid signature and public_key 
\ No newline at end of file
+    assert signer.verify_block(block) is False  # Invalid signature and public_key 
+
+
+def test_verify_blocks_in_order():
+    signers = [Signer(), Signer()]
+    blocks = [signers[i % 2].sign_block({"content": f"text {i}", "timestamp": i}) for i in range(10)]
+    blocks[3]["content"] = "tampered"
+    del blocks[7]["signature"]
+    expected = [i not in (3, 7) for i in range(10)]
+
+    assert Signer.verify_blocks(blocks, workers=1) == expected
+    assert Signer.verify_blocks(blocks, workers=4, chunk_size=2) == expected
+    assert Signer.verify_blocks(iter(blocks), workers=2, chunk_size=3, executor="process") == expected
+
+def test_verify_blocks_rejects_unknown_executor():
+    with pytest.raises(ValueError):
+        Signer.verify_blocks([], executor="gpu")
+
+def test_digest_scheme_roundtrip():
+    import numpy as np
+    from cosmoembeddings.embedding_codec import encode_embeddings
+    signer = Signer(scheme="digest-v1")
+    matrix = np.random.default_rng(0).normal(size=(3, 8)).astype(np.float32)
+    block = signer.sign_block({"content": ["a", "b", "c"], "embeddings": matrix.tolist(), "timestamp": 1})
+    assert block["signature_scheme"] == "digest-v1"
+    assert Signer.verify_block(block) is True
+
+    # The digest covers the embedding values, not their container type
+    assert Signer.verify_block({**block, "embeddings": matrix}) is True
+    assert Signer.verify_block({**block, "embeddings": (matrix * 2).tolist()}) is False
+    assert Signer.verify_block({**block, "content": ["a", "b", "x"]}) is False
+
+    encoded = signer.sign_block({"content": "a", "embeddings": encode_embeddings(matrix, "int8")})
+    assert Signer.verify_block(encoded) is True
+
+def test_digest_scheme_cannot_be_downgraded():
+    block = Signer(scheme="digest-v1").sign_block({"content": "a", "embeddings": [[0.5, 0.25]]})
+    legacy = dict(block)
+    del legacy["signature_scheme"]
+    assert Signer.verify_block(legacy) is False
+    assert Signer.verify_block({**block, "signature_scheme": "v0"}) is False
+    with pytest.raises(ValueError):
+        Signer(scheme="v0")
+
+def test_sign_batch_with_merkle_proofs():
+    signer = Signer()
+    blocks = signer.sign_batch([{"content": f"text {i}", "embeddings": [[float(i), 0.5]]} for i in range(7)])
+
+    assert len({block["signature"] for block in blocks}) == 1
+    assert all(block["merkle_proof"]["size"] == 7 for block in blocks)
+    assert Signer.verify_blocks(blocks, workers=1) == [True] * 7
+
+    tampered = dict(blocks[3], content="tampered")
+    assert Signer.verify_block(tampered) is False
+    moved = dict(blocks[3], merkle_proof=dict(blocks[3]["merkle_proof"], index=4))
+    assert Signer.verify_block(moved) is False
+    forged = dict(blocks[3], signature=Signer().sign_batch([{"content": "x"}])[0]["signature"])
+    assert Signer.verify_block(forged) is False
+
+def test_merkle_scheme_signs_single_blocks():
+    block = Signer(scheme="merkle-v1").sign_block({"content": "a"})
+    assert block["merkle_proof"]["path"] == []
+    assert Signer.verify_block(block) is True
@@ -0,0 +1,79 @@
+import os
+import time
+from datetime import datetime, timezone
+import pytest
+import skyfield
+from cosmoembeddings.sky_refresher import SkyStateRefresher
+from cosmoembeddings.validator import CosmoValidator
+
+# A small ephemeris shipped with skyfield's tests, covering late July 1969
+TEST_EPHEMERIS = os.path.join(os.path.dirname(skyfield.__file__), "tests", "data", "de441-1969.bsp")
+START = datetime(1969, 7, 27, 0, 0, tzinfo=timezone.utc).timestamp()
+
+def test_refresher_publishes_snapshots():
+    computed = []
+    refresher = SkyStateRefresher(lambda timestamp: computed.append(timestamp) or {"n": len(computed)},
+                                  interval=0.01, clock=lambda: 1000.0)
+    assert refresher.snapshot is None
+    refresher.start()
+    try:
+        assert refresher.wait_ready(5)
+        time.sleep(0.05)
+    finally:
+        refresher.stop()
+    assert not refresher.running
+    assert refresher.refreshes == len(computed) >= 2
+    # Snapshots are computed for the middle of the coming interval
+    assert refresher.snapshot.timestamp == 1000.005
+    assert refresher.current(1000.0, 0.01) is refresher.snapshot
+    assert refresher.current(1000.1, 0.01) is None
+
+def test_refresher_survives_errors():
+    def fail(timestamp):
+        raise RuntimeError("no ephemeris")
+    refresher = SkyStateRefresher(fail, interval=0.01)
+    refresher.start()
+    time.sleep(0.05)
+    refresher.stop()
+    assert refresher.errors >= 2 and refresher.snapshot is None
+
+@pytest.mark.skipif(not os.path.exists(TEST_EPHEMERIS), reason="skyfield test data not installed")
+def test_validator_stamps_from_snapshot():
+    validator = CosmoValidator(40.7128, -74.0060, ephemeris_path=TEST_EPHEMERIS)
+    validator.refresher = SkyStateRefresher(validator.get_celestial_signature, interval=60.0, clock=lambda: START)
+    validator.refresh_tolerance = 60.0
+    snapshot = validator.refresher.refresh()
+
+    # Stamping within the tolerance needs no astronomy
+    live_positions = validator._body_positions
+    validator._body_positions = lambda timestamps: pytest.fail("computed live")
+    blocks = [{"timestamp": START + 10}, {"timestamp": START + 50}]
+    assert validator.validate_block(blocks[0]) == (True, "Block validated with cosmo signature")
+    assert validator.validate_blocks(blocks[1:]) == [(True, "Block validated with cosmo signature")]
+    for block in blocks:
+        assert block["cosmo_signature"]["timestamp"] == snapshot.timestamp
+        assert block["cosmo_signature"]["celestial_bodies"] == snapshot.signature["celestial_bodies"]
+        assert block["cosmo_signature"]["celestial_bodies"] is not snapshot.signature["celestial_bodies"]
+
+    # Blocks outside the tolerance fall back to live computation
+    validator._body_positions = live_positions
+    late = {"timestamp": START + 3600}
+    validator.validate_block(late)
+    assert late["cosmo_signature"]["celestial_bodies"] != snapshot.signature["celestial_bodies"]
+    validator.stop_refresher()
+    assert validator.refresher is None
+
+@pytest.mark.skipif(not os.path.exists(TEST_EPHEMERIS), reason="skyfield test data not installed")
+def test_snapshot_stamped_signature_matches_recomputation():
+    validator = CosmoValidator(40.7128, -74.0060, ephemeris_path=TEST_EPHEMERIS)
+    validator.refresher = SkyStateRefresher(validator.get_celestial_signature, interval=600.0, clock=lambda: START)
+    validator.refresh_tolerance = 600.0
+    validator.refresher.refresh()
+
+    block = {"timestamp": START + 590}
+    validator.validate_block(block)
+    stamped = block["cosmo_signature"]
+    # The sky of the stamped moment, not of the block's own timestamp
+    recomputed = validator.get_celestial_signature(stamped["timestamp"])
+    assert stamped["celestial_bodies"] == recomputed["celestial_bodies"]
+    assert stamped["cosmo_signature"] == recomputed["cosmo_signature"]
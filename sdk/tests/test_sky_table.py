@@ -0,0 +1,62 @@
+import os
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+import skyfield
+from cosmoembeddings.sky_table import SkyTable
+from cosmoembeddings.validator import CosmoValidator
+
+# A small ephemeris shipped with skyfield's tests, covering late July 1969
+TEST_EPHEMERIS = os.path.join(os.path.dirname(skyfield.__file__), "tests", "data", "de441-1969.bsp")
+START = datetime(1969, 7, 27, 0, 0, tzinfo=timezone.utc).timestamp()
+
+pytestmark = pytest.mark.skipif(not os.path.exists(TEST_EPHEMERIS), reason="skyfield test data not installed")
+
+def make_validator(**kwargs):
+    return CosmoValidator(40.7128, -74.0060, ephemeris_path=TEST_EPHEMERIS, **kwargs)
+
+def test_compute_save_and_load(tmp_path):
+    table = SkyTable.compute(make_validator(), START, START + 3600.0, step=60.0)
+    assert len(table) == 61
+    assert (table.start, table.end) == (START, START + 3600.0)
+
+    path = str(tmp_path / "sky.npz")
+    table.save(path)
+    loaded = SkyTable.load(path)
+    assert loaded.matches(40.7128, -74.0060)
+    np.testing.assert_array_equal(loaded.timestamps, table.timestamps)
+    for field, values in table.positions.items():
+        np.testing.assert_array_equal(loaded.positions[field], values)
+    assert [loaded.cosmo_signature(i) for i in range(len(loaded))] == \
+        [table.cosmo_signature(i) for i in range(len(table))]
+
+def test_nearest_within_tolerance():
+    table = SkyTable.compute(make_validator(), START, START + 600.0, step=60.0)
+    queries = [START - 31.0, START - 30.0, START + 29.0, START + 31.0, START + 600.0, START + 631.0, float("nan")]
+    assert list(table.nearest(queries)) == [-1, 0, 0, 1, 10, -1, -1]
+    assert int(table.nearest(START + 125.0)) == 2
+
+def test_validator_serves_table_and_falls_back():
+    table = SkyTable.compute(make_validator(), START, START + 1800.0, step=10.0)
+    validator = make_validator(sky_table=table)
+    live = make_validator()
+
+    timestamps = [START + 600.0, START + 7200.0]
+    served = validator.get_celestial_signatures(timestamps)
+    expected = live.get_celestial_signatures(timestamps)
+    for signature, reference in zip(served, expected):
+        assert signature["timestamp"] == reference["timestamp"]
+        assert signature["cosmo_signature"] == reference["cosmo_signature"]
+        for body in ("sun", "moon"):
+            for field, value in reference["celestial_bodies"][body].items():
+                assert signature["celestial_bodies"][body][field] == pytest.approx(value, abs=1e-9)
+
+    # Off-sample timestamps are served from the nearest sample, inside the tolerance
+    off_sample = validator.get_celestial_signature(START + 604.0)
+    assert off_sample["timestamp"] == START + 604.0
+    assert off_sample["celestial_bodies"] == served[0]["celestial_bodies"]
+
+def test_table_for_another_location_is_rejected():
+    table = SkyTable.compute(make_validator(), START, START + 60.0, step=60.0)
+    with pytest.raises(ValueError):
+        CosmoValidator(0.0, 0.0, ephemeris_path=TEST_EPHEMERIS, sky_table=table)
@@ -0,0 +1,66 @@
+import os
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+import requests
+import skyfield
+from skyfield.api import Star, load_file, wgs84
+from cosmoembeddings.cosmo_signature import CosmoSignatureGenerator
+from cosmoembeddings.ephemeris import get_timescale
+from cosmoembeddings.star_catalog import BRIGHT_STARS, StarCatalog, default_catalog
+
+TEST_EPHEMERIS = os.path.join(os.path.dirname(skyfield.__file__), "tests", "data", "de441-1969.bsp")
+TIMESTAMP = datetime(1969, 7, 27, 3, 0, tzinfo=timezone.utc).timestamp()
+
+@pytest.mark.skipif(not os.path.exists(TEST_EPHEMERIS), reason="skyfield test data not installed")
+def test_altitudes_match_full_skyfield_reduction():
+    catalog = default_catalog()
+    coordinates = catalog.horizon_coordinates(40.7128, -74.0060, 10.0, TIMESTAMP)
+
+    planets = load_file(TEST_EPHEMERIS)
+    t = get_timescale().from_datetime(datetime.fromtimestamp(TIMESTAMP, tz=timezone.utc))
+    stars = Star(ra_hours=catalog.ra / 15.0, dec_degrees=catalog.dec)
+    observer = planets["earth"] + wgs84.latlon(40.7128, -74.0060, elevation_m=10.0)
+    altitude, azimuth, _ = observer.at(t).observe(stars).apparent().altaz()
+
+    assert np.max(np.abs(coordinates["altitude"] - altitude.degrees)) < 0.02
+    # Azimuth is ill-conditioned near the zenith
+    low = altitude.degrees < 80
+    azimuth_error = (coordinates["azimuth"][low] - azimuth.degrees[low] + 180.0) % 360.0 - 180.0
+    assert np.max(np.abs(azimuth_error)) < 0.05
+
+def test_visible_stars_are_above_horizon_and_sorted():
+    stars = default_catalog().visible_stars(40.7128, -74.0060, timestamp=TIMESTAMP)
+    assert 0 < len(stars) < len(BRIGHT_STARS)
+    assert all(star["altitude"] > 0 for star in stars)
+    assert [star["magnitude"] for star in stars] == sorted(star["magnitude"] for star in stars)
+    # Polaris never sets at this latitude, Acrux never rises
+    names = {star["name"] for star in stars}
+    assert "Polaris" in names and "Acrux" not in names
+
+def test_signatures_are_offline_and_deterministic(monkeypatch):
+    def no_network(*args, **kwargs):
+        raise AssertionError("network used without an API key")
+    monkeypatch.setattr(requests, "get", no_network)
+    monkeypatch.setattr(requests.Session, "get", no_network)
+
+    generator = CosmoSignatureGenerator()
+    signature = generator.generate_signature(40.7128, -74.0060, timestamp=TIMESTAMP)
+    assert signature == generator.generate_signature(40.7128, -74.0060, timestamp=TIMESTAMP)
+    assert generator.verify_signature(signature, 40.7128, -74.0060, timestamp=TIMESTAMP)
+
+def test_api_failure_falls_back_to_catalog(monkeypatch):
+    def failing_get(session, url, **kwargs):
+        assert kwargs["timeout"] == (3.05, 10.0)
+        raise requests.exceptions.ConnectionError("offline")
+    monkeypatch.setattr(requests.Session, "get", failing_get)
+
+    generator = CosmoSignatureGenerator(api_key="key")
+    generator.fetcher.backoff = 0.0
+    stars = generator.get_star_positions(40.7128, -74.0060, timestamp=TIMESTAMP)
+    assert stars == default_catalog().visible_stars(40.7128, -74.0060, timestamp=TIMESTAMP)
+
+def test_custom_catalog():
+    catalog = StarCatalog(["North", "South"], [0.0, 0.0], [89.0, -89.0], [1.0, 0.5], [10.0, 20.0])
+    stars = CosmoSignatureGenerator(catalog=catalog).get_star_positions(45.0, 0.0, timestamp=TIMESTAMP)
+    assert [star["name"] for star in stars] == ["North"]
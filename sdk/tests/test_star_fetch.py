@@ -0,0 +1,175 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from cosmoembeddings.cosmo_signature import CosmoSignatureGenerator
+from cosmoembeddings.star_catalog import default_catalog
+from cosmoembeddings.star_fetch import CircuitBreaker, StarDataFetcher
+
+STARS = {"stars": [{"name": "Vega", "magnitude": 0.03, "ra": 279.2347, "dec": 38.7837, "distance": 25.0},
+                   {"name": "Deneb", "magnitude": 1.25, "ra": 310.358, "dec": 45.2803, "distance": 2600.0}]}
+TIMESTAMP = 1700000000.0
+
+class StarServer:
+    """Local stand-in for the star API, scripted with a list of responses."""
+
+    def __init__(self):
+        self.requests = []
+        self.responses = []  # (status, body, delay); the last one repeats
+        # Requests are held until this many are in flight at once, or for a second
+        self.hold_until = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._condition = threading.Condition()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._condition:
+                    server.requests.append((self.headers.get("Authorization"), parse_qs(urlparse(self.path).query)))
+                    status, body, delay = server.responses[min(len(server.requests), len(server.responses)) - 1]
+                    server.in_flight += 1
+                    server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+                    server._condition.notify_all()
+                    if server.hold_until:
+                        server._condition.wait_for(lambda: server.peak_in_flight >= server.hold_until, 1.0)
+                time.sleep(delay)
+                with server._condition:
+                    server.in_flight -= 1
+                payload = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except OSError:
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/stars"
+        threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def server():
+    server = StarServer()
+    yield server
+    server.close()
+
+def make_fetcher(server, **kwargs):
+    kwargs.setdefault("timeout", (1.0, 1.0))
+    kwargs.setdefault("backoff", 0.0)
+    return StarDataFetcher("key", url=server.url, **kwargs)
+
+def test_generate_and_verify_share_one_fetch(server):
+    server.responses = [(200, STARS, 0.0)]
+    fetcher = make_fetcher(server)
+    generator = CosmoSignatureGenerator(fetcher=fetcher)
+
+    signature = generator.generate_signature(40.71281, -74.00601, timestamp=TIMESTAMP + 5)
+    assert signature == "Sagittarius-0.0"
+    assert generator.verify_signature(signature, 40.71279, -74.00599, timestamp=TIMESTAMP + 15)
+    assert len(server.requests) == 1
+    authorization, params = server.requests[0]
+    assert authorization == "Bearer key"
+    assert params["latitude"] == ["40.71"] and params["longitude"] == ["-74.01"]
+    assert fetcher.stats()["hits"] == 1
+
+def test_timeout_falls_back_to_catalog(server):
+    server.responses = [(200, STARS, 0.5)]
+    fetcher = make_fetcher(server, timeout=(1.0, 0.1), retries=0)
+    generator = CosmoSignatureGenerator(fetcher=fetcher)
+
+    stars = generator.get_star_positions(40.7128, -74.0060, timestamp=TIMESTAMP)
+    # The response arrives after the read timeout: the catalog answers instead
+    assert stars == default_catalog().visible_stars(40.7128, -74.0060, timestamp=TIMESTAMP)
+    assert fetcher.stats()["failures"] == 1
+    assert len(server.requests) == 1
+
+def test_server_errors_are_retried(server):
+    server.responses = [(503, {}, 0.0), (200, STARS, 0.0)]
+    fetcher = make_fetcher(server, retries=1)
+    assert [star["name"] for star in fetcher.fetch(40.7, -74.0, 0.0, TIMESTAMP)] == ["Vega", "Deneb"]
+    assert len(server.requests) == 2
+
+def test_client_errors_are_not_retried(server):
+    server.responses = [(401, {"error": "bad key"}, 0.0)]
+    fetcher = make_fetcher(server, retries=3)
+    assert fetcher.fetch(40.7, -74.0, 0.0, TIMESTAMP) == []
+    assert len(server.requests) == 1
+
+def test_circuit_breaker_stops_calls(server):
+    server.responses = [(500, {}, 0.0)]
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0, clock=lambda: now[0])
+    fetcher = make_fetcher(server, retries=0, breaker=breaker)
+
+    for minute in range(5):
+        assert fetcher.fetch(40.7, -74.0, 0.0, TIMESTAMP + 60 * minute) == []
+    assert len(server.requests) == 3
+    assert breaker.state == CircuitBreaker.OPEN and fetcher.stats()["rejected"] == 2
+
+    # After the reset timeout a single trial call goes through and closes the breaker
+    server.responses = [(200, STARS, 0.0)]
+    server.requests.clear()
+    now[0] = 31.0
+    assert len(fetcher.fetch(40.7, -74.0, 0.0, TIMESTAMP)) == 2
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_unexpected_errors_settle_a_half_open_breaker(server, monkeypatch):
+    server.responses = [(200, STARS, 0.0)]
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0, clock=lambda: now[0])
+    fetcher = make_fetcher(server, retries=0, breaker=breaker)
+    breaker.record_failure()
+    now[0] = 31.0
+
+    def parse(data):
+        raise KeyError("stars")
+    monkeypatch.setattr(fetcher, "_parse", parse)
+    # The trial call fails outside the request errors: the breaker opens again
+    assert fetcher.fetch(40.7, -74.0, 0.0, TIMESTAMP) == []
+    assert breaker.state == CircuitBreaker.OPEN and fetcher.stats()["failures"] == 1
+
+def test_concurrent_misses_share_one_request(server):
+    server.responses = [(200, STARS, 0.3)]
+    fetcher = make_fetcher(server)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fetcher.fetch(40.7, -74.0, 0.0, TIMESTAMP)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(server.requests) == 1
+    assert len(results) == 4 and all(len(stars) == 2 for stars in results)
+    assert results[0][0] is not results[1][0]
+    stats = fetcher.stats()
+    assert stats["misses"] == 1 and stats["coalesced"] + stats["hits"] == 3
+
+def test_prefetch_fetches_each_cell_once(server):
+    server.responses = [(200, STARS, 0.0)]
+    server.hold_until = 4
+    fetcher = make_fetcher(server, pool_size=4, timeout=(5.0, 5.0))
+    timestamps = [TIMESTAMP + 30 * i for i in range(16)]  # two timestamps per minute
+
+    results = fetcher.prefetch(40.7, -74.0, 0.0, timestamps)
+    assert len(results) == 16 and all(len(stars) == 2 for stars in results)
+    assert results[0][0] is not results[1][0]
+    assert len(server.requests) == 8
+    # The eight cells were fetched on all four threads at once, and never more
+    assert server.peak_in_flight == 4
+    fetcher.prefetch(40.7, -74.0, 0.0, timestamps)
+    assert len(server.requests) == 8
+    fetcher.close()
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import threading
+import time
+from cosmoembeddings.signer import Signer
+from cosmoembeddings.validation_pipeline import SizeStage, ValidationPipeline
+
+class CountingValidator:
+    MAX_SIGNATURE_AGE = 300
+
+    def __init__(self):
+        self.calls = 0
+
+    def verify_cosmo_signature(self, block):
+        self.calls += 1
+        return True, "Cosmo signature verified"
+
+    def validate_block(self, block):
+        stamp(block, {"timestamp": block["timestamp"], "cosmo_signature": "Orion-0.5"})
+        return True, "Block validated with cosmo signature"
+
+def stamp(block, cosmo_signature):
+    block["cosmo_signature"] = cosmo_signature
+    block["cosmo_hash"] = hashlib.sha256(json.dumps(cosmo_signature, sort_keys=True).encode()).hexdigest()
+
+def make_block(signer, block_id="block-1", timestamp=None, stamped=True):
+    block = {
+        "id": block_id,
+        "timestamp": int(time.time()) if timestamp is None else timestamp,
+        "embeddings": [[0.5, 0.25]],
+        "content": ["text"]
+    }
+    if stamped:
+        stamp(block, {"timestamp": time.time(), "cosmo_signature": "Orion-0.5"})
+    return signer.sign_block(block)
+
+def test_valid_block_runs_every_stage():
+    signer, validator = Signer(), CountingValidator()
+    pipeline = ValidationPipeline.default(signer, validator)
+    report = pipeline.validate(make_block(signer))
+
+    assert report.is_valid and report.failed_stage is None
+    assert list(report.timings) == ["schema", "size", "timestamp", "stamp", "hash", "signature", "cosmo"]
+    assert all(seconds >= 0 for seconds in report.timings.values())
+    assert validator.calls == 1
+
+def test_cheap_stages_reject_first():
+    signer, validator = Signer(), CountingValidator()
+    pipeline = ValidationPipeline.default(signer, validator, max_bytes=10000)
+
+    junk = {"id": "junk", "timestamp": "yesterday"}
+    stale = make_block(signer, "stale", timestamp=int(time.time()) - 3600)
+    tampered = make_block(signer, "tampered")
+    tampered["cosmo_hash"] = "0" * 64
+    forged = make_block(signer, "forged")
+    forged["content"] = ["changed"]
+    huge = make_block(signer, "huge")
+    huge["content"] = ["x" * 20000]
+
+    assert pipeline.validate(junk).failed_stage == "schema"
+    assert pipeline.validate("not a block").failed_stage == "schema"
+    assert pipeline.validate(huge).failed_stage == "size"
+    assert pipeline.validate(stale).failed_stage == "timestamp"
+    assert pipeline.validate(tampered).failed_stage == "hash"
+    assert pipeline.validate(forged).failed_stage == "signature"
+    assert validator.calls == 0
+
+    stats = pipeline.stats()
+    assert stats["schema"] == {"calls": 6, "rejections": 2, "seconds": stats["schema"]["seconds"]}
+    assert stats["cosmo"]["calls"] == 0
+
+def test_replayed_block_is_rejected():
+    signer, validator = Signer(), CountingValidator()
+    pipeline = ValidationPipeline.default(signer, validator)
+    block = make_block(signer)
+
+    assert pipeline.validate(block).is_valid
+    replay = pipeline.validate(block)
+    assert not replay.is_valid
+    assert replay.failed_stage == "timestamp" and "replay" in replay.reason
+    assert validator.calls == 1
+
+def test_size_stage_checks_encoded_shapes():
+    stage = SizeStage(max_embeddings=10, max_dimensions=8)
+    assert stage.check({"embeddings": {"dtype": "int8", "shape": [4, 8], "data": ""}}, size=100)[0]
+    assert not stage.check({"embeddings": {"dtype": "int8", "shape": [11, 8], "data": ""}}, size=100)[0]
+    assert not stage.check({"embeddings": [[0.0] * 9]}, size=100)[0]
+    assert not stage.check({"embeddings": {"dtype": "int8", "shape": "4x8", "data": ""}}, size=100)[0]
+
+def test_concurrent_copies_are_replays():
+    class BlockingValidator(CountingValidator):
+        def __init__(self):
+            super().__init__()
+            self.entered = threading.Event()
+            self.release = threading.Event()
+
+        def verify_cosmo_signature(self, block):
+            self.entered.set()
+            self.release.wait(5)
+            return super().verify_cosmo_signature(block)
+
+    signer, validator = Signer(), BlockingValidator()
+    pipeline = ValidationPipeline.default(signer, validator)
+    block = make_block(signer)
+    reports = []
+    first = threading.Thread(target=lambda: reports.append(pipeline.validate(block)))
+    first.start()
+    assert validator.entered.wait(5)
+
+    copy = pipeline.validate(dict(block))
+    validator.release.set()
+    first.join(5)
+    assert reports[0].is_valid
+    assert copy.failed_stage == "timestamp" and "replay" in copy.reason
+    assert validator.calls == 1
+
+def test_rejected_block_releases_its_id():
+    signer, validator = Signer(), CountingValidator()
+    pipeline = ValidationPipeline.default(signer, validator)
+    block = make_block(signer)
+    forged = dict(block, content=["changed"])
+
+    assert pipeline.validate(forged).failed_stage == "signature"
+    assert pipeline.validate(block).is_valid
+
+def test_size_stage_measures_unknown_sizes():
+    stage = SizeStage(max_bytes=100)
+    block = {"embeddings": [[0.0]], "content": ["x" * 1000]}
+    assert not stage.check(block)[0]
+    assert not stage.check(block, size=-1)[0]
+
+def test_junk_with_a_real_id_does_not_block_the_real_block():
+    signer, validator = Signer(), CountingValidator()
+    stage = ValidationPipeline.default(signer, validator).stages[2]
+    block = make_block(signer)
+    junk = dict(block, content=["junk"])
+
+    assert stage.check(junk)[0]
+    assert stage.check(block)[0]
+    assert not stage.check(dict(block))[0]
+    stage.release(junk)
+    stage.release(block)
+    assert stage.check(dict(block))[0]
+
+def test_node_stamps_unstamped_blocks():
+    signer, validator = Signer(), CountingValidator()
+    pipeline = ValidationPipeline.default(signer, validator)
+    # Signed over the stamp the node computes, then sent without it
+    block = make_block(signer, stamped=False)
+    del block["signature"], block["public_key"]
+    validator.validate_block(block)
+    signer.sign_block(block)
+    del block["cosmo_signature"], block["cosmo_hash"]
+
+    report = pipeline.validate(block)
+    assert report.is_valid, report.reason
+    assert block["cosmo_signature"]["cosmo_signature"] == "Orion-0.5"
+
+    unsigned_stamp = make_block(signer, "other", stamped=False)
+    assert pipeline.validate(unsigned_stamp).failed_stage == "signature"
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from cosmoembeddings.signer import Signer
+from cosmoembeddings.validator import CosmoValidator
+from cosmoembeddings.verdict_cache import VerdictCache
+
+def make_block(signer, content="text"):
+    return signer.sign_block({"id": content, "content": content, "embeddings": [[0.5, 0.25]]})
+
+def test_keys_follow_block_and_signature():
+    block = make_block(Signer())
+    key = VerdictCache.make_key(block)
+    assert VerdictCache.make_key(dict(block)) == key
+    assert VerdictCache.make_key(dict(block, content="other")) != key
+    assert VerdictCache.make_key(dict(block, signature="AAAA")) != key
+    assert VerdictCache.make_key(block, "cosmo") != key
+
+def test_expiry_and_bound():
+    now = [1000.0]
+    cache = VerdictCache(max_entries=2, clock=lambda: now[0])
+    cache.put("a", True, "ok")
+    cache.put("b", False, "bad", ttl=5)
+    assert cache.get("a") == (True, "ok")
+    assert cache.get("b") == (False, "bad")
+    now[0] += 5
+    assert cache.get("b") is None
+
+    cache.put("c", True)
+    cache.put("d", True)
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 2
+
+def test_persistence():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "verdicts.json")
+        now = [1000.0]
+        cache = VerdictCache(path=path, clock=lambda: now[0])
+        cache.put("kept", True, "ok")
+        cache.put("expired", True, "ok", ttl=10)
+        now[0] += 10
+        cache.close()
+
+        reloaded = VerdictCache(path=path, clock=lambda: now[0])
+        assert reloaded.get("kept") == (True, "ok")
+        assert reloaded.get("expired") is None
+
+def test_signer_consults_cache():
+    signer = Signer()
+    cache = VerdictCache()
+    blocks = [make_block(signer, f"text {i}") for i in range(4)]
+    blocks[1]["content"] = "tampered"
+
+    assert Signer.verify_blocks(blocks, cache=cache) == [True, False, True, True]
+    assert cache.stats()["misses"] == 4
+    assert Signer.verify_blocks(blocks, cache=cache) == [True, False, True, True]
+    assert Signer.verify_block(blocks[0], cache=cache) is True
+    assert cache.stats()["hits"] == 5
+
+def test_malformed_blocks_are_invalid_with_cache():
+    cache = VerdictCache()
+    block = make_block(Signer())
+    block["embeddings"] = {"dtype": "int8", "data": "abc"}
+
+    assert Signer.verify_block(block) is False
+    assert Signer.verify_block(block, cache=cache) is False
+    assert Signer.verify_blocks([block, make_block(Signer())], cache=cache) == [False, True]
+
+def test_cosmo_verdicts_expire_with_signature_age():
+    start = time.time()
+    now = [start]
+    cache = VerdictCache(clock=lambda: now[0])
+    validator = CosmoValidator(40.7128, -74.0060, verdict_cache=cache)
+    # The validator measures age against datetime.utcnow(); the verdict has a minute left
+    stamp = {"timestamp": datetime.utcnow().timestamp() - CosmoValidator.MAX_SIGNATURE_AGE + 60}
+    block = {"cosmo_signature": stamp,
+             "cosmo_hash": hashlib.sha256(json.dumps(stamp, sort_keys=True).encode()).hexdigest()}
+
+    assert validator.verify_cosmo_signature(block)[0] is True
+    now[0] = start + 50
+    assert validator.verify_cosmo_signature(block)[0] is True
+    assert cache.stats()["hits"] == 1
+    now[0] = start + 70
+    validator.verify_cosmo_signature(block)
+    assert cache.stats() == {"hits": 1, "misses": 2, "hit_rate": 1 / 3, "entries": 1}
+
+def test_negative_cosmo_verdicts_are_retried():
+    now = [time.time()]
+    cache = VerdictCache(clock=lambda: now[0])
+    validator = CosmoValidator(40.7128, -74.0060, verdict_cache=cache)
+    answers = [False, True]
+    validator.signature_generator.verify_signature = lambda *args, **kwargs: answers.pop(0)
+    stamp = {"timestamp": datetime.utcnow().timestamp() - 10, "cosmo_signature": "Orion-0.5"}
+    block = {"cosmo_signature": stamp,
+             "cosmo_hash": hashlib.sha256(json.dumps(stamp, sort_keys=True).encode()).hexdigest()}
+
+    # A rejection, perhaps from a degraded star source, is cached only briefly
+    assert validator.verify_cosmo_signature(block)[0] is False
+    assert validator.verify_cosmo_signature(block)[0] is False
+    now[0] += CosmoValidator.NEGATIVE_VERDICT_TTL
+    assert validator.verify_cosmo_signature(block)[0] is True
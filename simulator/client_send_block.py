@@ -5,6 +5,7 @@ import sys
 import requests
 import json
 import time
+import uuid
 from datetime import datetime
 
 # Add the SDK directory to the path
@@ -32,16 +33,17 @@ metadata = {
 
 # Create the block
 block = builder.create_block(content, metadata)
+block["id"] = f"block-{uuid.uuid4().hex[:8]}"
 
-# Sign the block
-signed_block = signer.sign_block(block)
-
-# Validate the block with cosmo signature
-is_valid, reason = validator.validate_block(signed_block)
+# Stamp the block with a cosmo signature before signing, so the signature covers it
+is_valid, reason = validator.validate_block(block)
 if not is_valid:
     print(f"Block validation failed: {reason}")
     sys.exit(1)
 
+# Sign the block
+signed_block = signer.sign_block(block)
+
 # Send block to the local node
 response = requests.post("http://localhost:8080/blocks", json=signed_block)
 
@@ -23,7 +23,7 @@ if __name__ == "__main__":
     print(f"Launching multiple CosmoEmbeddings nodes (SDK version: {config.get('version', 'unknown')}):")
     for port in ports:
         print(f" - Node on port {port}")
-        nodes.append(subprocess.Popen(["python", "node_simulator.py"], env={**dict(**os.environ), "PORT": str(port)}))
+        nodes.append(subprocess.Popen(["python", "node_server.py"], env={**dict(**os.environ), "PORT": str(port)}))
         time.sleep(1)
 
     print("\nNodes are running. Press Ctrl+C to stop.")
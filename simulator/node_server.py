@@ -0,0 +1,211 @@
+# node_server.py
+
+import os
+import queue
+import selectors
+import socket
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import HTTPServer
+
+class BoundedThreadingHTTPServer(HTTPServer):
+    """
+    HTTP server handing connections to a fixed pool of worker threads.
+
+    The accept loop only queues accepted connections; workers run the handler,
+    so a slow request never holds up others. At most `workers` requests are
+    served at once and `max_pending` more connections wait in the queue; beyond
+    that new connections get an immediate 503 instead of piling up. Between
+    requests, keep-alive connections from a make_handler handler wait in a
+    selector thread rather than in a worker, so idle peers cost a file
+    descriptor but no worker; they are queued again when their next request
+    arrives and closed once idle for `idle_timeout` seconds.
+    """
+
+    allow_reuse_address = True
+
+    def __init__(self, server_address, handler_class, workers=64, max_pending=1024, idle_timeout=15):
+        # Listen backlog for connections the accept loop has not picked up yet
+        self.request_queue_size = max_pending
+        super().__init__(server_address, handler_class)
+        self.workers = workers
+        self.idle_timeout = idle_timeout
+        self._pending = queue.Queue(maxsize=max_pending)
+
+        # Idle keep-alive connections, oldest first, with the time they close
+        self._idle = OrderedDict()
+        self._parked = queue.SimpleQueue()
+        self._selector = selectors.DefaultSelector()
+        self._wakeup, self._wakeup_writer = socket.socketpair()
+        self._wakeup.setblocking(False)
+        self._selector.register(self._wakeup, selectors.EVENT_READ)
+        self._closing = False
+
+        self._threads = [
+            threading.Thread(target=self._work, name=f"node-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        self._idle_thread = threading.Thread(target=self._watch_idle, name="node-idle", daemon=True)
+        for thread in self._threads + [self._idle_thread]:
+            thread.start()
+
+    def process_request(self, request, client_address):
+        self._dispatch(request, client_address)
+
+    def _dispatch(self, request, client_address):
+        try:
+            self._pending.put_nowait((request, client_address))
+        except queue.Full:
+            self._reject(request)
+
+    def _work(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            request, client_address = item
+            keep_alive = False
+            try:
+                handler = self.RequestHandlerClass(request, client_address, self)
+                keep_alive = getattr(handler, "keep_alive", False)
+            except Exception:
+                self.handle_error(request, client_address)
+            if keep_alive and not self._closing:
+                # The response is flushed; wait for the next request without a worker
+                self._parked.put((request, client_address))
+                self._wakeup_writer.send(b"\0")
+            else:
+                self.shutdown_request(request)
+
+    def _watch_idle(self):
+        """Queue idle connections whose next request arrived and close those idle too long."""
+        while not self._closing:
+            timeout = None
+            if self._idle:
+                timeout = max(0.0, next(iter(self._idle.values()))[1] - time.monotonic())
+            for key, _ in self._selector.select(timeout):
+                if key.fileobj is self._wakeup:
+                    self._adopt_parked()
+                    continue
+                client_address, _ = self._idle.pop(key.fileobj)
+                self._selector.unregister(key.fileobj)
+                self._dispatch(key.fileobj, client_address)
+            now = time.monotonic()
+            while self._idle:
+                request, (client_address, closes_at) = next(iter(self._idle.items()))
+                if closes_at > now:
+                    break
+                del self._idle[request]
+                self._selector.unregister(request)
+                self.shutdown_request(request)
+        for request in list(self._idle):
+            self.shutdown_request(request)
+        self._idle.clear()
+
+    def _adopt_parked(self):
+        """Start watching the connections workers handed back."""
+        try:
+            while self._wakeup.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        closes_at = time.monotonic() + self.idle_timeout
+        while True:
+            try:
+                request, client_address = self._parked.get_nowait()
+            except queue.Empty:
+                return
+            if self._closing:
+                self.shutdown_request(request)
+                continue
+            self._idle[request] = (client_address, closes_at)
+            self._selector.register(request, selectors.EVENT_READ)
+
+    def _reject(self, request):
+        body = b'{"error": "Node is busy"}'
+        try:
+            request.sendall(b"HTTP/1.1 503 Service Unavailable\r\n"
+                            b"Content-Type: application/json\r\n"
+                            b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+                            b"Retry-After: 1\r\n"
+                            b"Connection: close\r\n\r\n" + body)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._closing = True
+        self._wakeup_writer.send(b"\0")
+        self._idle_thread.join()
+        # Workers finish their connection, then stop
+        for _ in self._threads:
+            try:
+                self._pending.put_nowait(None)
+            except queue.Full:
+                break
+
+def make_handler(base_handler, request_timeout=15):
+    """
+    Build an HTTP/1.1 keep-alive variant of a handler whose responses all carry Content-Length.
+
+    Once a response is sent and no further request is already buffered, the
+    handler returns the connection to a BoundedThreadingHTTPServer to wait for
+    its next request. request_timeout bounds how long a worker waits for the
+    rest of a request that has started arriving.
+    """
+    class KeepAliveHandler(base_handler):
+        protocol_version = "HTTP/1.1"
+        timeout = request_timeout
+        keep_alive = False
+
+        def handle(self):
+            self.close_connection = True
+            self.handle_one_request()
+            while not self.close_connection:
+                if not self._request_buffered():
+                    self.keep_alive = not self.close_connection
+                    return
+                self.handle_one_request()
+
+        def _request_buffered(self):
+            # Look for pipelined bytes without blocking
+            self.connection.settimeout(0)
+            try:
+                return bool(self.rfile.peek(1))
+            except OSError:
+                self.close_connection = True
+                return False
+            finally:
+                self.connection.settimeout(self.timeout)
+
+    KeepAliveHandler.__name__ = f"KeepAlive{base_handler.__name__}"
+    return KeepAliveHandler
+
+def run(port=8080, workers=64, max_pending=1024, idle_timeout=15):
+    # The node's routes, storage and validation pipeline
+    import node_simulator
+
+    # Load the ephemeris before accepting blocks
+    node_simulator.validator.preload()
+    httpd = BoundedThreadingHTTPServer(('', port), make_handler(node_simulator.SimpleNodeHandler),
+                                       workers=workers, max_pending=max_pending, idle_timeout=idle_timeout)
+    print(f"Node server running on port {port} "
+          f"({workers} connection workers, {node_simulator.VALIDATION_WORKERS} validation workers)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    run(
+        port=int(sys.argv[1]) if len(sys.argv) > 1 else int(os.environ.get("PORT", 8080)),
+        workers=int(os.environ.get("NODE_WORKERS", 64)),
+        max_pending=int(os.environ.get("NODE_MAX_PENDING", 1024)),
+        idle_timeout=float(os.environ.get("NODE_IDLE_TIMEOUT", 15))
+    )
@@ -4,13 +4,16 @@ from http.server import BaseHTTPRequestHandler, HTTPServer
 import json
 import os
 import sys
+import threading
 import time
 from datetime import datetime
 
 # Add the SDK directory to the path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sdk')))
 
-from cosmoembeddings import BlockBuilder, Signer, CosmoValidator, Config
+from cosmoembeddings import BlockBuilder, Signer, CosmoValidator, Config, VerdictCache
+from cosmoembeddings.sky_table import SkyTable
+from cosmoembeddings.validation_pipeline import ValidationPipeline
 
 # In-memory store for demo purposes
 BLOCKS = {}
@@ -19,73 +22,94 @@ BLOCKS = {}
 config = Config()
 builder = BlockBuilder()
 signer = Signer()
+# Blocks re-posted by the sync loop reuse earlier verdicts
+verdict_cache = VerdictCache()
+# A table precomputed with `cosmoembeddings sky-table` for this location turns validation into a lookup
+sky_table_path = config.get("sky_table_path")
 validator = CosmoValidator(
     latitude=40.7128,  # New York coordinates
     longitude=-74.0060,
-    elevation=0.0
+    elevation=0.0,
+    verdict_cache=verdict_cache,
+    ephemeris_path=config.get("ephemeris_path"),
+    sky_table=SkyTable.load(sky_table_path) if sky_table_path else None
 )
+# Cheap checks run first, so junk and replayed blocks never reach the astronomy
+MAX_BLOCK_BYTES = 4 * 1024 * 1024
+pipeline = ValidationPipeline.default(signer, validator, verdict_cache=verdict_cache, max_bytes=MAX_BLOCK_BYTES)
+# CPU-heavy validation is bounded separately from connections, so reads keep flowing
+VALIDATION_WORKERS = int(os.environ.get("NODE_VALIDATION_WORKERS", os.cpu_count() or 1))
+validation_slots = threading.BoundedSemaphore(VALIDATION_WORKERS)
 
 class SimpleNodeHandler(BaseHTTPRequestHandler):
-    def _set_headers(self, code=200):
+    def _send_json(self, code, payload, close=False):
+        # Content-Length on every response lets HTTP/1.1 clients keep the connection open
+        body = json.dumps(payload).encode()
         self.send_response(code)
         self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if close:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
         self.end_headers()
+        self.wfile.write(body)
 
     def do_GET(self):
         if self.path.startswith("/blocks/"):
             block_id = self.path.split("/")[-1]
             block = BLOCKS.get(block_id)
-            self._set_headers(200 if block else 404)
-            self.wfile.write(json.dumps(block or {}).encode())
+            self._send_json(200 if block else 404, block or {})
         elif self.path.startswith("/blocks"):
-            self._set_headers()
-            self.wfile.write(json.dumps(list(BLOCKS.values())).encode())
+            self._send_json(200, list(BLOCKS.values()))
         else:
-            self._set_headers(404)
-            self.wfile.write(b"{}")
+            self._send_json(404, {})
 
     def do_POST(self):
         if self.path == "/blocks":
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            block = json.loads(post_data.decode())
-            block_id = block.get("id")
-            
-            if not block_id:
-                self._set_headers(400)
-                self.wfile.write(json.dumps({"error": "Block ID missing"}).encode())
+            # Without a valid length the body cannot be read safely; closing skips whatever was sent
+            if 'Content-Length' not in self.headers:
+                self._send_json(411, {"error": "Content-Length required"}, close=True)
                 return
-                
-            # Validate the block
-            is_valid, reason = validator.validate_block(block)
-            if not is_valid:
-                self._set_headers(400)
-                self.wfile.write(json.dumps({"error": f"Block validation failed: {reason}"}).encode())
+            try:
+                content_length = int(self.headers['Content-Length'])
+            except ValueError:
+                content_length = -1
+            if content_length < 0:
+                self._send_json(400, {"error": "Content-Length invalid"}, close=True)
                 return
-                
-            # Verify the block's signatures
-            if not signer.verify_block(block):
-                self._set_headers(400)
-                self.wfile.write(json.dumps({"error": "Block signature verification failed"}).encode())
+            if content_length > MAX_BLOCK_BYTES:
+                # The unread body would be parsed as the next request, so close the connection
+                self._send_json(413, {"error": "Block too large"}, close=True)
+                return
+            post_data = self.rfile.read(content_length)
+            try:
+                block = json.loads(post_data.decode())
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                self._send_json(400, {"error": "Block is not valid JSON"})
                 return
                 
-            # Verify cosmo signature
-            is_valid, reason = validator.verify_cosmo_signature(block)
-            if not is_valid:
-                self._set_headers(400)
-                self.wfile.write(json.dumps({"error": f"Cosmo signature verification failed: {reason}"}).encode())
+            # Validate the block: schema, size, timestamp, hash, signature, then cosmo,
+            # with at most VALIDATION_WORKERS validations running at once
+            with validation_slots:
+                report = pipeline.validate(block, size=content_length)
+            if not report.is_valid:
+                self._send_json(400, {
+                    "error": f"Block validation failed: {report.reason}",
+                    "stage": report.failed_stage
+                })
                 return
+            block_id = block["id"]
                 
             # Store the block
             BLOCKS[block_id] = block
-            self._set_headers(200)
-            self.wfile.write(json.dumps({"status": "stored", "id": block_id}).encode())
+            self._send_json(200, {"status": "stored", "id": block_id})
         else:
-            self._set_headers(404)
-            self.wfile.write(b"{}")
+            self._send_json(404, {})
 
 def run(server_class=HTTPServer, handler_class=SimpleNodeHandler, port=8080):
     server_address = ('', port)
+    # Load the ephemeris before accepting blocks
+    validator.preload()
     httpd = server_class(server_address, handler_class)
     print(f"Node simulator running on port {port}")
     print(f"Using SDK version: {config.get('version', 'unknown')}")
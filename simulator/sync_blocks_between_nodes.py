@@ -9,7 +9,7 @@ import json
 # Add the SDK directory to the path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sdk')))
 
-from cosmoembeddings import BlockBuilder, Signer, CosmoValidator, Config
+from cosmoembeddings import BlockBuilder, Signer, CosmoValidator, Config, VerdictCache
 
 NODES = [
     "http://localhost:8080",
@@ -21,10 +21,13 @@ NODES = [
 config = Config()
 builder = BlockBuilder()
 signer = Signer()
+# Re-syncing unchanged blocks reuses earlier verdicts
+verdict_cache = VerdictCache()
 validator = CosmoValidator(
     latitude=40.7128,  # New York coordinates
     longitude=-74.0060,
-    elevation=0.0
+    elevation=0.0,
+    verdict_cache=verdict_cache
 )
 
 def fetch_blocks(node_url):
@@ -49,7 +52,7 @@ def post_block(node_url, block):
 def validate_block(block):
     """Validate a block using the SDK."""
     # Verify the block's signatures
-    if not signer.verify_block(block):
+    if not signer.verify_block(block, cache=verdict_cache):
         print(f"Block {block['id']} signature verification failed")
         return False
         
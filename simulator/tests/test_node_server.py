@@ -0,0 +1,134 @@
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from node_server import BoundedThreadingHTTPServer, make_handler
+
+class SlowPostHandler(BaseHTTPRequestHandler):
+    """Answers GETs at once and holds POSTs until released."""
+    entered = None
+    release = None
+
+    def _send_json(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send_json(200, {"client": list(self.client_address)})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.entered.set()
+        self.release.wait(10)
+        self._send_json(200, {"status": "stored"})
+
+    def log_message(self, *args):
+        pass
+
+def start_server(workers, max_pending=16, idle_timeout=15):
+    handler = type("Handler", (SlowPostHandler,), {"entered": threading.Event(), "release": threading.Event()})
+    server = BoundedThreadingHTTPServer(('127.0.0.1', 0), make_handler(handler, request_timeout=5),
+                                        workers=workers, max_pending=max_pending, idle_timeout=idle_timeout)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    return server, handler
+
+def stop_server(server, handler):
+    handler.release.set()
+    server.shutdown()
+    server.server_close()
+
+def send_slow_post(port):
+    def post():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        connection.request('POST', '/blocks', body=b'{}')
+        connection.getresponse().read()
+        connection.close()
+    thread = threading.Thread(target=post, daemon=True)
+    thread.start()
+    return thread
+
+def get(connection):
+    connection.request('GET', '/blocks')
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+def test_slow_post_does_not_block_get():
+    server, handler = start_server(workers=2)
+    try:
+        post = send_slow_post(server.server_address[1])
+        assert handler.entered.wait(5)
+
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        assert get(connection)[0] == 200
+        assert post.is_alive()
+        connection.close()
+    finally:
+        stop_server(server, handler)
+
+def test_keep_alive_reuses_one_connection():
+    server, handler = start_server(workers=2)
+    try:
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        clients = {tuple(get(connection)[1]["client"]) for _ in range(5)}
+        assert len(clients) == 1
+        connection.close()
+    finally:
+        stop_server(server, handler)
+
+def test_idle_connections_do_not_hold_workers():
+    server, handler = start_server(workers=1)
+    try:
+        idle = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        assert get(idle)[0] == 200
+
+        # The only worker is free although the first connection stays open
+        other = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        assert get(other)[0] == 200
+        assert get(idle)[0] == 200
+        idle.close()
+        other.close()
+    finally:
+        stop_server(server, handler)
+
+def test_idle_connections_close_after_timeout():
+    server, handler = start_server(workers=1, idle_timeout=0.1)
+    try:
+        connection = socket.create_connection(server.server_address, timeout=5)
+        connection.sendall(b"GET /blocks HTTP/1.1\r\nHost: node\r\n\r\n")
+        response = b""
+        while not response.endswith(b"}"):
+            response += connection.recv(4096)
+        # The server closes the idle connection: the next read sees end of stream
+        assert connection.recv(4096) == b""
+        connection.close()
+    finally:
+        stop_server(server, handler)
+
+def test_full_queue_gets_503():
+    server, handler = start_server(workers=1, max_pending=1)
+    try:
+        send_slow_post(server.server_address[1])
+        assert handler.entered.wait(5)
+        waiting = socket.create_connection(server.server_address, timeout=5)
+        deadline = time.monotonic() + 5
+        while server._pending.qsize() < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        rejected = socket.create_connection(server.server_address, timeout=5)
+        response = rejected.recv(4096)
+        assert response.startswith(b"HTTP/1.1 503")
+        assert b"Retry-After: 1" in response
+        waiting.close()
+        rejected.close()
+    finally:
+        stop_server(server, handler)
@@ -1,30 +1,33 @@
 # threaded_multi_node_launcher.py
 
 import threading
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler
 import json
 import time
 
+from node_server import BoundedThreadingHTTPServer, make_handler
+
 class NodeHandler(BaseHTTPRequestHandler):
     BLOCKS = {}
 
-    def _set_headers(self, code=200):
+    def _send_json(self, code, payload):
+        # Content-Length on every response lets HTTP/1.1 clients keep the connection open
+        body = json.dumps(payload).encode()
         self.send_response(code)
         self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
+        self.wfile.write(body)
 
     def do_GET(self):
         if self.path.startswith("/blocks/"):
             block_id = self.path.split("/")[-1]
             block = self.BLOCKS.get(block_id)
-            self._set_headers(200 if block else 404)
-            self.wfile.write(json.dumps(block or {}).encode())
+            self._send_json(200 if block else 404, block or {})
         elif self.path.startswith("/blocks"):
-            self._set_headers()
-            self.wfile.write(json.dumps(list(self.BLOCKS.values())).encode())
+            self._send_json(200, list(self.BLOCKS.values()))
         else:
-            self._set_headers(404)
-            self.wfile.write(b"{}")
+            self._send_json(404, {})
 
     def do_POST(self):
         if self.path == "/blocks":
@@ -34,17 +37,18 @@ class NodeHandler(BaseHTTPRequestHandler):
             block_id = block.get("id")
             if block_id:
                 self.BLOCKS[block_id] = block
-                self._set_headers(200)
-                self.wfile.write(json.dumps({"status": "stored", "id": block_id}).encode())
+                self._send_json(200, {"status": "stored", "id": block_id})
             else:
-                self._set_headers(400)
-                self.wfile.write(json.dumps({"error": "Block ID missing"}).encode())
+                self._send_json(400, {"error": "Block ID missing"})
+        else:
+            self._send_json(404, {})
 
 def run_node(port):
     class CustomHandler(NodeHandler):
         BLOCKS = {}
 
-    server = HTTPServer(('', port), CustomHandler)
+    # Keep-alive connections served on a bounded pool of worker threads
+    server = BoundedThreadingHTTPServer(('', port), make_handler(CustomHandler))
     print(f"Node running on port {port}")
     server.serve_forever()
 